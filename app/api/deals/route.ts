@@ -1,5 +1,5 @@
 // app/api/deals/route.ts
-import { NextResponse } from "next/server";
+import { NextRequest, NextResponse } from "next/server";
 import prisma from "@/lib/prisma";
 
 export const revalidate = 0;
@@ -10,8 +10,42 @@ export const revalidate = 0;
 const CACHE_TTL_MS = 30_000;
 let dealsCache: { data: unknown; expires: number } | null = null;
 
-export async function GET() {
+const WORKER_URL = process.env.SNIPE_SERVER_URL ?? 'http://localhost:3001';
+
+// The worker keeps a precomputed deals board in memory (worker/deals_board.py).
+// Serve it straight through with its ETag; returns null if the worker is unavailable.
+async function fetchWorkerDeals(ifNoneMatch: string | null): Promise<Response | null> {
+  try {
+    const res = await fetch(`${WORKER_URL}/deals`, {
+      headers: ifNoneMatch ? { 'If-None-Match': ifNoneMatch } : {},
+      cache: 'no-store',
+      signal: AbortSignal.timeout(2_000),
+    });
+    const etag = res.headers.get('ETag');
+    if (res.status === 304 && etag) {
+      return new Response(null, { status: 304, headers: { ETag: etag, 'X-Cache': 'WORKER' } });
+    }
+    if (!res.ok) return null;
+    return new Response(await res.arrayBuffer(), {
+      status: 200,
+      headers: {
+        'Content-Type': 'application/json',
+        'Cache-Control': 'no-cache',
+        ...(etag ? { ETag: etag } : {}),
+        'X-Cache': 'WORKER',
+      },
+    });
+  } catch {
+    return null;
+  }
+}
+
+export async function GET(req: NextRequest) {
   try {
+    const fromWorker = await fetchWorkerDeals(req.headers.get('If-None-Match'));
+    if (fromWorker) return fromWorker;
+
+    // Fallback: worker down or still warming up — compute from the database
     if (dealsCache && dealsCache.expires > Date.now()) {
       return NextResponse.json(dealsCache.data, {
         headers: {
@@ -59,7 +59,7 @@ export async function GET(
       SELECT
         ii."snapshotId",
         COALESCE(SUM(ph.rap), 0) as "currentRap"
-      FROM "InventoryItem" ii
+      FROM "InventorySnapshotItem" ii
       LEFT JOIN LATERAL (
         SELECT rap
         FROM "PriceHistory"
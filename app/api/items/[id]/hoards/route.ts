@@ -10,8 +10,8 @@ export async function GET(
     const { id: assetId } = await params;
     const assetIdBigInt = BigInt(assetId);
 
-    // Use SQL to get only the latest snapshot per user that contains this asset,
-    // counting copies per user in a single query — avoids a full JS scan.
+    // CurrentHolding already holds only each user's latest snapshot, so this is
+    // a lookup on the ("assetId", "userId") index; copies are counted per user.
     const rows = await prisma.$queryRaw<Array<{
       robloxUserId: bigint;
       username: string;
@@ -20,31 +20,38 @@ export async function GET(
       count: bigint;
       copies: string; // JSON array of {userAssetId, serialNumber}
     }>>`
-      WITH LatestSnapshots AS (
-        SELECT DISTINCT ON ("userId") id, "userId", "createdAt"
-        FROM "InventorySnapshot"
-        ORDER BY "userId", "createdAt" DESC
+      WITH Hoarders AS (
+        SELECT
+          ch."userId",
+          COUNT(*) AS count,
+          JSON_AGG(
+            JSON_BUILD_OBJECT(
+              'userAssetId', ch."userAssetId"::text,
+              'serialNumber', ch."serialNumber"
+            )
+            ORDER BY ch."serialNumber" ASC NULLS LAST, ch."userAssetId" ASC
+          ) AS copies
+        FROM "CurrentHolding" ch
+        WHERE ch."assetId" = ${assetIdBigInt}
+        GROUP BY ch."userId"
+        HAVING COUNT(*) >= 2
       )
       SELECT
         u."robloxUserId",
         u.username,
         u."avatarUrl",
         ls."createdAt" AS "scannedAt",
-        COUNT(ii."userAssetId") AS count,
-        JSON_AGG(
-          JSON_BUILD_OBJECT(
-            'userAssetId', ii."userAssetId"::text,
-            'serialNumber', ii."serialNumber"
-          )
-          ORDER BY ii."serialNumber" ASC NULLS LAST, ii."userAssetId" ASC
-        ) AS copies
-      FROM "InventoryItem" ii
-      INNER JOIN LatestSnapshots ls ON ii."snapshotId" = ls.id
-      INNER JOIN "User" u ON ls."userId" = u."robloxUserId"
-      WHERE ii."assetId" = ${assetIdBigInt}
-      GROUP BY u."robloxUserId", u.username, u."avatarUrl", ls."createdAt"
-      HAVING COUNT(ii."userAssetId") >= 2
-      ORDER BY count DESC
+        h.count,
+        h.copies
+      FROM Hoarders h
+      INNER JOIN "User" u ON h."userId" = u."robloxUserId"
+      CROSS JOIN LATERAL (
+        SELECT "createdAt" FROM "InventorySnapshot"
+        WHERE "userId" = h."userId"
+        ORDER BY "createdAt" DESC
+        LIMIT 1
+      ) ls
+      ORDER BY h.count DESC
     `;
 
     const hoards = rows.map(row => {
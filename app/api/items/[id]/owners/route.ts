@@ -47,16 +47,11 @@ export async function GET(
     const countPromise = (async () => {
       const cached = countCache.get(itemIdString);
       if (cached && cached.expires > Date.now()) return cached.count;
+      // CurrentHolding = latest snapshot per user, maintained by the worker
       const result = await prisma.$queryRaw<[{ count: bigint }]>`
-        SELECT COUNT(*) as count
-        FROM (
-          SELECT ii."userAssetId",
-                 ROW_NUMBER() OVER (PARTITION BY s."userId" ORDER BY s."createdAt" DESC) AS rn
-          FROM "InventoryItem" ii
-          INNER JOIN "InventorySnapshot" s ON s.id = ii."snapshotId"
-          WHERE ii."assetId" = ${assetIdBigInt}
-        ) r
-        WHERE r.rn = 1
+        SELECT COUNT(DISTINCT "userId") as count
+        FROM "CurrentHolding"
+        WHERE "assetId" = ${assetIdBigInt}
       `;
       const count = Number(result[0]?.count ?? 0);
       countCache.set(itemIdString, { count, expires: Date.now() + 60_000 });
@@ -84,19 +79,18 @@ export async function GET(
         u."robloxUserId",
         u."avatarUrl"
       FROM (
-        SELECT
-          ii."userAssetId",
-          ii."serialNumber",
-          ii."scannedAt",
-          ii."uaidUpdatedAt",
-          s."userId",
-          ROW_NUMBER() OVER (PARTITION BY s."userId" ORDER BY s."createdAt" DESC) AS rn
-        FROM "InventoryItem" ii
-        INNER JOIN "InventorySnapshot" s ON s.id = ii."snapshotId"
-        WHERE ii."assetId" = $1
+        -- One row per owner (their lowest serial), read off the ("assetId", "userId") index
+        SELECT DISTINCT ON (ch."userId")
+          ch."userAssetId",
+          ch."serialNumber",
+          ch."scannedAt",
+          ch."uaidUpdatedAt",
+          ch."userId"
+        FROM "CurrentHolding" ch
+        WHERE ch."assetId" = $1
+        ORDER BY ch."userId", ch."serialNumber" ASC NULLS LAST, ch."userAssetId" ASC
       ) r
       INNER JOIN "User" u ON r."userId" = u."robloxUserId"
-      WHERE r.rn = 1
       ${orderBy}
       LIMIT $2 OFFSET $3
       `,
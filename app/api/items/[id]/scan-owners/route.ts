@@ -6,7 +6,7 @@ export const dynamic = "force-dynamic";
 
 async function getActiveJob(assetId: string) {
   return prisma.scanJob.findFirst({
-    where: { assetId: BigInt(assetId), status: { in: ['pending', 'running'] } },
+    where: { assetId: BigInt(assetId), parentId: null, status: { in: ['pending', 'running'] } },
     orderBy: { startedAt: 'desc' },
   });
 }
@@ -38,6 +38,11 @@ export async function POST(
       const activeJob = await getActiveJob(itemIdString);
       if (activeJob) {
         await prisma.scanJob.update({ where: { id: activeJob.id }, data: { status: 'stopped' } });
+        // Shards of a split scan stop with it
+        await prisma.scanJob.updateMany({
+          where: { parentId: activeJob.id, status: { in: ['pending', 'running'] } },
+          data: { status: 'stopped' },
+        });
         return NextResponse.json({ success: true, message: 'Stop requested — will halt after current user.' });
       }
       return NextResponse.json({ success: false, message: 'No scan is running for this item.' });
@@ -60,8 +65,9 @@ export async function POST(
     await prisma.scanJob.create({
       data: { 
         assetId: BigInt(itemIdString), 
-        type: action === 'full' ? 'owners_full' : 'owners', 
-        status: 'pending' 
+        type: action === 'full' ? 'owners_full' : action === 'delta' ? 'owners_delta' : 'owners', 
+        status: 'pending',
+        requestedBy: BigInt(userId),
       },
     });
 
@@ -69,7 +75,9 @@ export async function POST(
       success: true,
       message: action === 'full'
         ? 'Full scan queued — new owners will be added and timestamps filled.'
-        : 'Scan queued — the worker will pick it up shortly.',
+        : action === 'delta'
+          ? 'Quick rescan queued — only owners that changed since the last scan will be processed.'
+          : 'Scan queued — the worker will pick it up shortly.',
     });
 
   } catch (error) {
@@ -85,13 +93,14 @@ export async function GET(
   const { id: itemIdString } = await params;
 
   const job = await prisma.scanJob.findFirst({
-    where: { assetId: BigInt(itemIdString), status: { in: ['pending', 'running'] } },
+    where: { assetId: BigInt(itemIdString), parentId: null, status: { in: ['pending', 'running'] } },
     orderBy: { startedAt: 'desc' },
   });
 
   const recentJob = job ?? await prisma.scanJob.findFirst({
     where: {
       assetId: BigInt(itemIdString),
+      parentId: null,
       status: { in: ['stopped', 'done'] },
       startedAt: { gte: new Date(Date.now() - 60_000) },
     },
@@ -1,6 +1,7 @@
 // app/api/player/[userid]/rank/route.ts
 import { NextRequest, NextResponse } from 'next/server';
 import { Pool } from 'pg';
+import { fetchWorkerRanks } from '@/lib/playerRanks';
 
 const pool = new Pool({
   connectionString: process.env.DATABASE_URL,
@@ -17,6 +18,14 @@ export async function GET(
   try {
     const { userid } = await params;
 
+    const fromWorker = await fetchWorkerRanks(userid);
+    if (fromWorker) {
+      return NextResponse.json(fromWorker, {
+        headers: { 'Cache-Control': 'public, s-maxage=30, stale-while-revalidate=60' }
+      });
+    }
+
+    // Fallback: worker down or still loading.
     // Single query — count users with higher value in each category.
     // COUNT(...) + 1 = rank. All 3 done in one round-trip.
     const result = await pool.query(`
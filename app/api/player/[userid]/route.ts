@@ -107,7 +107,7 @@ export async function GET(
       }
 
       const existingJob = await prisma.scanJob.findFirst({
-        where: { userId: user.robloxUserId, status: { in: ['pending', 'running'] } },
+        where: { userId: user.robloxUserId, type: { in: ['inventory', 'rescan'] }, status: { in: ['pending', 'running'] } },
       });
       if (!existingJob) {
         await prisma.scanJob.create({
@@ -121,7 +121,7 @@ export async function GET(
 
       if (snapshotAge > fiveMinutes) {
         const existingJob = await prisma.scanJob.findFirst({
-          where: { userId: user.robloxUserId, status: { in: ['pending', 'running'] } },
+          where: { userId: user.robloxUserId, type: { in: ['inventory', 'rescan'] }, status: { in: ['pending', 'running'] } },
         });
         if (!existingJob) {
           await prisma.scanJob.create({
@@ -170,7 +170,7 @@ export async function GET(
             ARRAY_AGG(ii."uaidCreatedAt" ORDER BY ii."scannedAt" ASC) as uaid_created_ats,
             ARRAY_AGG(ii."uaidUpdatedAt" ORDER BY ii."scannedAt" ASC) as uaid_updated_ats,
             COALESCE(BOOL_OR(ii."isOnHold"), false) as is_on_hold
-          FROM "InventoryItem" ii
+          FROM "InventorySnapshotItem" ii
           INNER JOIN LatestSnapshot ls ON ii."snapshotId" = ls.id
           GROUP BY ii."assetId"
         )
@@ -224,7 +224,7 @@ export async function GET(
       // Check whether a scan job is currently in-flight for this user so the
       // client can show a "refreshing" indicator and auto-refresh when done.
       prisma.scanJob.findFirst({
-        where: { userId: user.robloxUserId, status: { in: ['pending', 'running'] } },
+        where: { userId: user.robloxUserId, type: { in: ['inventory', 'rescan'] }, status: { in: ['pending', 'running'] } },
         select: { id: true },
       }),
     ]);
@@ -11,6 +11,7 @@ export async function GET(
   const job = await prisma.scanJob.findFirst({
     where: {
       userId: BigInt(userid),
+      type: { in: ['inventory', 'rescan'] },
       status: { in: ['pending', 'running'] },
     },
     select: { id: true, status: true, currentUser: true },
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import prisma from '@/lib/prisma';
 import '@/lib/bigint-patch';
+import { fetchWorkerRanks } from '@/lib/playerRanks';
 
 export async function GET(req: NextRequest) {
   const { searchParams } = new URL(req.url);
@@ -8,6 +9,10 @@ export async function GET(req: NextRequest) {
   if (!userId) return NextResponse.json({ error: 'userId required' }, { status: 400 });
 
   try {
+    const fromWorker = await fetchWorkerRanks(userId);
+    if (fromWorker) return NextResponse.json(fromWorker);
+
+    // Fallback: worker down or still loading — count from the database
     const [rapRank, itemsRank, uniqueRank] = await Promise.all([
       prisma.$queryRaw<[{ rank: bigint }]>`
         SELECT COUNT(*) + 1 AS rank
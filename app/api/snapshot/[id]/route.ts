@@ -33,7 +33,7 @@ export async function GET(
           COUNT(*) as item_count,
           ARRAY_AGG(ii."userAssetId") as user_asset_ids,
           ARRAY_AGG(ii."serialNumber") as serial_numbers
-        FROM "InventoryItem" ii
+        FROM "InventorySnapshotItem" ii
         LEFT JOIN "Item" i ON ii."assetId" = i."assetId"
         WHERE ii."snapshotId" = ${snapshotId}
         GROUP BY ii."assetId", i.name, i."imageUrl", i.manipulated, i."isLimitedUnique"
@@ -1,99 +1,39 @@
 // app/api/snipe/stream/route.ts
 import { NextRequest } from 'next/server';
-import prisma from '@/lib/prisma';
 
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
 
+const WORKER_URL = process.env.SNIPE_SERVER_URL ?? 'http://localhost:3001';
+
+// Proxies the worker's snipe stream, which matches each deal once for all
+// connections and resumes from Last-Event-ID out of its replay buffer.
+// GET /api/snipe/stream?userId=123
 export async function GET(req: NextRequest) {
   const userId = req.nextUrl.searchParams.get('userId');
   if (!userId) return new Response('Missing userId', { status: 400 });
+  if (!/^\d+$/.test(userId)) return new Response('Invalid userId', { status: 400 });
+
+  const lastEventId =
+    req.headers.get('last-event-id') ?? req.nextUrl.searchParams.get('lastEventId');
 
-  let userIdBigInt: bigint;
+  let upstream: Response;
   try {
-    userIdBigInt = BigInt(userId);
-  } catch {
-    return new Response('Invalid userId', { status: 400 });
+    upstream = await fetch(`${WORKER_URL}/stream?userId=${userId}`, {
+      headers: lastEventId ? { 'Last-Event-ID': lastEventId } : {},
+      signal: req.signal,
+      cache: 'no-store',
+    });
+  } catch (err) {
+    console.error('[snipe/stream] upstream error:', err);
+    return new Response('Snipe stream unavailable', { status: 502 });
   }
 
-  const encoder = new TextEncoder();
-  let closed = false;
-  let lastSeenId: string | null = null;
-
-  const stream = new ReadableStream({
-    start(controller) {
-      const send = (data: string) => {
-        if (closed) return;
-        try {
-          controller.enqueue(encoder.encode(data));
-        } catch {
-          closed = true;
-        }
-      };
-
-      send(': connected\n\n');
-
-      const poll = async () => {
-        if (closed) return;
-        try {
-          const configs = await prisma.snipeConfig.findMany({
-            where: { userId: userIdBigInt, enabled: true },
-          });
-
-          if (configs.length === 0) return;
-
-          const cutoff = new Date(Date.now() - 2 * 60 * 1000);
-          const deals = await prisma.snipeDeal.findMany({
-            where: {
-              createdAt: { gte: cutoff },
-              ...(lastSeenId ? { id: { gt: lastSeenId } } : {}),
-            },
-            orderBy: { createdAt: 'asc' },
-            take: 50,
-          });
-
-          if (deals.length === 0) return;
-          lastSeenId = deals[deals.length - 1].id;
-
-          for (const deal of deals) {
-            for (const cfg of configs) {
-              if (cfg.assetId !== null && cfg.assetId !== deal.assetId) continue;
-              if (deal.deal < cfg.minDeal) continue;
-              if (cfg.minPrice !== null && deal.price < cfg.minPrice) continue;
-              if (cfg.maxPrice !== null && deal.price > cfg.maxPrice) continue;
-
-              send(`data: ${JSON.stringify({
-                assetId: deal.assetId.toString(),
-                name: deal.name,
-                imageUrl: deal.imageUrl,
-                price: deal.price,
-                rap: deal.rap,
-                deal: Math.round(deal.deal),
-              })}\n\n`);
-              break;
-            }
-          }
-        } catch (err) {
-          console.error('[snipe/stream] poll error:', err);
-        }
-      };
-
-      // Heartbeat every 5s
-      const heartbeat = setInterval(() => send(': heartbeat\n\n'), 5_000);
-      // Poll every 5s
-      const interval = setInterval(poll, 5_000);
-      poll();
-
-      req.signal.addEventListener('abort', () => {
-        closed = true;
-        clearInterval(heartbeat);
-        clearInterval(interval);
-        try { controller.close(); } catch { /* already closed */ }
-      });
-    },
-  });
+  if (!upstream.ok || !upstream.body) {
+    return new Response(await upstream.text(), { status: upstream.status });
+  }
 
-  return new Response(stream, {
+  return new Response(upstream.body, {
     status: 200,
     headers: {
       'Content-Type': 'text/event-stream',
@@ -102,4 +42,4 @@ export async function GET(req: NextRequest) {
       'X-Accel-Buffering': 'no',
     },
   });
-}
\ No newline at end of file
+}
@@ -0,0 +1,40 @@
+// app/api/ticks/route.ts
+import { NextRequest } from 'next/server';
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
+
+const WORKER_URL = process.env.SNIPE_SERVER_URL ?? 'http://localhost:3001';
+
+// Proxies the worker's live price/RAP tick stream.
+// GET /api/ticks?assets=1,2,3  (or ?assets=all — every item's ticks; opt-in only,
+// pages subscribe to the ids they show)
+export async function GET(req: NextRequest) {
+  const assets = req.nextUrl.searchParams.get('assets');
+  if (!assets) return new Response('Missing assets', { status: 400 });
+
+  let upstream: Response;
+  try {
+    upstream = await fetch(`${WORKER_URL}/ticks?assets=${encodeURIComponent(assets)}`, {
+      signal: req.signal,
+      cache: 'no-store',
+    });
+  } catch (err) {
+    console.error('[ticks] upstream error:', err);
+    return new Response('Tick stream unavailable', { status: 502 });
+  }
+
+  if (!upstream.ok || !upstream.body) {
+    return new Response(await upstream.text(), { status: upstream.status });
+  }
+
+  return new Response(upstream.body, {
+    status: 200,
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no',
+    },
+  });
+}
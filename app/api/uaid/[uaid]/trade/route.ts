@@ -20,7 +20,7 @@ export async function GET(
         s."userId",
         s.id AS "snapshotId",
         s."createdAt"
-      FROM "InventoryItem" ii
+      FROM "InventorySnapshotItem" ii
       JOIN "InventorySnapshot" s ON s.id = ii."snapshotId"
       WHERE ii."userAssetId" = $1
         AND ii."uaidUpdatedAt" IS NOT NULL
@@ -80,7 +80,7 @@ export async function GET(
         ii."assetId",
         ii."serialNumber",
         ii."uaidUpdatedAt"
-      FROM "InventoryItem" ii
+      FROM "InventorySnapshotItem" ii
       JOIN "InventorySnapshot" s ON s.id = ii."snapshotId"
       WHERE s."userId" = $1
         AND ii."uaidUpdatedAt" BETWEEN $2::timestamp - INTERVAL '2 seconds'
@@ -99,7 +99,7 @@ export async function GET(
           i.name,
           i."imageUrl",
           COALESCE(ph.rap, 0) as rap
-        FROM "InventoryItem" ii
+        FROM "InventorySnapshotItem" ii
         JOIN "Item" i ON i."assetId" = ii."assetId"
         LEFT JOIN LATERAL (
           SELECT rap FROM "PriceHistory"
@@ -127,7 +127,7 @@ export async function GET(
           i.name,
           i."imageUrl",
           COALESCE(ph.rap, 0) as rap
-        FROM "InventoryItem" ii
+        FROM "InventorySnapshotItem" ii
         JOIN "Item" i ON i."assetId" = ii."assetId"
         LEFT JOIN LATERAL (
           SELECT rap FROM "PriceHistory"
@@ -136,7 +136,7 @@ export async function GET(
         ) ph ON true
         WHERE ii."snapshotId" = $1
           AND ii."userAssetId" NOT IN (
-            SELECT "userAssetId" FROM "InventoryItem" WHERE "snapshotId" = $2
+            SELECT "userAssetId" FROM "InventorySnapshotItem" WHERE "snapshotId" = $2
           )
         ORDER BY ii."serialNumber" ASC NULLS LAST
       `, [afterSnapshotId, prevSnapshotId]);
@@ -159,7 +159,7 @@ export async function GET(
           i.name,
           i."imageUrl",
           COALESCE(ph.rap, 0) as rap
-        FROM "InventoryItem" ii
+        FROM "InventorySnapshotItem" ii
         JOIN "Item" i ON i."assetId" = ii."assetId"
         LEFT JOIN LATERAL (
           SELECT rap FROM "PriceHistory"
@@ -170,7 +170,7 @@ export async function GET(
                                         AND $2::timestamp + INTERVAL '2 seconds'
           AND ii."userAssetId" IN (
             SELECT ii2."userAssetId"
-            FROM "InventoryItem" ii2
+            FROM "InventorySnapshotItem" ii2
             JOIN "InventorySnapshot" snap ON snap.id = ii2."snapshotId"
             WHERE snap."userId" = $1
           )
@@ -20,28 +20,6 @@ export async function GET(
           inventorySnapshots: {
             orderBy: { createdAt: 'desc' },
             take: 1,
-            include: {
-              items: {
-                include: {
-                  item: {
-                    include: {
-                      priceHistory: {
-                        select: {
-                          id: true,
-                          itemId: true,
-                          price: true,
-                          rap: true,
-                          salesVolume: true,
-                          timestamp: true,
-                        },
-                        orderBy: { timestamp: 'desc' },
-                        take: 1,
-                      },
-                    },
-                  },
-                },
-              },
-            },
           },
         },
       }),
@@ -69,6 +47,29 @@ export async function GET(
     // Get the latest snapshot
     const latestSnapshot = dbUser.inventorySnapshots[0];
 
+    // Its items, through the view so delta-encoded snapshots resolve too
+    const latestItems = latestSnapshot
+      ? await prisma.$queryRaw<Array<{
+          assetId: bigint;
+          userAssetId: bigint;
+          serialNumber: number | null;
+          name: string | null;
+          imageUrl: string | null;
+          rap: number | null;
+        }>>`
+          SELECT ii."assetId", ii."userAssetId", ii."serialNumber", i.name, i."imageUrl", ph.rap
+          FROM "InventorySnapshotItem" ii
+          LEFT JOIN "Item" i ON i."assetId" = ii."assetId"
+          LEFT JOIN LATERAL (
+            SELECT rap FROM "PriceHistory"
+            WHERE "itemId" = ii."assetId"
+            ORDER BY timestamp DESC
+            LIMIT 1
+          ) ph ON true
+          WHERE ii."snapshotId" = ${latestSnapshot.id}
+        `
+      : [];
+
     // Group inventory items by assetId and count them
     const inventoryMap = new Map<string, {
       assetId: string;
@@ -80,17 +81,15 @@ export async function GET(
       serialNumbers: (number | null)[];
     }>();
 
-    latestSnapshot?.items.forEach(invItem => {
+    latestItems.forEach(invItem => {
       const assetIdString = invItem.assetId.toString();
 
       if (!inventoryMap.has(assetIdString)) {
-        const latestPrice = invItem.item?.priceHistory[0];
-
         inventoryMap.set(assetIdString, {
           assetId: assetIdString,
-          name: invItem.item?.name || 'Unknown Item',
-          imageUrl: invItem.item?.imageUrl || null,
-          rap: latestPrice?.rap || 0,
+          name: invItem.name || 'Unknown Item',
+          imageUrl: invItem.imageUrl || null,
+          rap: Number(invItem.rap ?? 0),
           count: 0,
           userAssetIds: [],
           serialNumbers: [],
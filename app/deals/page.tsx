@@ -34,6 +34,16 @@ interface DealItem {
   timestamp?: string;
 }
 
+interface Tick {
+  assetId: string;
+  price: number | null;
+  rap: number | null;
+  ts: number;
+}
+
+// Worker cap on assets per tick stream (price_ticks.MAX_ASSETS_PER_CONNECTION)
+const MAX_TICK_ASSETS = 200;
+
 type SortKey = "deal" | "rap" | "price" | "recent";
 type SortDir = "asc" | "desc";
 
@@ -72,6 +82,8 @@ export default function Deals() {
   const [newDealIds, setNewDealIds] = useState<Set<string>>(new Set());
   const [priceDropIds, setPriceDropIds] = useState<Set<string>>(new Set());
   const prevDealsRef = useRef<Map<string, DealItem>>(new Map());
+  const pendingTicks = useRef<Map<string, Tick>>(new Map());
+  const [tickAssets, setTickAssets] = useState("");
   const isInitialLoad = useRef(true);
 
   const [sortKey, setSortKey] = useState<SortKey>("deal");
@@ -130,10 +142,59 @@ export default function Deals() {
     fetchDeals();
   }, [fetchDeals]);
 
+  // Live price/RAP ticks from the worker update listed deals in place;
+  // the slow list refresh only picks up items that newly became deals.
+  // Ticks are buffered by the stream effect below and applied here.
   useEffect(() => {
     if (!isLive) return;
-    const interval = setInterval(fetchDeals, 1000);
-    return () => clearInterval(interval);
+
+    const pending = pendingTicks.current;
+    const flush = setInterval(() => {
+      if (pending.size === 0) return;
+      const ticks = new Map(pending);
+      pending.clear();
+
+      const dropIds = new Set<string>();
+      ticks.forEach((tick, assetId) => {
+        const prev = prevDealsRef.current.get(assetId);
+        if (prev && tick.price && tick.price > 0 && tick.price < prev.bestPrice) dropIds.add(assetId);
+      });
+
+      setDeals(prev => {
+        const next: DealItem[] = [];
+        for (const d of prev) {
+          const tick = ticks.get(d.assetId);
+          if (!tick) { next.push(d); continue; }
+          const { price, rap } = tick;
+          if (!price || price <= 0 || !rap || rap <= 0 || price >= rap) continue; // no longer a deal
+          if (price === d.bestPrice && rap === d.rap) { next.push(d); continue; }
+          next.push({
+            ...d,
+            bestPrice: price,
+            rap,
+            percent: Math.round(((rap - price) / rap) * 100),
+            timestamp: new Date(tick.ts).toISOString(),
+          });
+        }
+        const nextMap = new Map<string, DealItem>();
+        next.forEach(d => nextMap.set(d.assetId, d));
+        prevDealsRef.current = nextMap;
+        return next;
+      });
+
+      if (dropIds.size > 0) {
+        setPriceDropIds(dropIds);
+        setTimeout(() => setPriceDropIds(new Set()), 3000);
+      }
+      setLastUpdated(new Date());
+    }, 500);
+
+    const refresh = setInterval(fetchDeals, 30_000);
+
+    return () => {
+      clearInterval(flush);
+      clearInterval(refresh);
+    };
   }, [isLive, fetchDeals]);
 
   const filtered = useMemo(() => {
@@ -161,6 +222,29 @@ export default function Deals() {
     return result;
   }, [deals, sortKey, sortDir, dealMin, rapMin, rapMax, priceMin, priceMax, hideManipulated]);
 
+  // Subscribe to ticks for the listed deals only (top of the current sort,
+  // up to the worker's per-stream cap). The stream is reopened when a listed
+  // deal isn't covered yet; deals dropping off the list keep it as is.
+  useEffect(() => {
+    const ids = filtered.slice(0, MAX_TICK_ASSETS).map(d => d.assetId);
+    setTickAssets(prev => {
+      const subscribed = new Set(prev ? prev.split(",") : []);
+      if (prev && ids.every(id => subscribed.has(id))) return prev;
+      return [...ids].sort().join(",");
+    });
+  }, [filtered]);
+
+  useEffect(() => {
+    if (!isLive || !tickAssets) return;
+
+    const source = new EventSource(`/api/ticks?assets=${tickAssets}`);
+    source.onmessage = (e) => {
+      const tick: Tick = JSON.parse(e.data);
+      pendingTicks.current.set(tick.assetId, tick);
+    };
+    return () => source.close();
+  }, [isLive, tickAssets]);
+
   const handleSort = (key: SortKey) => {
     if (sortKey === key) {
       setSortDir(d => d === "desc" ? "asc" : "desc");
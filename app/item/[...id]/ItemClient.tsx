@@ -379,7 +379,7 @@ export default function ItemClient({ item: initialItem }: Props) {
 
   const [scanState, setScanState] = useState<ScanState>({ scanning: false, stopRequested: false, progress: null });
   const [scanStarting, setScanStarting] = useState(false);
-  const [activeScanType, setActiveScanType] = useState<'timestamps' | 'full' | null>(null);
+  const [activeScanType, setActiveScanType] = useState<'timestamps' | 'full' | 'delta' | null>(null);
   const [scanMessage, setScanMessage] = useState<{ text: string; ok: boolean } | null>(null);
   const [activeTab, setActiveTab] = useState<'owners' | 'hoards'>('owners');
 
@@ -639,6 +639,25 @@ export default function ItemClient({ item: initialItem }: Props) {
     }
   };
 
+  const handleDeltaScan = async () => {
+    const user = getUserSession();
+    if (!user) return;
+    setScanMessage(null);
+    setScanStarting(true);
+    setActiveScanType('delta');
+    try {
+      const res = await axios.post(`/api/items/${itemId}/scan-owners`, { userId: user.robloxUserId, action: 'delta' });
+      setScanState({ scanning: true, stopRequested: false, progress: null });
+      setScanMessage({ text: `🔄 ${res.data.message}`, ok: true });
+      startPolling();
+    } catch (err: any) {
+      setScanMessage({ text: `❌ ${err.response?.data?.error || 'Scan failed'}`, ok: false });
+      setActiveScanType(null);
+    } finally {
+      setScanStarting(false);
+    }
+  };
+
   const handleStopScan = async () => {
     const user = getUserSession();
     if (!user) return;
@@ -667,6 +686,25 @@ export default function ItemClient({ item: initialItem }: Props) {
 
   useEffect(() => () => { if (pollRef.current) clearInterval(pollRef.current); }, []);
 
+  // Live price/RAP ticks pushed by the worker
+  useEffect(() => {
+    if (!itemId) return;
+    const source = new EventSource(`/api/ticks?assets=${itemId}`);
+    source.onmessage = (e) => {
+      const tick: { assetId: string; price: number | null; rap: number | null; ts: number } = JSON.parse(e.data);
+      setItem(prev => {
+        if (prev.currentPrice === tick.price && prev.currentRap === tick.rap) return prev;
+        return {
+          ...prev,
+          currentPrice: tick.price,
+          currentRap: tick.rap,
+          lastUpdated: new Date(tick.ts).toISOString(),
+        };
+      });
+    };
+    return () => source.close();
+  }, [itemId]);
+
   useEffect(() => { if (itemId) fetchOwners(); }, [itemId, ownerPage, ownerPageSize, ownerSort, fetchOwners]);
   useEffect(() => { if (item?.name) document.title = `${item.name} | Roblox Limited Item - Azurewrath`; }, [item]);
 
@@ -1035,6 +1073,13 @@ export default function ItemClient({ item: initialItem }: Props) {
                             : scanStarting && activeScanType === 'full' ? 'Starting…'
                               : <><svg className="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M4 4v5h.582m15.356 2A8.001 8.001 0 004.582 9m0 0H9m11 11v-5h-.581m0 0a8.003 8.003 0 01-15.357-2m15.357 2H15" /></svg>Full Scan</>}
                         </button>
+                        <button onClick={handleDeltaScan} disabled={scanning || scanStarting}
+                          className="flex items-center gap-1.5 bg-gradient-to-r from-emerald-500 to-teal-500 hover:opacity-90 disabled:opacity-50 disabled:cursor-not-allowed text-white text-xs font-bold px-3 py-1.5 rounded-lg transition">
+                          {scanning && activeScanType === 'delta'
+                            ? <><div className="w-3 h-3 border-2 border-white border-t-transparent rounded-full animate-spin" />Scanning…</>
+                            : scanStarting && activeScanType === 'delta' ? 'Starting…'
+                              : <><svg className="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M13 10V3L4 14h7v7l9-11h-7z" /></svg>Quick Rescan</>}
+                        </button>
                         {scanning && !stopRequested && (
                           <button onClick={handleStopScan} className="flex items-center gap-1 text-xs px-3 py-1.5 rounded-lg bg-red-900/30 border border-red-500/30 text-red-300 hover:bg-red-900/50 transition">
                             <svg className="w-3 h-3" fill="currentColor" viewBox="0 0 24 24"><rect x="6" y="6" width="12" height="12" rx="1" /></svg>Stop
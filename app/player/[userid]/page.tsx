@@ -95,7 +95,7 @@ async function fetchPlayerData(userid: string) {
           ARRAY_AGG(ii."scannedAt" ORDER BY ii."scannedAt" ASC) as scanned_ats,
           ARRAY_AGG(ii."uaidUpdatedAt" ORDER BY ii."scannedAt" ASC) as uaid_updated_ats,
           COALESCE(BOOL_OR(ii."isOnHold"), false) as is_on_hold
-        FROM "InventoryItem" ii
+        FROM "InventorySnapshotItem" ii
         INNER JOIN LatestSnapshot ls ON ii."snapshotId" = ls.id
         GROUP BY ii."assetId"
       )
@@ -5,12 +5,15 @@ export async function generateMetadata({ params }: { params: Promise<{ uaid: str
   const { uaid } = await params;
   try {
     const uaidBigInt = BigInt(uaid); // this can throw if uaid is invalid
-    const item = await prisma.inventoryItem.findFirst({
-      where: { userAssetId: uaidBigInt },
-      orderBy: { scannedAt: 'desc' },
-      include: { item: { select: { name: true } } },
-    });
-    const itemName = item?.item?.name ?? 'Unknown Item';
+    const rows = await prisma.$queryRaw<Array<{ name: string | null }>>`
+      SELECT i.name
+      FROM "InventorySnapshotItem" ii
+      LEFT JOIN "Item" i ON i."assetId" = ii."assetId"
+      WHERE ii."userAssetId" = ${uaidBigInt}
+      ORDER BY ii."scannedAt" DESC
+      LIMIT 1
+    `;
+    const itemName = rows[0]?.name ?? 'Unknown Item';
     return {
       title: `${itemName} | UAID ${uaid}`,
       description: `View ownership history and details for ${itemName} UAID ${uaid} on Azurewrath.`,
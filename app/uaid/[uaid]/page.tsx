@@ -75,21 +75,48 @@ export default async function UAIDPage({ params }: UAIDPageProps) {
 
   const uaidBigInt = BigInt(uaid);
 
-  const mostRecentItem = await prisma.inventoryItem.findFirst({
-    where: { userAssetId: uaidBigInt },
-    orderBy: { scannedAt: "desc" },
-    include: {
-      snapshot: { include: { user: true } },
-      item: {
-        include: {
-          priceHistory: {
-            orderBy: { timestamp: "desc" },
-            take: 1,
-          },
-        },
-      },
+  // Every snapshot row for this UAID, newest first. Read through the
+  // "InventorySnapshotItem" view so delta-encoded snapshots are included.
+  const ownershipRows = await prisma.$queryRaw<Array<{
+    userAssetId: bigint;
+    assetId: bigint;
+    serialNumber: number | null;
+    scannedAt: Date;
+    uaidCreatedAt: Date | null;
+    uaidUpdatedAt: Date | null;
+    robloxUserId: bigint | null;
+    username: string | null;
+  }>>`
+    SELECT ii."userAssetId", ii."assetId", ii."serialNumber", ii."scannedAt",
+           ii."uaidCreatedAt", ii."uaidUpdatedAt", u."robloxUserId", u.username
+    FROM "InventorySnapshotItem" ii
+    JOIN "InventorySnapshot" s ON s.id = ii."snapshotId"
+    LEFT JOIN "User" u ON u."robloxUserId" = s."userId"
+    WHERE ii."userAssetId" = ${uaidBigInt}
+    ORDER BY ii."scannedAt" DESC, s."createdAt" DESC
+  `;
+
+  const allOwnerships = ownershipRows.map((row) => ({
+    ...row,
+    snapshot: {
+      user: row.robloxUserId != null ? { robloxUserId: row.robloxUserId, username: row.username } : null,
     },
-  });
+  }));
+
+  const mostRecentItem = allOwnerships[0]
+    ? {
+        ...allOwnerships[0],
+        item: await prisma.item.findUnique({
+          where: { assetId: allOwnerships[0].assetId },
+          include: {
+            priceHistory: {
+              orderBy: { timestamp: "desc" },
+              take: 1,
+            },
+          },
+        }),
+      }
+    : null;
 
   if (!mostRecentItem) {
     return (
@@ -107,15 +134,6 @@ export default async function UAIDPage({ params }: UAIDPageProps) {
     );
   }
 
-  // Fetch all records for this UAID, ordered newest first (no distinct — we need all)
-  const allOwnerships = await prisma.inventoryItem.findMany({
-    where: { userAssetId: uaidBigInt },
-    orderBy: { scannedAt: "desc" },
-    include: {
-      snapshot: { include: { user: true } },
-    },
-  });
-
   // Step 1: keep only the most recent entry per user
   // (a user appears in many snapshots over time — we only want their latest)
   const seenUsers = new Set<string>();
@@ -0,0 +1,32 @@
+// lib/playerRanks.ts
+
+const WORKER_URL = process.env.SNIPE_SERVER_URL ?? 'http://localhost:3001';
+
+export type PlayerRanks = {
+  rapRank: number | null;
+  itemsRank: number | null;
+  uniqueRank: number | null;
+};
+
+// The worker keeps an in-memory leaderboard over every user's latest snapshot
+// (worker/player_ranks.py). Returns null if the worker is down, still loading or
+// doesn't rank this user, so callers can fall back to the database.
+export async function fetchWorkerRanks(userId: string): Promise<PlayerRanks | null> {
+  try {
+    const res = await fetch(`${WORKER_URL}/rank?userId=${encodeURIComponent(userId)}`, {
+      cache: 'no-store',
+      signal: AbortSignal.timeout(1_000),
+    });
+    if (!res.ok) return null;
+    const data = await res.json();
+    const ranks: PlayerRanks = {
+      rapRank:    data.rapRank ?? null,
+      itemsRank:  data.itemsRank ?? null,
+      uniqueRank: data.uniqueRank ?? null,
+    };
+    if (ranks.rapRank === null && ranks.itemsRank === null && ranks.uniqueRank === null) return null;
+    return ranks;
+  } catch {
+    return null;
+  }
+}
@@ -0,0 +1,52 @@
+-- Generated by `python worker/snapshot_store.py sql` — edit snapshot_store.py, not this file.
+CREATE OR REPLACE VIEW "InventorySnapshotItem" AS
+-- Full snapshots: their own rows
+SELECT ii."snapshotId", ii."assetId", ii."userAssetId", ii."scannedAt", ii."uaidCreatedAt", ii."uaidUpdatedAt", ii."isOnHold", ii."serialNumber", ii."lastSeenAt"
+FROM "InventoryItem" ii
+UNION ALL
+-- Delta snapshots: base rows no delta up to this snapshot has touched
+SELECT s.id, b."assetId", b."userAssetId", b."scannedAt", b."uaidCreatedAt", b."uaidUpdatedAt", b."isOnHold", b."serialNumber", b."lastSeenAt"
+FROM "InventorySnapshot" s
+JOIN "InventoryItem" b ON b."snapshotId" = s."baseSnapshotId"
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM "InventoryItemDelta" d
+    JOIN "InventorySnapshot" ds ON ds.id = d."snapshotId"
+    WHERE d."userAssetId" = b."userAssetId"
+      AND ds."baseSnapshotId" = s."baseSnapshotId"
+      AND ds."createdAt" <= s."createdAt"
+)
+UNION ALL
+-- Delta snapshots: the latest change per UAID up to this snapshot, when it is an add
+SELECT s.id, d."assetId", d."userAssetId", d."scannedAt", d."uaidCreatedAt", d."uaidUpdatedAt", d."isOnHold", d."serialNumber", d."lastSeenAt"
+FROM "InventorySnapshot" s
+JOIN "InventorySnapshot" ds
+  ON ds."baseSnapshotId" = s."baseSnapshotId" AND ds."createdAt" <= s."createdAt"
+JOIN "InventoryItemDelta" d ON d."snapshotId" = ds.id
+WHERE d.op = 'add'
+  AND NOT EXISTS (
+    SELECT 1
+    FROM "InventoryItemDelta" d2
+    JOIN "InventorySnapshot" ds2 ON ds2.id = d2."snapshotId"
+    WHERE d2."userAssetId" = d."userAssetId"
+      AND ds2."baseSnapshotId" = s."baseSnapshotId"
+      AND ds2."createdAt" > ds."createdAt"
+      AND ds2."createdAt" <= s."createdAt"
+  );
+
+CREATE OR REPLACE FUNCTION inventory_snapshot_items(snap_id text)
+RETURNS SETOF "InventorySnapshotItem" AS $$
+    SELECT * FROM "InventorySnapshotItem" WHERE "snapshotId" = snap_id
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION inventory_items_at(user_id bigint, at timestamp)
+RETURNS SETOF "InventorySnapshotItem" AS $$
+    SELECT * FROM "InventorySnapshotItem"
+    WHERE "snapshotId" = (
+        SELECT id FROM "InventorySnapshot"
+        WHERE "userId" = user_id AND "createdAt" <= at
+        ORDER BY "createdAt" DESC
+        LIMIT 1
+    )
+$$ LANGUAGE sql STABLE;
+
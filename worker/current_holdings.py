@@ -0,0 +1,339 @@
+# worker/current_holdings.py
+"""
+──────────────────────
+"CurrentHolding" read model — one row per UAID in each user's LATEST
+inventory snapshot.
+
+The owners / hoards / owner-count queries used to work out "latest
+snapshot per user" over all of InventorySnapshot × InventoryItem on every
+request. Instead, save_inventory_snapshot() keeps this table in step with
+the diff it already computes (new_uaids / removed_uaids), inside the same
+transaction as the snapshot write, and the UAID timestamp backfills
+mirror "uaidUpdatedAt" here. Per-asset reads are then plain lookups on
+("assetId", ...) indexes.
+
+Helpers below take an open cursor and never commit — the caller owns the
+transaction.
+
+Command line:
+    python current_holdings.py rebuild              # whole table from snapshot items
+    python current_holdings.py rebuild --user 1234  # one user
+    python current_holdings.py bench --rows 50000000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import psycopg2
+import psycopg2.extras
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+
+# Latest snapshot per user → its items; the exact set this table mirrors.
+# Read through the view so delta snapshots (snapshot_store.py) resolve too.
+_LATEST_ITEMS_SQL = """
+    SELECT s."userId", ii."assetId", ii."userAssetId", ii."serialNumber",
+           ii."scannedAt", ii."uaidUpdatedAt"
+    FROM (
+        SELECT DISTINCT ON ("userId") id, "userId"
+        FROM "InventorySnapshot"
+        {where}
+        ORDER BY "userId", "createdAt" DESC
+    ) s
+    INNER JOIN "InventorySnapshotItem" ii ON ii."snapshotId" = s.id
+"""
+
+
+def get_conn():
+    return psycopg2.connect(DATABASE_URL)
+
+
+# ─── Incremental maintenance (called from inventory_scanner) ───────────────
+
+def add_holdings(cur, user_id, items, scanned_at):
+    """`items` are scanner item dicts (asset_id, user_asset_id, serial_number, ...)."""
+    if not items:
+        return
+    psycopg2.extras.execute_values(cur, """
+        INSERT INTO "CurrentHolding"
+            ("userId", "assetId", "userAssetId", "serialNumber", "scannedAt", "uaidUpdatedAt")
+        VALUES %s
+        ON CONFLICT ("userId", "userAssetId") DO NOTHING
+    """, [(
+        user_id,
+        item['asset_id'],
+        item['user_asset_id'],
+        item.get('serial_number'),
+        item.get('scanned_at') or scanned_at,
+        item.get('uaid_updated_at'),
+    ) for item in items], page_size=len(items))
+
+
+def remove_holdings(cur, user_id, user_asset_ids):
+    if not user_asset_ids:
+        return
+    cur.execute("""
+        DELETE FROM "CurrentHolding"
+        WHERE "userId" = %s AND "userAssetId" = ANY(%s)
+    """, (user_id, [int(u) for u in user_asset_ids]))
+
+
+def set_holding_updated_at(cur, user_asset_id, uaid_updated_at, user_id=None):
+    """Mirror an InventoryItem "uaidUpdatedAt" write. No user_id = every holder of the UAID."""
+    if user_id is None:
+        cur.execute("""
+            UPDATE "CurrentHolding" SET "uaidUpdatedAt" = %s
+            WHERE "userAssetId" = %s
+        """, (uaid_updated_at, user_asset_id))
+    else:
+        cur.execute("""
+            UPDATE "CurrentHolding" SET "uaidUpdatedAt" = %s
+            WHERE "userId" = %s AND "userAssetId" = %s
+        """, (uaid_updated_at, user_id, user_asset_id))
+
+
+def set_holdings_updated_at_bulk(cur, rows):
+    """
+    set_holding_updated_at() for a whole owners page in one statement:
+    `rows` are (user_asset_id, uaid_updated_at, user_id or None).
+    """
+    if not rows:
+        return
+    psycopg2.extras.execute_values(cur, """
+        UPDATE "CurrentHolding" h SET "uaidUpdatedAt" = v.updated_at
+        FROM (VALUES %s) AS v (user_asset_id, updated_at, user_id)
+        WHERE h."userAssetId" = v.user_asset_id
+          AND (v.user_id IS NULL OR h."userId" = v.user_id)
+    """, rows, template='(%s::bigint, %s::timestamp, %s::bigint)', page_size=len(rows))
+
+
+# ─── Rebuild ───────────────────────────────────────────────────────────────
+
+def rebuild_current_holdings(conn, user_id=None):
+    """
+    Recompute the table (or one user's rows) from InventorySnapshot /
+    InventoryItem. Needed once after the table is created, and any time
+    snapshots are written by something other than the scanner.
+    """
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        if user_id is None:
+            # Blocks scanner writes to CurrentHolding until commit; their
+            # diffs apply on top of the rebuilt rows afterwards.
+            cur.execute('TRUNCATE "CurrentHolding"')
+            cur.execute(f"""
+                INSERT INTO "CurrentHolding"
+                    ("userId", "assetId", "userAssetId", "serialNumber", "scannedAt", "uaidUpdatedAt")
+                {_LATEST_ITEMS_SQL.format(where='')}
+                ON CONFLICT DO NOTHING
+            """)
+        else:
+            cur.execute('DELETE FROM "CurrentHolding" WHERE "userId" = %s', (user_id,))
+            cur.execute(f"""
+                INSERT INTO "CurrentHolding"
+                    ("userId", "assetId", "userAssetId", "serialNumber", "scannedAt", "uaidUpdatedAt")
+                {_LATEST_ITEMS_SQL.format(where='WHERE "userId" = %s')}
+                ON CONFLICT DO NOTHING
+            """, (user_id,))
+        rows = cur.rowcount
+    conn.commit()
+
+    scope = f"[userId {user_id}]" if user_id is not None else "all users"
+    logger.info(f"[current_holdings] ♻️ Rebuilt {rows} holding(s) for {scope} in {time.perf_counter() - started:.1f}s")
+    return rows
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+BENCH_SCHEMA = 'bench_holdings'
+
+_OLD_QUERIES = {
+    'owners count': """
+        SELECT COUNT(*) FROM (
+            SELECT ROW_NUMBER() OVER (PARTITION BY s."userId" ORDER BY s."createdAt" DESC) AS rn
+            FROM "InventoryItem" ii
+            INNER JOIN "InventorySnapshot" s ON s.id = ii."snapshotId"
+            WHERE ii."assetId" = %(asset)s
+        ) r WHERE r.rn = 1
+    """,
+    'owners page': """
+        SELECT r."userAssetId", r."serialNumber", r."userId" FROM (
+            SELECT ii."userAssetId", ii."serialNumber", s."userId",
+                   ROW_NUMBER() OVER (PARTITION BY s."userId" ORDER BY s."createdAt" DESC) AS rn
+            FROM "InventoryItem" ii
+            INNER JOIN "InventorySnapshot" s ON s.id = ii."snapshotId"
+            WHERE ii."assetId" = %(asset)s
+        ) r WHERE r.rn = 1
+        ORDER BY r."serialNumber" ASC NULLS LAST, r."userAssetId" ASC
+        LIMIT 25
+    """,
+    'hoards': """
+        WITH LatestSnapshots AS (
+            SELECT DISTINCT ON ("userId") id, "userId"
+            FROM "InventorySnapshot"
+            ORDER BY "userId", "createdAt" DESC
+        )
+        SELECT ls."userId", COUNT(*) FROM "InventoryItem" ii
+        INNER JOIN LatestSnapshots ls ON ii."snapshotId" = ls.id
+        WHERE ii."assetId" = %(asset)s
+        GROUP BY ls."userId" HAVING COUNT(*) >= 2
+    """,
+}
+
+_NEW_QUERIES = {
+    'owners count': """
+        SELECT COUNT(DISTINCT "userId") FROM "CurrentHolding" WHERE "assetId" = %(asset)s
+    """,
+    'owners page': """
+        SELECT * FROM (
+            SELECT DISTINCT ON ("userId") "userAssetId", "serialNumber", "userId"
+            FROM "CurrentHolding"
+            WHERE "assetId" = %(asset)s
+            ORDER BY "userId", "serialNumber" ASC NULLS LAST, "userAssetId" ASC
+        ) r
+        ORDER BY r."serialNumber" ASC NULLS LAST, r."userAssetId" ASC
+        LIMIT 25
+    """,
+    'hoards': """
+        SELECT "userId", COUNT(*) FROM "CurrentHolding"
+        WHERE "assetId" = %(asset)s
+        GROUP BY "userId" HAVING COUNT(*) >= 2
+    """,
+}
+
+
+def _seed_bench_schema(conn, rows, snapshots_per_user, items_per_snapshot, assets):
+    users = max(1, rows // (snapshots_per_user * items_per_snapshot))
+    logger.info(f"[current_holdings] Seeding {users:,} users × {snapshots_per_user} snapshots × "
+                f"{items_per_snapshot} items = {users * snapshots_per_user * items_per_snapshot:,} InventoryItem rows")
+
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+        cur.execute(f'CREATE SCHEMA {BENCH_SCHEMA}')
+        cur.execute(f'SET search_path TO {BENCH_SCHEMA}')
+        cur.execute("""
+            CREATE TABLE "InventorySnapshot" (
+                id text PRIMARY KEY, "userId" bigint NOT NULL, "createdAt" timestamp NOT NULL
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE "InventoryItem" (
+                "snapshotId" text NOT NULL, "assetId" bigint NOT NULL, "userAssetId" bigint NOT NULL,
+                "serialNumber" int, "scannedAt" timestamp NOT NULL, "uaidUpdatedAt" timestamp,
+                PRIMARY KEY ("snapshotId", "userAssetId")
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE "CurrentHolding" (
+                "userId" bigint NOT NULL, "assetId" bigint NOT NULL, "userAssetId" bigint NOT NULL,
+                "serialNumber" int, "scannedAt" timestamp NOT NULL, "uaidUpdatedAt" timestamp,
+                PRIMARY KEY ("userId", "userAssetId")
+            )
+        """)
+        conn.commit()
+
+        cur.execute("""
+            INSERT INTO "InventorySnapshot"
+            SELECT 'u' || u || '_' || d, u, NOW() - make_interval(days => d)
+            FROM generate_series(1, %s) u, generate_series(0, %s - 1) d
+        """, (users, snapshots_per_user))
+        # Skewed asset popularity (cubed uniform → low ids are hot), stable
+        # UAIDs per (user, slot) so consecutive snapshots mostly overlap
+        cur.execute("""
+            INSERT INTO "InventoryItem"
+            SELECT 'u' || u || '_' || d,
+                   1 + floor(%s * power(((u * 2654435761 + k * 40503) %% 1000003) / 1000003.0, 3))::bigint,
+                   u::bigint * 1000 + k + CASE WHEN d > 0 AND k <= 2 THEN 500 ELSE 0 END,
+                   (u + k) %% 10000,
+                   NOW() - make_interval(days => d),
+                   NULL
+            FROM generate_series(1, %s) u, generate_series(0, %s - 1) d, generate_series(1, %s) k
+        """, (assets, users, snapshots_per_user, items_per_snapshot))
+        conn.commit()
+
+        cur.execute('CREATE INDEX ON "InventorySnapshot" ("userId", "createdAt")')
+        cur.execute('CREATE INDEX ON "InventoryItem" ("snapshotId")')
+        cur.execute('CREATE INDEX ON "InventoryItem" ("assetId", "snapshotId")')
+        # Full snapshots only here, so the item view is the table itself
+        cur.execute('CREATE VIEW "InventorySnapshotItem" AS SELECT * FROM "InventoryItem"')
+        conn.commit()
+
+    rebuild_current_holdings(conn)
+    with conn.cursor() as cur:
+        cur.execute('CREATE INDEX ON "CurrentHolding" ("assetId", "userId")')
+        cur.execute('CREATE INDEX ON "CurrentHolding" ("assetId", "serialNumber", "userAssetId")')
+        cur.execute('ANALYZE')
+    conn.commit()
+
+
+def _time_query(conn, sql, params, repeats):
+    best = None
+    with conn.cursor() as cur:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            cur.execute(sql, params)
+            cur.fetchall()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(conn, rows, snapshots_per_user=5, items_per_snapshot=40, assets=2000,
+                  repeats=3, keep=False):
+    """Seed a throwaway schema with `rows` InventoryItem rows and time old vs new queries."""
+    _seed_bench_schema(conn, rows, snapshots_per_user, items_per_snapshot, assets)
+
+    with conn.cursor() as cur:
+        cur.execute('SELECT "assetId", COUNT(*) FROM "CurrentHolding" GROUP BY 1 ORDER BY 2 DESC LIMIT 1')
+        hot_asset, hot_count = cur.fetchone()
+        cur.execute('SELECT "assetId", COUNT(*) FROM "CurrentHolding" GROUP BY 1 ORDER BY 2 ASC LIMIT 1')
+        cold_asset, cold_count = cur.fetchone()
+
+    print(f"{'query':<14} {'asset':>18} {'old (ms)':>10} {'new (ms)':>10}")
+    for label, asset, held in (('hot', hot_asset, hot_count), ('cold', cold_asset, cold_count)):
+        for name in _OLD_QUERIES:
+            old = _time_query(conn, _OLD_QUERIES[name], {'asset': asset}, repeats)
+            new = _time_query(conn, _NEW_QUERIES[name], {'asset': asset}, repeats)
+            print(f"{name:<14} {f'{label} ({held:,})':>18} {old * 1000:>10.1f} {new * 1000:>10.1f}")
+
+    if not keep:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA {BENCH_SCHEMA} CASCADE')
+        conn.commit()
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Maintain the "CurrentHolding" read model')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rebuild = sub.add_parser('rebuild', help='recompute from InventorySnapshot / InventoryItem')
+    rebuild.add_argument('--user', type=int, help='only this robloxUserId')
+
+    bench = sub.add_parser('bench', help=f'old vs new queries on synthetic data (schema {BENCH_SCHEMA})')
+    bench.add_argument('--rows', type=int, default=50_000_000)
+    bench.add_argument('--snapshots-per-user', type=int, default=5)
+    bench.add_argument('--items-per-snapshot', type=int, default=40)
+    bench.add_argument('--assets', type=int, default=2000)
+    bench.add_argument('--keep', action='store_true', help='leave the bench schema in place')
+
+    args = parser.parse_args(argv)
+    conn = get_conn()
+    try:
+        if args.command == 'rebuild':
+            rebuild_current_holdings(conn, args.user)
+        else:
+            run_benchmark(conn, args.rows, args.snapshots_per_user, args.items_per_snapshot,
+                          args.assets, keep=args.keep)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
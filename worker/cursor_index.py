@@ -0,0 +1,287 @@
+# worker/cursor_index.py
+"""
+──────────────────────
+In-process index over "UaidCursorCache": owners-API cursors per asset,
+looked up by UAID with bisect instead of a query per lookup, and saved
+write-behind instead of an INSERT + commit per page fetched.
+
+A cached row (cursor, lastUaid, pageNum) means "fetching `cursor` returns
+the page ending at lastUaid". The cursor's prefix is the last UAID of the
+page before it, so each row also gives the page's start; the index keeps
+every asset's rows sorted by that start:
+
+    cursor_index.lookup(conn, asset_id, target_uaid)
+        -> (cursor, pageNum, startUaid) of the cached page starting closest
+           below target_uaid, or (None, 0, None)
+    cursor_index.save(asset_id, cursor, last_uaid, page_num)
+    cursor_index.partition(conn, asset_id, parts, min_pages)
+        -> cached cursors splitting the asset's pages into `parts` UAID
+           ranges of similar page count (sharded owners scans)
+    cursor_index.seek_page(conn, asset_id, page_num)
+        -> the cached cursor nearest page_num from below (delta owners scans)
+
+An asset's rows are loaded from the DB on its first lookup (using the
+caller's connection), and the least recently used assets are dropped past
+MAX_ASSETS. save() updates the index immediately and queues the row; the
+flusher thread (start_cursor_index) writes queued rows in batches every
+FLUSH_INTERVAL seconds or once FLUSH_BATCH are waiting. Rows still queued
+at shutdown are lost — they are a cache, and the next walk saves them again.
+
+Benchmark (in-memory lookups, no DB needed):
+
+    python cursor_index.py bench --pages 20000 --lookups 200000
+"""
+
+import argparse
+import bisect
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import psycopg2.extras
+
+from db_pool import pooled
+
+logger = logging.getLogger(__name__)
+
+MAX_ASSETS = 2000
+FLUSH_INTERVAL = 2.0
+FLUSH_BATCH = 500
+
+
+def cursor_start(cursor):
+    """The UAID a cursor's page starts after: 0 for the first page, None if unparsable."""
+    if cursor is None:
+        return 0
+    head = cursor.split('_', 1)[0]
+    return int(head) if head.isdigit() else None
+
+
+class _AssetCursors:
+    __slots__ = ('starts', 'rows', 'last_uaids')
+
+    def __init__(self):
+        self.starts = []       # sorted page starts
+        self.rows = []         # (cursor, pageNum, lastUaid), parallel to starts
+        self.last_uaids = set()
+
+    def add(self, cursor, page_num, last_uaid):
+        if last_uaid in self.last_uaids:
+            return False
+        self.last_uaids.add(last_uaid)
+        start = cursor_start(cursor)
+        if start is not None:
+            i = bisect.bisect_left(self.starts, start)
+            self.starts.insert(i, start)
+            self.rows.insert(i, (cursor, page_num, last_uaid))
+        return True
+
+    def lookup(self, target_uaid):
+        i = bisect.bisect_left(self.starts, target_uaid) - 1
+        if i < 0:
+            return None, 0, None
+        cursor, page_num, _ = self.rows[i]
+        return cursor, page_num, self.starts[i]
+
+
+class CursorIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assets: OrderedDict[int, _AssetCursors] = OrderedDict()
+        self._loading: dict[int, threading.Lock] = {}
+        self._queue = []
+        self._wake = threading.Event()
+        self.lookups = 0
+        self.loads = 0
+        self.flushed = 0
+
+    def _asset(self, conn, asset_id):
+        with self._lock:
+            cursors = self._assets.get(asset_id)
+            if cursors is not None:
+                self._assets.move_to_end(asset_id)
+                return cursors
+            load_lock = self._loading.setdefault(asset_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if asset_id in self._assets:
+                    return self._assets[asset_id]
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT cursor, "pageNum", "lastUaid" FROM "UaidCursorCache"
+                    WHERE "assetId" = %s
+                """, (asset_id,))
+                rows = cur.fetchall()
+            conn.commit()
+
+            cursors = _AssetCursors()
+            for cursor, page_num, last_uaid in rows:
+                cursors.add(cursor, page_num, int(last_uaid))
+            with self._lock:
+                # Rows saved for this asset but not flushed yet
+                for queued_asset, cursor, last_uaid, page_num in self._queue:
+                    if queued_asset == asset_id:
+                        cursors.add(cursor, page_num, last_uaid)
+                self._assets[asset_id] = cursors
+                self._loading.pop(asset_id, None)
+                self.loads += 1
+                while len(self._assets) > MAX_ASSETS:
+                    self._assets.popitem(last=False)
+            return cursors
+
+    def lookup(self, conn, asset_id, target_uaid):
+        cursors = self._asset(conn, int(asset_id))
+        with self._lock:
+            self.lookups += 1
+            return cursors.lookup(int(target_uaid))
+
+    def seek_page(self, conn, asset_id, page_num):
+        """
+        The cached page with the highest pageNum not above page_num, as
+        (cursor, pageNum, startUaid), or (None, 0, None).
+        """
+        cursors = self._asset(conn, int(asset_id))
+        best = (None, 0, None)
+        with self._lock:
+            for start, (cursor, num, _) in zip(cursors.starts, cursors.rows):
+                if num <= page_num and (best[2] is None or num > best[1]):
+                    best = (cursor, num, start)
+        return best
+
+    def partition(self, conn, asset_id, parts, min_pages):
+        """
+        Up to parts - 1 cached cursors that split the asset's owners pages
+        into runs of about equal page count (by pageNum), as
+        (cursor, pageNum, startUaid) in UAID order. Fewer — possibly none —
+        when the cache knows fewer than min_pages pages per run.
+        """
+        cursors = self._asset(conn, int(asset_id))
+        with self._lock:
+            rows = sorted(
+                (page_num, start, cursor)
+                for start, (cursor, page_num, _) in zip(cursors.starts, cursors.rows)
+                if start > 0
+            )
+        if not rows:
+            return []
+        known_pages = rows[-1][0] + 1
+        parts = min(parts, known_pages // min_pages)
+        page_nums = [row[0] for row in rows]
+
+        bounds = []
+        for k in range(1, parts):
+            i = bisect.bisect_left(page_nums, known_pages * k // parts)
+            if i == len(rows):
+                break
+            page_num, start, cursor = rows[i]
+            if not bounds or start > bounds[-1][2]:
+                bounds.append((cursor, page_num, start))
+        return bounds
+
+    def save(self, asset_id, cursor, last_uaid, page_num):
+        asset_id, last_uaid = int(asset_id), int(last_uaid)
+        with self._lock:
+            cursors = self._assets.get(asset_id)
+            if cursors is not None and not cursors.add(cursor, page_num, last_uaid):
+                return
+            self._queue.append((asset_id, cursor, last_uaid, page_num))
+            if len(self._queue) >= FLUSH_BATCH:
+                self._wake.set()
+
+    def flush(self, conn):
+        with self._lock:
+            batch, self._queue = self._queue, []
+        if not batch:
+            return 0
+        try:
+            with conn.cursor() as cur:
+                psycopg2.extras.execute_values(cur, """
+                    INSERT INTO "UaidCursorCache" (id, "assetId", cursor, "lastUaid", "pageNum", "updatedAt")
+                    VALUES %s
+                    ON CONFLICT ("assetId", "lastUaid") DO NOTHING
+                """, [(f'c{uuid.uuid4().hex}', a, c, l, p) for a, c, l, p in batch],
+                    template='(%s, %s, %s, %s, %s, NOW())', page_size=len(batch))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            with self._lock:
+                self._queue[:0] = batch
+            raise
+        with self._lock:
+            self.flushed += len(batch)
+        return len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'assets': len(self._assets),
+                'cursors': sum(len(c.last_uaids) for c in self._assets.values()),
+                'lookups': self.lookups,
+                'loads': self.loads,
+                'queued': len(self._queue),
+                'flushed': self.flushed,
+            }
+
+
+cursor_index = CursorIndex()
+
+
+def _flush_loop():
+    while True:
+        cursor_index._wake.wait(FLUSH_INTERVAL)
+        cursor_index._wake.clear()
+        try:
+            with pooled('scanner') as conn:
+                cursor_index.flush(conn)
+        except Exception as e:
+            logger.warning(f"[cursor_index] Flush failed, will retry: {e}")
+            time.sleep(FLUSH_INTERVAL)
+
+
+def start_cursor_index():
+    threading.Thread(target=_flush_loop, daemon=True).start()
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+def run_benchmark(pages, lookups):
+    rng = random.Random(1)
+    uaids = sorted(rng.sample(range(1, pages * 1000), pages * 100))
+    cursors = _AssetCursors()
+    previous = None
+    for page_num in range(pages):
+        last = uaids[page_num * 100 + 99]
+        cursors.add(f'{previous}_x' if previous else None, page_num, last)
+        previous = last
+
+    index = CursorIndex()
+    index._assets[1] = cursors
+    targets = [rng.choice(uaids) for _ in range(lookups)]
+
+    started = time.perf_counter()
+    for target in targets:
+        index.lookup(None, 1, target)
+    elapsed = time.perf_counter() - started
+    print(f"{pages} cached pages, {lookups} lookups: {elapsed / lookups * 1e6:.2f} µs per lookup")
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='In-memory UaidCursorCache index')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='time in-memory cursor lookups')
+    bench.add_argument('--pages', type=int, default=20000, help='cached pages for the asset')
+    bench.add_argument('--lookups', type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    run_benchmark(args.pages, args.lookups)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
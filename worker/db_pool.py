@@ -0,0 +1,266 @@
+# worker/db_pool.py
+"""
+──────────────────────
+One Postgres connection pool for the whole worker process.
+
+Every component checks connections out of a single ThreadedConnectionPool
+instead of opening its own (the scanner used to psycopg2.connect() for
+every 2s claim poll, job and Phase 2 thread):
+
+    with pooled('scanner') as conn:
+        ...
+
+    conn = getconn('main')      # paired with putconn(conn)
+
+Each component has its own limit (COMPONENT_LIMITS, overridable with
+DB_POOL_LIMITS="scanner=20,main=6"); a checkout beyond it waits on that
+component's semaphore rather than starving the others. The pool's maxconn
+is the sum of the limits, so the underlying pool itself never runs dry.
+Components whose peak depends on configuration size themselves at import
+with size_component() — the scanner from its cookie and slot counts — so
+operators don't have to; DB_POOL_LIMITS still wins when it names them.
+
+Health checks: closed connections are replaced on checkout, and one that
+sat idle for more than HEALTH_CHECK_IDLE seconds is pinged with SELECT 1
+first. On return, open transactions are rolled back and autocommit reset,
+so the next user always gets a clean session.
+
+pool_stats() reports per-component checkouts, wait time and utilization;
+the snipe server serves it as  GET /pool  and it is logged every
+STATS_LOG_INTERVAL seconds.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+
+COMPONENT_LIMITS = {
+    'main': 4,           # price cycle, manipulation detector, thumbnail refresh
+    'scanner': 16,       # resized from cookies × slots by inventory_scanner
+    'snipe_server': 2,   # shared deal poller
+    'live': 2,           # leaderboard load, live value persistence
+    'default': 2,
+}
+
+HEALTH_CHECK_IDLE = 30
+STATS_LOG_INTERVAL = 60
+
+
+def _parse_limits(spec):
+    """COMPONENT_LIMITS with the DB_POOL_LIMITS overrides applied, plus the overridden names."""
+    limits = dict(COMPONENT_LIMITS)
+    overridden = set()
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        name, _, value = part.partition('=')
+        try:
+            limits[name.strip()] = max(1, int(value))
+            overridden.add(name.strip())
+        except ValueError:
+            logger.warning(f"[db_pool] Ignoring bad DB_POOL_LIMITS entry {part!r}")
+    return limits, overridden
+
+
+class _ComponentStats:
+    __slots__ = ('limit', 'in_use', 'peak', 'checkouts', 'wait_total', 'wait_max', 'waited', 'replaced')
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waited = 0      # checkouts that found the component at its limit
+        self.replaced = 0    # connections discarded by health checks
+
+
+class DBPool:
+    def __init__(self, dsn, limits, overridden=()):
+        self._dsn = dsn
+        self._limits = limits
+        self._overridden = set(overridden)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = {name: threading.BoundedSemaphore(n) for name, n in limits.items()}
+        self._stats = {name: _ComponentStats(n) for name, n in limits.items()}
+        # id(conn) -> component holding it / monotonic time it was returned
+        self._owner = {}
+        self._idle_since = {}
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(1, sum(self._limits.values()), self._dsn)
+                    logger.info(f"[db_pool] ✅ Pool ready — max {sum(self._limits.values())} connection(s): "
+                                + ', '.join(f'{k}={v}' for k, v in self._limits.items()))
+        return self._pool
+
+    def size_component(self, name, limit):
+        """
+        Set a component's limit from configuration. Ignored when DB_POOL_LIMITS
+        names the component, and too late once the pool is open.
+        """
+        with self._lock:
+            if name in self._overridden:
+                return
+            if self._pool is not None:
+                logger.warning(f"[db_pool] Pool already open — {name} stays at {self._limits.get(name)}")
+                return
+            self._limits[name] = limit
+            self._slots[name] = threading.BoundedSemaphore(limit)
+            self._stats[name] = _ComponentStats(limit)
+
+    def _component(self, name):
+        return name if name in self._slots else 'default'
+
+    def getconn(self, component):
+        component = self._component(component)
+        pool = self._ensure_pool()
+        slots = self._slots[component]
+        stats = self._stats[component]
+
+        started = time.perf_counter()
+        contended = not slots.acquire(blocking=False)
+        if contended:
+            slots.acquire()
+
+        try:
+            conn = self._healthy_conn(pool, stats)
+        except Exception:
+            slots.release()
+            raise
+
+        waited = time.perf_counter() - started
+        with self._lock:
+            stats.checkouts += 1
+            stats.in_use += 1
+            stats.peak = max(stats.peak, stats.in_use)
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+            stats.waited += contended
+            self._owner[id(conn)] = component
+        return conn
+
+    def _healthy_conn(self, pool, stats):
+        while True:
+            conn = pool.getconn()
+            idle_since = self._idle_since.pop(id(conn), None)
+            if not conn.closed and (idle_since is None or time.monotonic() - idle_since < HEALTH_CHECK_IDLE):
+                return conn
+            if not conn.closed:
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute('SELECT 1')
+                    conn.rollback()
+                    return conn
+                except psycopg2.Error:
+                    pass
+            logger.warning("[db_pool] Discarding dead connection")
+            with self._lock:
+                stats.replaced += 1
+            pool.putconn(conn, close=True)
+
+    def putconn(self, conn, close=False):
+        component = self._owner.pop(id(conn), 'default')
+        if not conn.closed and not close:
+            try:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except psycopg2.Error:
+                close = True
+        close = close or bool(conn.closed)
+        if not close:
+            self._idle_since[id(conn)] = time.monotonic()
+        self._pool.putconn(conn, close=close)
+
+        with self._lock:
+            self._stats[component].in_use -= 1
+        self._slots[component].release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'limit': s.limit,
+                    'inUse': s.in_use,
+                    'peak': s.peak,
+                    'utilization': round(s.in_use / s.limit, 3),
+                    'checkouts': s.checkouts,
+                    'waited': s.waited,
+                    'waitAvgMs': round(s.wait_total / s.checkouts * 1000, 2) if s.checkouts else 0.0,
+                    'waitMaxMs': round(s.wait_max * 1000, 2),
+                    'replaced': s.replaced,
+                }
+                for name, s in self._stats.items()
+            }
+
+
+db_pool = DBPool(DATABASE_URL, *_parse_limits(os.getenv('DB_POOL_LIMITS', '')))
+
+
+def init_pool():
+    """Open the pool now (startup) so a bad DATABASE_URL fails fast."""
+    db_pool._ensure_pool()
+    threading.Thread(target=_stats_log_loop, daemon=True).start()
+
+
+def size_component(component, limit):
+    db_pool.size_component(component, limit)
+
+
+def getconn(component):
+    return db_pool.getconn(component)
+
+
+def putconn(conn, close=False):
+    db_pool.putconn(conn, close=close)
+
+
+@contextmanager
+def pooled(component):
+    """Check a connection out for the duration of the block."""
+    conn = db_pool.getconn(component)
+    broken = False
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        db_pool.putconn(conn, close=broken)
+
+
+def dedicated_conn():
+    """
+    A connection outside the pool, for sessions that keep state for their
+    whole life (LISTEN) and must never be handed to another component.
+    """
+    return psycopg2.connect(DATABASE_URL)
+
+
+def pool_stats():
+    return db_pool.stats()
+
+
+def _stats_log_loop():
+    while True:
+        time.sleep(STATS_LOG_INTERVAL)
+        busy = [
+            f"{name} {s['inUse']}/{s['limit']} (peak {s['peak']}, wait avg {s['waitAvgMs']}ms max {s['waitMaxMs']}ms)"
+            for name, s in pool_stats().items() if s['checkouts']
+        ]
+        if busy:
+            logger.info("[db_pool] 📊 " + ' | '.join(busy))
@@ -0,0 +1,154 @@
+# worker/deals_board.py
+"""
+──────────────────────
+In-memory deals leaderboard, rebuilt from every committed price cycle.
+
+process_items_batch() already works out the discount of every item each
+cycle; main.py hands the results here via
+    update_deals_board(results, current_time)
+and the snipe server serves the board as  GET /deals  — compact JSON with
+an ETag, so the Next.js /api/deals route is a cache hit instead of a
+lateral-join query over PriceHistory.
+
+The board is a list sorted by deal % (desc). Views are filtered by
+price band and manipulated flag:
+    /deals?minPrice=100&maxPrice=5000&manipulated=exclude|include|only&limit=100
+Each distinct view is serialised once per board version.
+
+At startup main.py seeds each item's "last changed" time from its latest
+PriceHistory row (seed_changed_at), and after manipulation detection runs
+it hands over the fresh flags (refresh_manipulated), so the board doesn't
+wait a cycle to pick them up.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Max distinct filtered views cached per board version
+VIEW_CACHE_SIZE = 64
+
+_lock = threading.Lock()
+
+# Sorted by percent desc — each entry is the dict served to clients
+_board: list[dict] = []
+_version = 0
+
+# assetId -> ISO timestamp of the last price/RAP change seen by this process
+_changed_at: dict[int, str] = {}
+
+# (version, filters) -> (body bytes, etag)
+_views: dict[tuple, tuple[bytes, str]] = {}
+
+
+def update_deals_board(results: list[dict], current_time):
+    """Rebuild the board from process_items_data() results."""
+    global _board, _version, _views
+
+    now_iso = current_time.isoformat(timespec='milliseconds') + 'Z'
+    board = []
+
+    for r in results:
+        asset_id = r['asset_id']
+        if r['is_first_seen'] or r['price_changed'] or r['rap_changed'] or asset_id not in _changed_at:
+            _changed_at[asset_id] = now_iso
+
+        discount = r.get('discount')
+        if discount is None or discount <= 0:
+            continue
+
+        board.append({
+            'assetId': str(asset_id),
+            'name': r['name'],
+            'imageUrl': r.get('image_url'),
+            'manipulated': bool(r.get('manipulated')),
+            'percent': round(discount),
+            'rap': r['rap'],
+            'bestPrice': r['price'],
+            'timestamp': _changed_at[asset_id],
+            '_deal': discount,
+        })
+
+    board.sort(key=lambda d: d['_deal'], reverse=True)
+
+    with _lock:
+        _board = board
+        _version += 1
+        _views = {}
+
+    logger.info(f"[deals_board] 🏆 {len(board)} deals on the board (v{_version})")
+
+
+def seed_changed_at(timestamps: dict):
+    """Seed last-change times from {assetId: latest PriceHistory timestamp} (naive UTC)."""
+    for asset_id, ts in timestamps.items():
+        if ts is not None:
+            _changed_at.setdefault(int(asset_id), ts.isoformat(timespec='milliseconds') + 'Z')
+
+
+def refresh_manipulated(flags: dict):
+    """Apply {assetId: manipulated} to the current board; bumps the version if any flag changed."""
+    global _board, _version, _views
+
+    with _lock:
+        changed = 0
+        board = []
+        for d in _board:
+            flag = flags.get(int(d['assetId']))
+            if flag is not None and bool(flag) != d['manipulated']:
+                d = {**d, 'manipulated': bool(flag)}
+                changed += 1
+            board.append(d)
+        if changed:
+            _board = board
+            _version += 1
+            _views = {}
+
+    if changed:
+        logger.info(f"[deals_board] 🚩 {changed} manipulated flag(s) updated (v{_version})")
+
+
+def get_deals_view(min_price=None, max_price=None, manipulated='exclude', limit=None):
+    """
+    Return (body bytes, etag) for a filtered view of the board.
+    `manipulated` is 'exclude' (default, like /api/deals), 'include' or 'only'.
+    """
+    key = (min_price, max_price, manipulated, limit)
+
+    with _lock:
+        board, version = _board, _version
+        cached = _views.get((version, key))
+    if cached:
+        return cached
+
+    deals = []
+    for d in board:
+        if manipulated == 'exclude' and d['manipulated']:
+            continue
+        if manipulated == 'only' and not d['manipulated']:
+            continue
+        if min_price is not None and d['bestPrice'] < min_price:
+            continue
+        if max_price is not None and d['bestPrice'] > max_price:
+            continue
+        deals.append({k: v for k, v in d.items() if k != '_deal'})
+        if limit is not None and len(deals) >= limit:
+            break
+
+    body = json.dumps(deals, separators=(',', ':')).encode('utf-8')
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+    with _lock:
+        if version == _version:
+            if len(_views) >= VIEW_CACHE_SIZE:
+                _views.clear()
+            _views[(version, key)] = (body, etag)
+
+    return body, etag
+
+
+def board_ready() -> bool:
+    return _version > 0
@@ -0,0 +1,243 @@
+# worker/http_client.py
+"""
+──────────────────────
+Shared outbound HTTP layer: keep-alive sessions instead of a bare
+requests.get() (new TCP + TLS handshake) per call.
+
+    session = get_session('cookie-3')     # one session per identity
+    res = session.get(url, headers=...)   # per-host timeout applied
+
+One pooled session per identity — each Roblox cookie gets its own, so
+connections (and anything the server ties to them) are never shared
+between accounts; the price cycle uses 'main'. Per host, in one place:
+
+  HOST_POLICIES   connect/read timeout and the connection limit of each
+                  session's pool for that host (callers beyond it wait for
+                  a free connection instead of opening more)
+  CONNECT_RETRIES connection-level failures (refused, reset before the
+                  request was sent, DNS) are retried inside the adapter;
+                  status-code retries (429, 5xx) stay with the caller,
+                  which knows its pacing (see rate_limiter.py)
+
+Every response's latency is recorded per host; http_stats() reports it
+(snipe server: GET /http).
+
+Benchmark against a local HTTPS stand-in (self-signed cert via openssl),
+fresh connection per request vs pooled session:
+
+    python http_client.py bench --requests 300
+"""
+
+import argparse
+import logging
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY = {'timeout': (5, 30), 'pool': 4}
+HOST_POLICIES = {
+    'inventory.roblox.com': {'timeout': (5, 30), 'pool': 4},
+    'users.roblox.com': {'timeout': (5, 15), 'pool': 2},
+    'thumbnails.roblox.com': {'timeout': (5, 15), 'pool': 2},
+    'www.rolimons.com': {'timeout': (10, 30), 'pool': 1},
+}
+CONNECT_RETRIES = 2
+
+
+def _policy(host):
+    return HOST_POLICIES.get(host, DEFAULT_POLICY)
+
+
+class _HostStats:
+    __slots__ = ('requests', 'errors', 'total', 'max')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class HostLatency:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: dict[str, _HostStats] = {}
+
+    def record(self, host, seconds, error=False):
+        with self._lock:
+            stats = self._hosts.setdefault(host, _HostStats())
+            stats.requests += 1
+            stats.errors += error
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                host: {
+                    'requests': s.requests,
+                    'errors': s.errors,
+                    'avgMs': round(s.total / s.requests * 1000, 1) if s.requests else 0.0,
+                    'maxMs': round(s.max * 1000, 1),
+                }
+                for host, s in self._hosts.items()
+            }
+
+
+host_latency = HostLatency()
+
+
+class _HostAdapter(HTTPAdapter):
+    """Sizes each host's connection pool from HOST_POLICIES when it is created."""
+
+    def __init__(self, **kwargs):
+        self._size_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        with self._sized(request.url):
+            return super().get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+
+    def get_connection(self, url, proxies=None):
+        with self._sized(url):
+            return super().get_connection(url, proxies)
+
+    @contextmanager
+    def _sized(self, url):
+        with self._size_lock:
+            self.poolmanager.connection_pool_kw['maxsize'] = _policy(urlparse(url).hostname)['pool']
+            yield
+
+
+class PooledSession(requests.Session):
+    def __init__(self):
+        super().__init__()
+        adapter = _HostAdapter(
+            pool_connections=len(HOST_POLICIES) + 4,
+            pool_block=True,
+            max_retries=Retry(total=CONNECT_RETRIES, connect=CONNECT_RETRIES, read=0, status=0,
+                              other=0, backoff_factor=0.5, raise_on_status=False),
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        host = urlparse(url).hostname or ''
+        kwargs.setdefault('timeout', _policy(host)['timeout'])
+        started = time.perf_counter()
+        try:
+            res = super().request(method, url, **kwargs)
+        except requests.RequestException:
+            host_latency.record(host, time.perf_counter() - started, error=True)
+            raise
+        host_latency.record(host, time.perf_counter() - started, error=res.status_code >= 500)
+        return res
+
+
+_sessions: dict[str, PooledSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(identity='default'):
+    with _sessions_lock:
+        session = _sessions.get(identity)
+        if session is None:
+            session = _sessions[identity] = PooledSession()
+        return session
+
+
+def http_stats():
+    return host_latency.snapshot()
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+class _StandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    body = b'{"data":[],"nextPageCursor":null}'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _self_signed_cert(directory):
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def run_benchmark(count):
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = _self_signed_cert(directory)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _StandIn)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'https://127.0.0.1:{server.server_address[1]}/v2/assets/1/owners'
+
+        try:
+            results = {}
+            for label in ('bare', 'pooled'):
+                session = PooledSession()
+                timings = []
+                for _ in range(count):
+                    started = time.perf_counter()
+                    if label == 'bare':
+                        res = requests.get(url, verify=False, timeout=10)
+                    else:
+                        res = session.get(url, verify=False)
+                    res.raise_for_status()
+                    timings.append(time.perf_counter() - started)
+                timings.sort()
+                results[label] = timings
+                print(f"{label:<7} mean {sum(timings) / count * 1000:6.2f} ms   "
+                      f"p50 {timings[count // 2] * 1000:6.2f} ms   p99 {timings[int(count * 0.99)] * 1000:6.2f} ms")
+            saved = (sum(results['bare']) - sum(results['pooled'])) / count * 1000
+            print(f"saved per request: {saved:.2f} ms (TLS + TCP setup, loopback — add the real RTTs on top)")
+        finally:
+            server.shutdown()
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Pooled outbound HTTP sessions')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='bare requests.get vs pooled session against a local HTTPS stand-in')
+    bench.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    run_benchmark(args.requests)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,30 +2,70 @@
 """
 Inventory scanner — runs as a background thread inside the worker.
 
-Handles two job types from the ScanJob table:
-  - "inventory": scan a player's full collectibles inventory + save snapshot
-  - "owners":    scan all owners of a specific item
+Handles these job types from the ScanJob table:
+  - "inventory":     scan a player's full collectibles inventory + save snapshot
+  - "owners":        scan all owners of a specific item
+  - "owners_full":   the same, without queuing Phase 2 per new owner
+  - "owners_delta":  re-scan an item's owners, processing only entries that
+                     changed since the last walk and sampling unchanged pages
+  - "owners_shard":  one UAID range of a big owners scan, so several
+                     cookies scan the item in parallel (plan_owner_shards)
+  - "uaid_backfill": Phase 2 — fill UAID timestamps for a new snapshot
+  - "rescan":        an inventory scan of a user whose holdings probably
+                     changed, queued by rescan_scheduler.py
 
 Next.js writes pending ScanJob rows; this scanner picks them up,
 processes them, and updates the status. No Vercel timeout limit.
+Each cookie runs SLOTS_PER_COOKIE scanner threads ("slots"), so several
+jobs are in flight per cookie — e.g. a few users' inventory pagination at
+once. Slots of a cookie share its adaptive rate buckets (rate_limiter.py)
+and keep-alive session (http_client.py): the cookie's rate budget, not a
+single thread waiting on a slow page, bounds its throughput. A slot holds
+at most two DB connections (its job's, plus a borrowed job's), so the
+'scanner' pool component is sized to that at import (SCANNER_DB_CONNECTIONS).
+
+Idle threads are woken by a NOTIFY on ScanJob insert (see "Job wakeups"),
+with a slow poll as the fallback. Which job is claimed next is decided by
+scan_scheduler (type priority, per-requester fair share); owners scans
+yield their cookie to waiting inventory scans between pages.
 """
 
+import argparse
+import bisect
+import json
 import os
 import re
+import select
+import sys
 import time
 import logging
 import threading
 import traceback
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import psycopg2
 import psycopg2.extras
 import requests
 
-logger = logging.getLogger(__name__)
+from http_client import get_session
+from db_pool import dedicated_conn, getconn, pooled, putconn, size_component
+from cursor_index import cursor_index, cursor_start, start_cursor_index
+from current_holdings import add_holdings, remove_holdings, set_holding_updated_at, set_holdings_updated_at_bulk
+from player_ranks import update_player_rank
+from rate_limiter import rate_limits
+from rescan_scheduler import record_owner_signals, start_rescan_scheduler
+from roblox_profiles import profile_cache
+from live_values import revalue_holdings
+from scan_scheduler import PREEMPT_PRIORITY, claim_next_job
+from snapshot_store import (
+    choose_base, delete_unstaged_items, load_snapshot_items, set_uaid_timestamps,
+    set_uaid_timestamps_bulk, stage_items, upsert_staged_items, write_delta_rows,
+)
 
-DATABASE_URL = os.getenv('DATABASE_URL', '')
+logger = logging.getLogger(__name__)
 
 # ─── Multi-cookie support ──────────────────────────────────────────────────
 def _load_cookies() -> list[str]:
@@ -42,22 +82,32 @@ def _load_cookies() -> list[str]:
 
 ROBLOX_COOKIES = _load_cookies()
 ROBLOX_COOKIE = ROBLOX_COOKIES[0] if ROBLOX_COOKIES else ''
+SLOTS_PER_COOKIE = max(1, int(os.getenv('SCAN_SLOTS_PER_COOKIE', '3')))
+
+# Two per slot (a job's connection + one for a job it borrows in
+# yield_to_priority_jobs), plus the cursor-index flusher and rescan feeder
+SCANNER_DB_CONNECTIONS = 2 * max(len(ROBLOX_COOKIES), 1) * SLOTS_PER_COOKIE + 2
+size_component('scanner', SCANNER_DB_CONNECTIONS)
+INVENTORY_API = 'https://inventory.roblox.com'
 
 _thread_local = threading.local()
 
-PAGE_DELAY = 1.0
-OWNER_PAGE_DELAY = 1.5
-UAID_SEARCH_DELAY = 1.0
-USER_PROCESS_DELAY = 1.0
-BREATHER_INTERVAL = 25
-BREATHER_DURATION = 10
+# cookie index -> last X-CSRF-TOKEN Roblox issued to it (needed for POSTs)
+_csrf_tokens: dict = {}
+
 POLL_INTERVAL = 2
+FALLBACK_POLL_INTERVAL = 30
+JOB_NOTIFY_CHANNEL = 'scan_job'
+JOB_LISTEN_TIMEOUT = 30
+PROGRESS_INTERVAL = 5
+MAX_BORROWED_JOBS = 5
+OWNER_SCAN_SHARDS = int(os.getenv('OWNER_SCAN_SHARDS', '0'))   # UAID ranges per owners scan; 0 = one per cookie, 1 = off
+MIN_SHARD_PAGES = 20
+SHARD_POLL_INTERVAL = 5
 
 
 # ─── DB helpers ────────────────────────────────────────────────────────────
-
-def get_conn():
-    return psycopg2.connect(DATABASE_URL)
+# Connections come from the shared worker pool (db_pool.py), component 'scanner'.
 
 
 def get_today_bounds_utc():
@@ -78,7 +128,8 @@ def make_cuid():
 
 def thread_tag() -> str:
     idx = getattr(_thread_local, 'cookie_index', '?')
-    return f"[Cookie {idx}]"
+    slot = getattr(_thread_local, 'slot', None)
+    return f"[Cookie {idx}.{slot}]" if slot and SLOTS_PER_COOKIE > 1 else f"[Cookie {idx}]"
 
 
 def roblox_headers():
@@ -89,15 +140,34 @@ def roblox_headers():
     return h
 
 
-def fetch_with_retry(url, max_retries=5, base_delay=3.0, extra_headers=None):
+def fetch_with_retry(url, max_retries=5, base_delay=3.0, extra_headers=None, json_body=None):
+    """
+    GET a Roblox API URL (POST `json_body` when given) on this cookie's
+    keep-alive session (http_client.py), paced by this cookie's adaptive bucket for the
+    endpoint family (rate_limiter.py) — no fixed sleeps around calls. 429s
+    feed the bucket (Retry-After honored); network errors and 5xx back off
+    exponentially from base_delay. A POST answered 403 with an
+    x-csrf-token header is retried at once with that token, which is then
+    reused for the cookie's later POSTs.
+    """
     headers = roblox_headers()
     tag = thread_tag()
     if extra_headers:
         headers.update(extra_headers)
+    cookie_index = getattr(_thread_local, 'cookie_index', '?')
+    bucket = rate_limits.bucket(cookie_index, url)
+    session = get_session(f'cookie-{cookie_index}')
+    if json_body is not None and cookie_index in _csrf_tokens:
+        headers['x-csrf-token'] = _csrf_tokens[cookie_index]
+    csrf_retried = False
 
     for attempt in range(max_retries):
+        bucket.acquire()
         try:
-            res = requests.get(url, headers=headers, timeout=30)
+            if json_body is not None:
+                res = session.post(url, headers=headers, json=json_body)
+            else:
+                res = session.get(url, headers=headers)
         except requests.RequestException as e:
             wait = base_delay * (2 ** attempt)
             logger.warning(f"[inventory_scanner] {tag} Network error (attempt {attempt+1}): {e} — retrying in {wait}s")
@@ -105,9 +175,15 @@ def fetch_with_retry(url, max_retries=5, base_delay=3.0, extra_headers=None):
             continue
 
         if res.status_code == 429:
-            wait = base_delay * (2 ** attempt)
-            logger.warning(f"[inventory_scanner] {tag} 429 rate limited — waiting {wait}s (attempt {attempt+1})")
-            time.sleep(wait)
+            wait = bucket.throttled(res.headers.get('Retry-After'))
+            logger.warning(f"[inventory_scanner] {tag} 429 rate limited — pausing {wait:.0f}s, "
+                           f"rate now {bucket.rate:.2f} req/s (attempt {attempt+1})")
+            continue
+
+        if res.status_code == 403 and json_body is not None and res.headers.get('x-csrf-token') and not csrf_retried:
+            # Token missing or rotated — Roblox hands out the new one on the 403
+            _csrf_tokens[cookie_index] = headers['x-csrf-token'] = res.headers['x-csrf-token']
+            csrf_retried = True
             continue
 
         if res.status_code == 400:
@@ -120,6 +196,7 @@ def fetch_with_retry(url, max_retries=5, base_delay=3.0, extra_headers=None):
             time.sleep(wait)
             continue
 
+        bucket.succeeded()
         return res.json()
 
     raise Exception(f"[inventory_scanner] {tag} All {max_retries} retries exhausted for {url}")
@@ -127,24 +204,6 @@ def fetch_with_retry(url, max_retries=5, base_delay=3.0, extra_headers=None):
 
 # ─── Job queue helpers ─────────────────────────────────────────────────────
 
-def claim_next_job(conn):
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute("""
-            UPDATE "ScanJob"
-            SET status = 'running', "updatedAt" = NOW()
-            WHERE id = (
-                SELECT id FROM "ScanJob"
-                WHERE status = 'pending'
-                ORDER BY "startedAt" ASC
-                LIMIT 1
-                FOR UPDATE SKIP LOCKED
-            )
-            RETURNING *
-        """)
-        conn.commit()
-        return cur.fetchone()
-
-
 def update_job(conn, job_id, **kwargs):
     fields = ', '.join(f'"{k}" = %s' for k in kwargs)
     values = list(kwargs.values())
@@ -163,6 +222,141 @@ def is_stop_requested(conn, job_id):
         return row and row[0] == 'stopped'
 
 
+class JobProgress:
+    """
+    Coalesces a running job's progress writes. set() buffers fields and
+    writes them at most every PROGRESS_INTERVAL seconds; flush() writes
+    now (once per page). Each write also reads the job status back, so
+    stop requests are seen without a separate query per owner. `offsets`
+    are added to the fields they name when written (a sharded owners scan
+    adds its shards' counters to its own).
+    """
+
+    def __init__(self, conn, job_id):
+        self.conn = conn
+        self.job_id = job_id
+        self.stop_requested = False
+        self.offsets = {}
+        self._fields = {}
+        self._last_flush = time.monotonic()
+
+    def set(self, **kwargs):
+        self._fields.update(kwargs)
+        if time.monotonic() - self._last_flush >= PROGRESS_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        fields, self._fields = self._fields, {}
+        for field, offset in self.offsets.items():
+            if field in fields:
+                fields[field] += offset
+        assignments = ''.join(f'"{k}" = %s, ' for k in fields)
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f'UPDATE "ScanJob" SET {assignments}"updatedAt" = NOW() WHERE id = %s RETURNING status',
+                list(fields.values()) + [self.job_id]
+            )
+            row = cur.fetchone()
+        self.conn.commit()
+        self._last_flush = time.monotonic()
+        self.stop_requested = bool(row and row[0] == 'stopped')
+        return self.stop_requested
+
+
+# ─── Job wakeups (LISTEN/NOTIFY) ───────────────────────────────────────────
+# A trigger NOTIFYs JOB_NOTIFY_CHANNEL whenever a ScanJob becomes pending
+# (insert, or a reset back to 'pending'). One listener connection turns each
+# notification into a wakeup for one idle scanner thread; idle threads
+# otherwise only re-poll every FALLBACK_POLL_INTERVAL seconds, or every
+# POLL_INTERVAL while the listener is disconnected.
+
+class JobWakeups:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = 0
+        self.idle = 0
+        self.listening = False
+
+    def notify(self, count=1):
+        with self._cond:
+            self._pending = min(self._pending + count, max(len(ROBLOX_COOKIES) * SLOTS_PER_COOKIE, 1))
+            self._cond.notify(count)
+
+    def wait(self):
+        """Block an idle scanner thread until a job may be claimable."""
+        timeout = FALLBACK_POLL_INTERVAL if self.listening else POLL_INTERVAL
+        with self._cond:
+            self.idle += 1
+            try:
+                if self._cond.wait_for(lambda: self._pending > 0, timeout):
+                    self._pending -= 1
+            finally:
+                self.idle -= 1
+
+
+job_wakeups = JobWakeups()
+
+
+def ensure_job_notify_trigger(conn):
+    """Install the trigger that NOTIFYs when a ScanJob becomes pending."""
+    with conn.cursor() as cur:
+        cur.execute(f'''
+            CREATE OR REPLACE FUNCTION scan_job_notify() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('{JOB_NOTIFY_CHANNEL}', NEW.id);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        ''')
+        cur.execute('DROP TRIGGER IF EXISTS scan_job_notify ON "ScanJob"')
+        cur.execute('''
+            CREATE TRIGGER scan_job_notify
+            AFTER INSERT OR UPDATE OF status ON "ScanJob"
+            FOR EACH ROW WHEN (NEW.status = 'pending')
+            EXECUTE FUNCTION scan_job_notify()
+        ''')
+
+
+def _job_listen_loop():
+    while True:
+        conn = None
+        try:
+            conn = dedicated_conn()
+            conn.autocommit = True
+
+            ensure_job_notify_trigger(conn)
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN {JOB_NOTIFY_CHANNEL}')
+            job_wakeups.listening = True
+            # Jobs queued while we were not listening
+            job_wakeups.notify(len(ROBLOX_COOKIES) * SLOTS_PER_COOKIE)
+            logger.info(f"[inventory_scanner] 👂 Listening for ScanJob notifications")
+
+            while True:
+                if select.select([conn], [], [], JOB_LISTEN_TIMEOUT) == ([], [], []):
+                    with conn.cursor() as cur:
+                        cur.execute('SELECT 1')
+                    continue
+
+                conn.poll()
+                job_ids = set()
+                while conn.notifies:
+                    job_ids.add(conn.notifies.pop(0).payload)
+                if job_ids:
+                    job_wakeups.notify(len(job_ids))
+
+        except Exception as e:
+            job_wakeups.listening = False
+            logger.error(f"[inventory_scanner] Job listener error: {e} — reconnecting in 5s")
+            time.sleep(5)
+        finally:
+            if conn:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
 # ─── Ensure items exist in DB ──────────────────────────────────────────────
 
 def ensure_items_exist(conn, asset_ids):
@@ -181,7 +375,7 @@ def ensure_items_exist(conn, asset_ids):
                 VALUES %s
                 ON CONFLICT DO NOTHING
             """, [(aid, f'Unknown Item {aid}', False, datetime.now(timezone.utc), datetime.now(timezone.utc))
-                  for aid in missing])
+                  for aid in missing], page_size=len(missing))
     conn.commit()
 
 
@@ -207,41 +401,22 @@ def calculate_snapshot_totals(conn, items):
     return total_rap, total_items, unique_items
 
 
-# ─── Fetch Roblox user info ────────────────────────────────────────────────
-
-def fetch_user_info(user_id):
-    tag = thread_tag()
-    try:
-        data = fetch_with_retry(f'https://users.roblox.com/v1/users/{user_id}')
-        return data
-    except Exception as e:
-        logger.warning(f"[inventory_scanner] {tag} Could not fetch user info for [userId {user_id}]: {e}")
-        return None
+# ─── Roblox user profiles ──────────────────────────────────────────────────
 
+def resolve_profiles(user_ids):
+    """Names, headshots and avatars for many users — batched and TTL-cached (roblox_profiles.py)."""
+    return profile_cache.resolve(user_ids, fetch_with_retry)
 
-def fetch_headshot(user_id):
-    tag = thread_tag()
-    try:
-        data = fetch_with_retry(
-            f'https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size=150x150&format=Webp'
-        )
-        if data and data.get('data'):
-            return data['data'][0].get('imageUrl')
-    except Exception as e:
-        logger.warning(f"[inventory_scanner] {tag} Could not fetch headshot for [userId {user_id}]: {e}")
-    return None
 
-def fetch_avatar(user_id):
+def fetch_user_description(user_id):
+    """The profile description, which the batch users API doesn't return. None on failure."""
     tag = thread_tag()
     try:
-        data = fetch_with_retry(
-            f'https://thumbnails.roblox.com/v1/users/avatar?userIds={user_id}&size=420x420&format=Webp&isCircular=false'
-        )
-        if data and data.get('data'):
-            return data['data'][0].get('imageUrl')
+        data = fetch_with_retry(f'https://users.roblox.com/v1/users/{user_id}')
+        return (data or {}).get('description')
     except Exception as e:
-        logger.warning(f"[inventory_scanner] {tag} Could not fetch avatar for [userId {user_id}]: {e}")
-    return None
+        logger.warning(f"[inventory_scanner] {tag} Could not fetch description for [userId {user_id}]: {e}")
+        return None
 
 
 # ─── Scan full inventory ───────────────────────────────────────────────────
@@ -255,7 +430,7 @@ def scan_full_inventory(user_id):
     logger.info(f"[inventory_scanner] {tag} [userId {user_id}] 🔍 Starting inventory scan")
 
     while True:
-        url = f'https://inventory.roblox.com/v1/users/{user_id}/assets/collectibles?sortOrder=Asc&limit=100'
+        url = f'{INVENTORY_API}/v1/users/{user_id}/assets/collectibles?sortOrder=Asc&limit=100'
         if cursor:
             url += f'&cursor={cursor}'
 
@@ -289,8 +464,6 @@ def scan_full_inventory(user_id):
         if not cursor:
             break
 
-        time.sleep(PAGE_DELAY)
-
     logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ Fetched {len(full_inventory)} items in {page_count} pages")
     return full_inventory
 
@@ -298,179 +471,209 @@ def scan_full_inventory(user_id):
 # ─── UAID cursor cache ─────────────────────────────────────────────────────
 
 def get_cached_cursor(conn, asset_id, target_uaid):
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT cursor, "pageNum"
-            FROM "UaidCursorCache"
-            WHERE "assetId" = %s AND "lastUaid" < %s
-            ORDER BY "lastUaid" DESC
-            LIMIT 1
-        """, (asset_id, target_uaid))
-        row = cur.fetchone()
-        if row:
-            return row[0], row[1]
-    return None, 0
+    """
+    The cached owners page starting closest below `target_uaid`, as
+    (cursor, pageNum, startUaid), or (None, 0, None). A cursor's prefix is
+    the last UAID of the page before it, so the page fetched with `cursor`
+    holds the UAIDs after startUaid — the target's own page when it was
+    cached, else the nearest one before it. Served from the in-memory
+    index (cursor_index.py); `conn` is only used to load an asset's rows
+    the first time it is looked up.
+    """
+    return cursor_index.lookup(conn, asset_id, target_uaid)
 
 
 def save_cursor(conn, asset_id, cursor_str, last_uaid, page_num):
-    tag = thread_tag()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO "UaidCursorCache" (id, "assetId", cursor, "lastUaid", "pageNum", "updatedAt")
-                VALUES (%s, %s, %s, %s, %s, NOW())
-                ON CONFLICT ("assetId", "lastUaid") DO NOTHING
-            """, (make_cuid(), asset_id, cursor_str, last_uaid, page_num))
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        logger.warning(f"[inventory_scanner] {tag} Could not save cursor cache: {e}")
+    """Record that fetching `cursor_str` returns the page ending at `last_uaid` (written behind)."""
+    cursor_index.save(asset_id, cursor_str, last_uaid, page_num)
 
 
 # ─── Fetch UAID timestamps from owners API ────────────────────────────────
 
-def fetch_uaid_timestamps(conn, asset_id, user_asset_id, user_id):
-    target_uaid = int(user_asset_id)
-    page_num = 0
-    requests_since_break = 0
-    last_page_num_reached = 0
-    tag = thread_tag()
-
-    cached_cursor, cached_page = get_cached_cursor(conn, asset_id, target_uaid)
-    cursor = cached_cursor
-    if cursor:
-        page_num = cached_page
-        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Resuming from cached cursor at page ~{page_num}")
-
-    while True:
-        url = f'https://inventory.roblox.com/v2/assets/{asset_id}/owners?limit=100&sortOrder=Asc'
-        if cursor:
-            url += f'&cursor={cursor}'
+def sweep_owner_pages(conn, asset_id, target_uaids):
+    """
+    Resolve many UAIDs of one asset in a single ascending walk of its owners
+    pages. Returns ({uaid: owners-API entry}, pages fetched).
+
+    Pages are UAID-ordered, so each page settles every pending target up to
+    its last UAID — found on it, or no longer listed. Before each fetch the
+    walk jumps ahead through UaidCursorCache when the cache knows a page
+    starting past the current position, closer to the next pending target,
+    so stretches of pages holding no target are never fetched. If a cursor
+    doesn't carry its UAID (cursor_start() is None), the rest of the walk
+    is sequential and settles nothing early.
+    """
+    pending = sorted({int(u) for u in target_uaids})
+    found = {}
+    pages = 0
+    base_url = f'{INVENTORY_API}/v2/assets/{asset_id}/owners?limit=100&sortOrder=Asc'
+    cursor = None
+    page_index = 0
+    position = None   # last UAID of the last page fetched = where `cursor` starts
+    sequential = False
 
-        try:
-            data = fetch_with_retry(url, max_retries=5, base_delay=3.0)
-        except Exception as e:
-            logger.warning(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Failed to fetch page: {e}")
-            break
+    while pending:
+        if not sequential:
+            cached_cursor, cached_page, cached_start = get_cached_cursor(conn, asset_id, pending[0])
+            if cached_start is not None and (position is None or cached_start > position):
+                cursor, page_index = cached_cursor, cached_page
 
-        entries = data.get('data', [])
-        page_num += 1
-        last_page_num_reached = page_num
+        url = base_url + (f'&cursor={cursor}' if cursor else '')
+        data = fetch_with_retry(url, max_retries=5, base_delay=3.0)
+        pages += 1
 
-        if not entries:
-            break
+        pending_set = set(pending)
+        last_uaid = None
+        for entry in data.get('data', []):
+            uaid = int(entry.get('id') or 0)
+            last_uaid = uaid or last_uaid
+            if uaid in pending_set:
+                found[uaid] = entry
 
         next_cursor = data.get('nextPageCursor')
+        if not next_cursor:
+            break
 
-        if next_cursor:
-            last_uaid_from_cursor = int(next_cursor.split('_')[0])
-            save_cursor(conn, asset_id, cursor, last_uaid_from_cursor, page_num - 1)
-
-            if last_uaid_from_cursor < target_uaid:
-                logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Page {page_num}: lastUaid={last_uaid_from_cursor} < target={target_uaid}, skipping")
-                cursor = next_cursor
-                requests_since_break += 1
-                if requests_since_break >= BREATHER_INTERVAL:
-                    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Taking {BREATHER_DURATION}s breather...")
-                    time.sleep(BREATHER_DURATION)
-                    requests_since_break = 0
-                else:
-                    time.sleep(UAID_SEARCH_DELAY)
-                continue
+        position = None if sequential else cursor_start(next_cursor)
+        if position is None:
+            if not sequential:
+                logger.warning(f"[inventory_scanner] {thread_tag()} Unparsable owners cursor for asset "
+                               f"{asset_id} — walking the rest sequentially")
+                sequential = True
+            pending = [u for u in pending if u not in found]
+            if last_uaid:
+                save_cursor(conn, asset_id, cursor, last_uaid, page_index)
+        else:
+            save_cursor(conn, asset_id, cursor, position, page_index)
+            pending = [u for u in pending if u > position]
+        cursor = next_cursor
+        page_index += 1
 
-        for entry in entries:
-            if int(entry.get('id', 0)) == target_uaid:
-                logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Found on page {page_num}")
-                return entry.get('created'), entry.get('updated')
+    return found, pages
 
-        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Page {page_num}: not found — trying fallback")
-        break
 
-    pages_to_check = []
+# ─── Phase 2: UAID timestamp backfill jobs ─────────────────────────────────
+# Phase 2 runs as 'uaid_backfill' ScanJobs. The UAIDs to resolve are stored
+# on the job ("uaids": {assetId: [uaid, ...]}) and finished assets are
+# checkpointed, so a backfill survives restarts; the scheduler runs it on a
+# cookie thread like any other job, at the lowest priority.
 
-    if last_page_num_reached - 1 > 0:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT cursor FROM "UaidCursorCache"
-                WHERE "assetId" = %s AND "pageNum" = %s
-                LIMIT 1
-            """, (asset_id, last_page_num_reached - 1))
-            row = cur.fetchone()
-            if row:
-                pages_to_check.append(('back', row[0]))
+def enqueue_uaid_backfill(conn, user_id, uaids_to_backfill):
+    """
+    Queue Phase 2 for a user's new snapshot. A backfill still pending for
+    the user is replaced rather than duplicated — the new list is computed
+    from the latest snapshot.
+    """
+    by_asset = {}
+    for uaid_info in uaids_to_backfill:
+        by_asset.setdefault(str(uaid_info['asset_id']), set()).add(int(uaid_info['user_asset_id']))
+    uaids = psycopg2.extras.Json({asset_id: sorted(u) for asset_id, u in by_asset.items()})
+    total = sum(len(u) for u in by_asset.values())
 
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT cursor FROM "UaidCursorCache"
-            WHERE "assetId" = %s AND "pageNum" = %s
-            LIMIT 1
-        """, (asset_id, last_page_num_reached))
-        row = cur.fetchone()
-        if row:
-            pages_to_check.append(('forward', row[0]))
-
-    for direction, fallback_cursor in pages_to_check:
-        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Fallback: checking 1 page {direction}...")
-        url = f'https://inventory.roblox.com/v2/assets/{asset_id}/owners?limit=100&sortOrder=Asc'
-        if fallback_cursor:
-            url += f'&cursor={fallback_cursor}'
-        try:
-            data = fetch_with_retry(url, max_retries=5, base_delay=3.0)
-            for entry in data.get('data', []):
-                if int(entry.get('id', 0)) == target_uaid:
-                    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Found in fallback ({direction})")
-                    return entry.get('created'), entry.get('updated')
-        except Exception as e:
-            logger.warning(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Fallback fetch failed ({direction}): {e}")
+            UPDATE "ScanJob"
+            SET uaids = %s, total = %s, processed = 0, failed = 0, checkpoint = NULL, "updatedAt" = NOW()
+            WHERE "userId" = %s AND type = 'uaid_backfill' AND status = 'pending'
+        """, (uaids, total, user_id))
+        if cur.rowcount == 0:
+            cur.execute("""
+                INSERT INTO "ScanJob" (id, "userId", type, status, total, uaids, "startedAt", "updatedAt")
+                VALUES (%s, %s, 'uaid_backfill', 'pending', %s, %s, NOW(), NOW())
+            """, (make_cuid(), user_id, total, uaids))
+    conn.commit()
+    logger.info(f"[inventory_scanner] {thread_tag()} [userId {user_id}] 🕐 [Phase 2] Queued backfill of "
+                f"{total} UAID(s) across {len(by_asset)} asset(s)")
 
-    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [UAID search] Not found after fallback — giving up")
-    return None, None
 
+BACKFILL_MAX_ATTEMPTS = 3
 
-# ─── Phase 2 concurrency limiter ──────────────────────────────────────────
-PHASE2_SEMAPHORE = threading.Semaphore(4)
 
+def run_uaid_backfill(job):
+    """
+    Fill uaidCreatedAt/uaidUpdatedAt for a user's UAIDs, one owners sweep
+    per asset (sweep_owner_pages). Checkpoints after every asset.
 
-def backfill_timestamps(conn, snapshot_id, uaids_to_backfill, user_id):
+    An asset whose sweep fails (network, rate limits, DB) is not marked
+    done: the job goes back to 'pending' and retries it on a later claim,
+    up to BACKFILL_MAX_ATTEMPTS, after which its UAIDs are counted as
+    'errored' — apart from 'missing', the UAIDs the owners API doesn't list.
+    """
+    user_id = job['userId']
+    job_id = job['id']
     tag = thread_tag()
-    with PHASE2_SEMAPHORE:
-        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] 🕐 [Phase 2] Backfilling timestamps for {len(uaids_to_backfill)} UAIDs...")
-
-        for uaid_info in uaids_to_backfill:
-            user_asset_id = uaid_info['user_asset_id']
-            asset_id = uaid_info['asset_id']
+    by_asset = job.get('uaids') or {}
+    checkpoint = job.get('checkpoint') or {}
+    done = set(checkpoint.get('assets', []))
+    resolved = checkpoint.get('resolved', 0)
+    missing = checkpoint.get('missing', 0)
+    errored = checkpoint.get('errored', 0)
+    pages = checkpoint.get('pages', 0)
+    attempts = checkpoint.get('attempts', {})
+    retry = []
+
+    with pooled('scanner') as conn:
+        progress = JobProgress(conn, job_id)
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] 🕐 [Phase 2] Backfilling timestamps for "
+                    f"{job['total']} UAID(s) across {len(by_asset)} asset(s)"
+                    + (f" — resuming, {len(done)} asset(s) done" if done else ''))
+
+        for asset_id in sorted(by_asset, key=int):
+            if asset_id in done:
+                continue
+            if progress.flush():
+                logger.info(f"[inventory_scanner] {tag} 🛑 Stop requested — halting")
+                break
 
+            uaids = by_asset[asset_id]
+            progress.set(currentUser=f'asset:{asset_id}')
             try:
-                created, updated = fetch_uaid_timestamps(conn, asset_id, user_asset_id, user_id)
-
-                if not created and not updated:
-                    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 2] UAID {user_asset_id} — no timestamps found")
-                    time.sleep(30)
-                    continue
-
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        UPDATE "InventoryItem"
-                        SET
-                            "uaidCreatedAt" = COALESCE("uaidCreatedAt", %s),
-                            "uaidUpdatedAt" = %s
-                        WHERE "snapshotId" = %s AND "userAssetId" = %s
-                    """, (
-                        datetime.fromisoformat(created.replace('Z', '+00:00')) if created else None,
-                        datetime.fromisoformat(updated.replace('Z', '+00:00')) if updated else None,
-                        snapshot_id,
-                        user_asset_id
-                    ))
-                conn.commit()
-                logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 2] UAID {user_asset_id} ✅ created={created} updated={updated}")
-
+                found, fetched = sweep_owner_pages(conn, int(asset_id), uaids)
+                write_page_timestamps(conn, [(entry, int(user_id)) for entry in found.values()])
+                logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 2] Asset {asset_id}: "
+                            f"{len(found)}/{len(uaids)} UAID(s) resolved in {fetched} page(s)")
+                done.add(asset_id)
+                pages += fetched
+                resolved += len(found)
+                missing += len(uaids) - len(found)
             except Exception as e:
                 conn.rollback()
-                logger.warning(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 2] UAID {user_asset_id} Failed: {e}")
-
-            time.sleep(30)
-
-        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ [Phase 2] Timestamp backfill complete")
+                attempts[asset_id] = attempts.get(asset_id, 0) + 1
+                if attempts[asset_id] < BACKFILL_MAX_ATTEMPTS:
+                    retry.append(asset_id)
+                    logger.warning(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 2] Asset {asset_id} Failed "
+                                   f"(attempt {attempts[asset_id]}/{BACKFILL_MAX_ATTEMPTS}, will retry): {e}")
+                else:
+                    done.add(asset_id)
+                    errored += len(uaids)
+                    logger.warning(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 2] Asset {asset_id} Failed "
+                                   f"{BACKFILL_MAX_ATTEMPTS} times — giving up: {e}")
+
+            progress.set(processed=resolved + missing + errored, failed=missing + errored,
+                         checkpoint=psycopg2.extras.Json({
+                             'assets': sorted(done), 'resolved': resolved, 'missing': missing,
+                             'errored': errored, 'pages': pages, 'attempts': attempts,
+                         }))
+            progress.flush()
+            yield_to_priority_jobs(conn, job, progress)
+
+        if progress.stop_requested:
+            final_status = 'stopped'
+        elif retry:
+            # Back in the queue; the next claim resumes from the checkpoint
+            # and sweeps only the failed assets
+            final_status = 'pending'
+        else:
+            final_status = 'done'
+        update_job(conn, job_id, status=final_status, currentUser=None)
+
+    if final_status == 'pending':
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] 🔁 [Phase 2] Timestamp backfill re-queued — "
+                    f"{len(retry)} asset(s) to retry, {resolved}/{job['total']} resolved so far")
+    else:
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ [Phase 2] Timestamp backfill {final_status} — "
+                    f"{resolved}/{job['total']} resolved, {missing} not listed, {errored} errored, "
+                    f"{pages} page(s) fetched")
 
 
 # ─── Save inventory snapshot ───────────────────────────────────────────────
@@ -521,24 +724,14 @@ def save_inventory_snapshot(conn, user_id, skip_phase2=False):
                 VALUES (%s, %s, %s, %s, %s, NOW())
             """, (snapshot_id, user_id, total_rap, total_items, unique_items))
 
-            psycopg2.extras.execute_values(cur, """
-                INSERT INTO "InventoryItem"
-                    ("snapshotId", "assetId", "userAssetId", "serialNumber", "isOnHold", "scannedAt",
-                     "uaidCreatedAt", "uaidUpdatedAt")
-                VALUES %s
-                ON CONFLICT DO NOTHING
-            """, [(
-                snapshot_id,
-                row['asset_id'],
-                row['user_asset_id'],
-                row['serial_number'],
-                row['is_on_hold'],
-                now,
-                None,
-                None,
-            ) for row in item_rows])
+            stage_items(cur, item_rows, now)
+            upsert_staged_items(cur, snapshot_id)
+
+            add_holdings(cur, user_id, item_rows, now)
 
         conn.commit()
+        update_player_rank(user_id, total_rap, total_items, unique_items)
+        revalue_holdings(user_id, item_rows)
         logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ [Phase 1] FIRST snapshot created (ID: {snapshot_id}, {len(item_rows)} items)")
 
         uaids_to_backfill = [
@@ -546,28 +739,10 @@ def save_inventory_snapshot(conn, user_id, skip_phase2=False):
             for item in full_inventory
         ]
         if uaids_to_backfill and not skip_phase2:
-            parent_cookie = getattr(_thread_local, 'cookie', ROBLOX_COOKIE)
-            parent_cookie_index = getattr(_thread_local, 'cookie_index', '?')
-            def _run_backfill(cookie, cookie_index, snapshot_id, uaids, uid):
-                _thread_local.cookie = cookie
-                _thread_local.cookie_index = cookie_index
-                backfill_timestamps(get_conn(), snapshot_id, uaids, uid)
-            t = threading.Thread(
-                target=_run_backfill,
-                args=(parent_cookie, parent_cookie_index, snapshot_id, uaids_to_backfill, user_id),
-                daemon=True
-            )
-            t.start()
+            enqueue_uaid_backfill(conn, user_id, uaids_to_backfill)
         return snapshot_id
 
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute("""
-            SELECT "userAssetId", "assetId", "serialNumber", "scannedAt",
-                   "uaidCreatedAt", "uaidUpdatedAt", "isOnHold"
-            FROM "InventoryItem"
-            WHERE "snapshotId" = %s
-        """, (latest_snapshot['id'],))
-        prev_items = cur.fetchall()
+    prev_items = load_snapshot_items(conn, latest_snapshot['id'])
 
     prev_uaid_set = {str(row['userAssetId']) for row in prev_items}
 
@@ -614,50 +789,56 @@ def save_inventory_snapshot(conn, user_id, skip_phase2=False):
 
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT id FROM "InventorySnapshot"
+            SELECT id, "baseSnapshotId" FROM "InventorySnapshot"
             WHERE "userId" = %s AND "createdAt" >= %s AND "createdAt" <= %s
             LIMIT 1
         """, (user_id, today_start, today_end))
         todays_snapshot = cur.fetchone()
 
-    if todays_snapshot:
+    # Delta snapshots store only new UAIDs and rows whose isOnHold flipped
+    prev_on_hold = {str(row['userAssetId']): row['isOnHold'] for row in prev_items}
+    delta_adds = [
+        item for item in all_items
+        if str(item['user_asset_id']) in new_uaids
+        or item['is_on_hold'] != prev_on_hold.get(str(item['user_asset_id']))
+    ]
+    delta_removes = [
+        (row['userAssetId'], row['assetId'])
+        for row in prev_items if str(row['userAssetId']) in removed_uaids
+    ]
+
+    if todays_snapshot and todays_snapshot[1]:
+        snapshot_id = todays_snapshot[0]
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 1] Updating TODAY'S delta snapshot (ID: {snapshot_id})...")
+
+        with conn.cursor() as cur:
+            write_delta_rows(cur, snapshot_id, delta_adds, delta_removes)
+            remove_holdings(cur, user_id, removed_uaids)
+            add_holdings(cur, user_id, [item for item in all_items if str(item['user_asset_id']) in new_uaids], now)
+            cur.execute("""
+                UPDATE "InventorySnapshot"
+                SET "totalRAP" = %s, "totalItems" = %s, "uniqueItems" = %s, "createdAt" = NOW()
+                WHERE id = %s
+            """, (total_rap, total_items, unique_items, snapshot_id))
+
+        conn.commit()
+        update_player_rank(user_id, total_rap, total_items, unique_items)
+        revalue_holdings(user_id, all_items)
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ [Phase 1] UPDATED today's delta snapshot "
+                    f"({len(all_items)} items, {len(delta_adds)} add / {len(delta_removes)} remove rows)")
+
+    elif todays_snapshot:
         snapshot_id = todays_snapshot[0]
         logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 1] Updating TODAY'S snapshot (ID: {snapshot_id})...")
 
+        # Stage the whole inventory once, then delete / insert / refresh set-based
         with conn.cursor() as cur:
-            if removed_uaids:
-                cur.execute("""
-                    DELETE FROM "InventoryItem"
-                    WHERE "snapshotId" = %s AND "userAssetId" = ANY(%s)
-                """, (snapshot_id, [int(u) for u in removed_uaids]))
-
-            if new_uaids:
-                new_rows = [item for item in all_items if str(item['user_asset_id']) in new_uaids]
-                psycopg2.extras.execute_values(cur, """
-                    INSERT INTO "InventoryItem"
-                        ("snapshotId", "assetId", "userAssetId", "serialNumber", "isOnHold",
-                         "scannedAt", "uaidCreatedAt", "uaidUpdatedAt")
-                    VALUES %s
-                    ON CONFLICT DO NOTHING
-                """, [(
-                    snapshot_id,
-                    row['asset_id'],
-                    row['user_asset_id'],
-                    row['serial_number'],
-                    row['is_on_hold'],
-                    now,
-                    None,
-                    None,
-                ) for row in new_rows])
-
-            for item in all_items:
-                if str(item['user_asset_id']) not in new_uaids:
-                    cur.execute("""
-                        UPDATE "InventoryItem"
-                        SET "isOnHold" = %s,
-                            "lastSeenAt" = %s
-                        WHERE "snapshotId" = %s AND "userAssetId" = %s
-                    """, (item['is_on_hold'], now, snapshot_id, item['user_asset_id']))
+            stage_items(cur, all_items, now)
+            delete_unstaged_items(cur, snapshot_id)
+            upsert_staged_items(cur, snapshot_id, last_seen_at=now)
+
+            remove_holdings(cur, user_id, removed_uaids)
+            add_holdings(cur, user_id, [item for item in all_items if str(item['user_asset_id']) in new_uaids], now)
 
             cur.execute("""
                 UPDATE "InventorySnapshot"
@@ -666,8 +847,31 @@ def save_inventory_snapshot(conn, user_id, skip_phase2=False):
             """, (total_rap, total_items, unique_items, snapshot_id))
 
         conn.commit()
+        update_player_rank(user_id, total_rap, total_items, unique_items)
+        revalue_holdings(user_id, all_items)
         logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ [Phase 1] UPDATED today's snapshot ({len(all_items)} items)")
 
+    elif (base_id := choose_base(conn, latest_snapshot)):
+        snapshot_id = make_cuid()
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 1] Creating NEW delta snapshot for new day (ID: {snapshot_id}, base {base_id})...")
+
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO "InventorySnapshot" (id, "userId", "totalRAP", "totalItems", "uniqueItems", "createdAt", "baseSnapshotId")
+                VALUES (%s, %s, %s, %s, %s, NOW(), %s)
+            """, (snapshot_id, user_id, total_rap, total_items, unique_items, base_id))
+
+            write_delta_rows(cur, snapshot_id, delta_adds, delta_removes)
+
+            remove_holdings(cur, user_id, removed_uaids)
+            add_holdings(cur, user_id, [item for item in all_items if str(item['user_asset_id']) in new_uaids], now)
+
+        conn.commit()
+        update_player_rank(user_id, total_rap, total_items, unique_items)
+        revalue_holdings(user_id, all_items)
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ [Phase 1] NEW delta snapshot created "
+                    f"({len(all_items)} items, {len(delta_adds)} add / {len(delta_removes)} remove rows)")
+
     else:
         snapshot_id = make_cuid()
         logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [Phase 1] Creating NEW snapshot for new day (ID: {snapshot_id})...")
@@ -678,24 +882,15 @@ def save_inventory_snapshot(conn, user_id, skip_phase2=False):
                 VALUES (%s, %s, %s, %s, %s, NOW())
             """, (snapshot_id, user_id, total_rap, total_items, unique_items))
 
-            psycopg2.extras.execute_values(cur, """
-                INSERT INTO "InventoryItem"
-                    ("snapshotId", "assetId", "userAssetId", "serialNumber", "isOnHold",
-                     "scannedAt", "uaidCreatedAt", "uaidUpdatedAt")
-                VALUES %s
-                ON CONFLICT DO NOTHING
-            """, [(
-                snapshot_id,
-                item['asset_id'],
-                item['user_asset_id'],
-                item['serial_number'],
-                item['is_on_hold'],
-                item['scanned_at'],
-                item['uaid_created_at'],
-                item['uaid_updated_at'],
-            ) for item in all_items])
+            stage_items(cur, all_items, now)
+            upsert_staged_items(cur, snapshot_id)
+
+            remove_holdings(cur, user_id, removed_uaids)
+            add_holdings(cur, user_id, [item for item in all_items if str(item['user_asset_id']) in new_uaids], now)
 
         conn.commit()
+        update_player_rank(user_id, total_rap, total_items, unique_items)
+        revalue_holdings(user_id, all_items)
         logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ [Phase 1] NEW snapshot created ({len(all_items)} items)")
 
     uaids_to_backfill = []
@@ -719,113 +914,84 @@ def save_inventory_snapshot(conn, user_id, skip_phase2=False):
     logger.info(f"[inventory_scanner] {tag} [userId {user_id}] Phase 2 check: {null_count} items with null timestamps, {len(new_uaids)} new UAIDs, {len(uaids_to_backfill)} total to backfill, skip_phase2={skip_phase2}")
 
     if uaids_to_backfill and not skip_phase2:
-        parent_cookie = getattr(_thread_local, 'cookie', ROBLOX_COOKIE)
-        parent_cookie_index = getattr(_thread_local, 'cookie_index', '?')
-        def _run_backfill2(cookie, cookie_index, snapshot_id, uaids, uid):
-            _thread_local.cookie = cookie
-            _thread_local.cookie_index = cookie_index
-            backfill_timestamps(get_conn(), snapshot_id, uaids, uid)
-        t = threading.Thread(
-            target=_run_backfill2,
-            args=(parent_cookie, parent_cookie_index, snapshot_id, uaids_to_backfill, user_id),
-            daemon=True
-        )
-        t.start()
+        enqueue_uaid_backfill(conn, user_id, uaids_to_backfill)
 
     logger.info("====================================\n")
     return snapshot_id
 
 
-# ─── Backfill UAID timestamps by UAID only ────────────────────────────────
+# ─── Owner page batching ───────────────────────────────────────────────────
 
-def backfill_uaid_by_uaid(conn, uaid, created, updated):
-    tag = thread_tag()
-    if not created and not updated:
-        return
+def parse_roblox_time(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+
+def owners_with_snapshots(conn, user_ids):
+    """The subset of `user_ids` that already have an inventory snapshot."""
+    if not user_ids:
+        return set()
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT DISTINCT "userId" FROM "InventorySnapshot"
+            WHERE "userId" = ANY(%s)
+        """, (list(user_ids),))
+        return {int(row[0]) for row in cur.fetchall()}
+
+
+def write_page_timestamps(conn, entries):
+    """
+    One bulk write of the owners-API timestamps for a page. `entries` are
+    (entry, user_id) pairs; user_id None writes every row of the UAID
+    (null-owner entries), otherwise only that user's snapshots.
+    """
+    rows = [
+        (entry['id'], parse_roblox_time(entry.get('created')), parse_roblox_time(entry.get('updated')), user_id)
+        for entry, user_id in entries
+        if entry.get('id') and (entry.get('created') or entry.get('updated'))
+    ]
+    if not rows:
+        return 0
     try:
         with conn.cursor() as cur:
-            cur.execute("""
-                UPDATE "InventoryItem"
-                SET
-                    "uaidCreatedAt" = COALESCE("uaidCreatedAt", %s),
-                    "uaidUpdatedAt" = %s
-                WHERE "userAssetId" = %s
-            """, (
-                datetime.fromisoformat(created.replace('Z', '+00:00')) if created else None,
-                datetime.fromisoformat(updated.replace('Z', '+00:00')) if updated else None,
-                uaid
-            ))
+            updated = set_uaid_timestamps_bulk(cur, rows)
+            set_holdings_updated_at_bulk(cur, [(uaid, updated_at, user_id) for uaid, _, updated_at, user_id in rows])
         conn.commit()
-        if cur.rowcount > 0:
-            logger.info(f"[inventory_scanner] {tag} Backfilled null-owner UAID {uaid}: created={created}, updated={updated}")
+        return updated
     except Exception as e:
         conn.rollback()
-        logger.warning(f"[inventory_scanner] {tag} Could not backfill UAID {uaid}: {e}")
+        logger.warning(f"[inventory_scanner] {thread_tag()} Could not write timestamps for {len(rows)} UAID(s): {e}")
+        return 0
 
 
 # ─── Owner scan ────────────────────────────────────────────────────────────
 
-def process_owner_entry(conn, entry, asset_id, job_id):
-    owner = entry.get('owner')
-    user_id = str(owner.get('id')) if owner else None
+def scan_new_owner(conn, entry, progress, skip_phase2=False, profile=None):
+    """
+    Create the User row and first snapshot for an owner with no snapshot yet.
+    `profile` is the owner's entry from resolve_profiles(), batched per page.
+    """
+    user_id = str(entry['owner']['id'])
     entry_uaid = entry.get('id')
-    entry_created = entry.get('created')
-    entry_updated = entry.get('updated')
+    entry_updated_at = parse_roblox_time(entry.get('updated'))
     tag = thread_tag()
 
-    if not user_id:
-        if entry_uaid:
-            backfill_uaid_by_uaid(conn, entry_uaid, entry_created, entry_updated)
-        return 'null'
-
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT id, "createdAt" FROM "InventorySnapshot"
-            WHERE "userId" = %s
-            ORDER BY "createdAt" DESC
-            LIMIT 1
-        """, (user_id,))
-        existing = cur.fetchone()
-
-    if existing:
-        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ⏭️ Already scanned — skipping inventory scan")
-        if entry_uaid:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE "InventoryItem" ii
-                    SET
-                        "uaidCreatedAt" = COALESCE(ii."uaidCreatedAt", %s),
-                        "uaidUpdatedAt" = %s
-                    FROM "InventorySnapshot" snap
-                    WHERE ii."snapshotId" = snap.id
-                      AND snap."userId" = %s
-                      AND ii."userAssetId" = %s
-                """, (
-                    datetime.fromisoformat(entry_created.replace('Z', '+00:00')) if entry_created else None,
-                    datetime.fromisoformat(entry_updated.replace('Z', '+00:00')) if entry_updated else None,
-                    user_id,
-                    entry_uaid
-                ))
-            conn.commit()
-        return 'skipped'
-
-    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] 📦 New user — fetching info and scanning inventory...")
+    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] 📦 New user — scanning inventory...")
 
-    user_info = fetch_user_info(user_id)
-    headshot = fetch_headshot(user_id)
-    avatar = fetch_avatar(user_id)
+    if profile is None:
+        profile = resolve_profiles([user_id]).get(int(user_id), {})
 
-    username = f'user_{user_id}'
-    display_name = username
-    avatar_url = headshot
-    description = None
+    username = profile.get('name') or profile.get('displayName') or f'user_{user_id}'
+    display_name = profile.get('displayName') or username
 
-    if user_info:
-        username = user_info.get('name') or user_info.get('displayName') or username
-        display_name = user_info.get('displayName') or username
-        description = user_info.get('description')
+    progress.set(currentUser=username)
 
-    update_job(conn, job_id, currentUser=username)
+    # The batch users API has no descriptions — fetch one only for rows that lack it
+    with conn.cursor() as cur:
+        cur.execute('SELECT description FROM "User" WHERE "robloxUserId" = %s', (user_id,))
+        row = cur.fetchone()
+    description = row[0] if row else None
+    if description is None:
+        description = fetch_user_description(user_id)
 
     with conn.cursor() as cur:
         cur.execute("""
@@ -835,30 +1001,25 @@ def process_owner_entry(conn, entry, asset_id, job_id):
             ON CONFLICT ("robloxUserId") DO UPDATE SET
                 username = EXCLUDED.username,
                 "displayName" = EXCLUDED."displayName",
-                "avatarUrl" = EXCLUDED."avatarUrl",
-                "avatarFullBodyUrl" = EXCLUDED."avatarFullBodyUrl",
-                description = EXCLUDED.description,
+                "avatarUrl" = COALESCE(EXCLUDED."avatarUrl", "User"."avatarUrl"),
+                "avatarFullBodyUrl" = COALESCE(EXCLUDED."avatarFullBodyUrl", "User"."avatarFullBodyUrl"),
+                description = COALESCE("User".description, EXCLUDED.description),
                 "updatedAt" = NOW()
-        """, (user_id, username, display_name, avatar_url, avatar, description))
+        """, (user_id, username, display_name, profile.get('headshot'), profile.get('avatar'), description))
     conn.commit()
 
     try:
-        snapshot_id = save_inventory_snapshot(conn, user_id)
+        snapshot_id = save_inventory_snapshot(conn, user_id, skip_phase2=skip_phase2)
 
         if entry_uaid and snapshot_id:
             with conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE "InventoryItem"
-                    SET
-                        "uaidCreatedAt" = COALESCE("uaidCreatedAt", %s),
-                        "uaidUpdatedAt" = %s
-                    WHERE "snapshotId" = %s AND "userAssetId" = %s
-                """, (
-                    datetime.fromisoformat(entry_created.replace('Z', '+00:00')) if entry_created else None,
-                    datetime.fromisoformat(entry_updated.replace('Z', '+00:00')) if entry_updated else None,
-                    snapshot_id,
-                    entry_uaid
-                ))
+                set_uaid_timestamps(
+                    cur, entry_uaid,
+                    parse_roblox_time(entry.get('created')),
+                    entry_updated_at,
+                    snapshot_id=snapshot_id,
+                )
+                set_holding_updated_at(cur, entry_uaid, entry_updated_at, user_id)
             conn.commit()
 
         return 'processed'
@@ -867,86 +1028,248 @@ def process_owner_entry(conn, entry, asset_id, job_id):
         return 'failed'
 
 
-# ─── Owner scan job ────────────────────────────────────────────────────────
-
-def run_owners_scan(job):
-    conn = get_conn()
-    asset_id = job['assetId']
-    job_id = job['id']
+def process_owner_page(conn, asset_id, entries, progress, stats, skip_phase2=False):
+    """
+    Handle one owners-API page. Known owners and null-owner entries only need
+    their UAID timestamps, which go out as a single bulk write; owners without
+    a snapshot are scanned one by one. Copies that changed hands since their
+    old or new holder's snapshot flag that holder for a rescan
+    (rescan_scheduler.py). Returns False if a stop was requested.
+    """
     tag = thread_tag()
+    record_owner_signals(conn, asset_id, entries)
+    valid = [e for e in entries if e.get('owner') and e['owner'].get('id')]
+    null_entries = [e for e in entries if not (e.get('owner') and e['owner'].get('id')) and e.get('id')]
+
+    known = owners_with_snapshots(conn, {int(e['owner']['id']) for e in valid})
+    timestamp_entries = [(e, None) for e in null_entries]
+    new_entries = []
+    for entry in valid:
+        user_id = int(entry['owner']['id'])
+        if user_id in known:
+            timestamp_entries.append((entry, user_id))
+        else:
+            new_entries.append(entry)
+
+    write_page_timestamps(conn, timestamp_entries)
+    stats['skipped'] += len(valid) - len(new_entries)
+    stats['null'] += len(null_entries)
+    logger.info(f"[inventory_scanner] {tag} ⏭️ {len(valid) - len(new_entries)} known owner(s), "
+                f"{len(null_entries)} null — timestamps written; {len(new_entries)} new owner(s) to scan")
+
+    profiles = resolve_profiles({int(e['owner']['id']) for e in new_entries}) if new_entries else {}
+
+    scanned = set()
+    for entry in new_entries:
+        if progress.stop_requested:
+            return False
+
+        user_id = int(entry['owner']['id'])
+        if user_id in scanned:
+            # Second copy held by an owner scanned earlier on this page
+            write_page_timestamps(conn, [(entry, user_id)])
+            stats['skipped'] += 1
+            continue
+        scanned.add(user_id)
 
-    logger.info(f"\n[inventory_scanner] {tag} 🚀 ========== OWNER SCAN START ==========")
-    logger.info(f"[inventory_scanner] {tag} 📦 Asset: {asset_id} | Job: {job_id}")
+        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [{stats['processed'] + stats['skipped'] + 1}/{stats['total']}]")
+        progress.set(currentUser=f'userId:{user_id}')
 
-    base_url = f'https://inventory.roblox.com/v2/assets/{asset_id}/owners?limit=100&sortOrder=Asc'
-    cursor = None
-    page_num = 0
-    processed = 0
-    skipped = 0
-    failed = 0
-    null_count = 0
-    total = 0
+        result = scan_new_owner(conn, entry, progress, skip_phase2, profiles.get(user_id))
+        if result == 'processed':
+            stats['processed'] += 1
+        else:
+            stats['failed'] += 1
 
-    logger.info(f"[inventory_scanner] {tag} ⏳ Cold start delay 3s...")
-    time.sleep(3)
+        progress.set(processed=stats['processed'] + stats['skipped'], failed=stats['failed'])
 
-    while True:
-        if is_stop_requested(conn, job_id):
+    progress.set(processed=stats['processed'] + stats['skipped'], failed=stats['failed'])
+    return not progress.stop_requested
+
+
+# ─── Owner scan job ────────────────────────────────────────────────────────
+# A fresh owners scan of a big item is split into UAID ranges ("shards"),
+# one per cookie, starting at cursors from UaidCursorCache: the scan's own
+# job keeps the first range and queues an 'owners_shard' job per other
+# range, which idle cookies claim like any job. Each range is checkpointed
+# in its own row; the scan's row reports the sum and is finished once every
+# range is. Items the cursor cache knows too few pages of run unsharded.
+
+_owner_scans_lock = threading.Lock()
+_owner_scans_running: dict[str, list] = {}   # owners scan id -> cookies running one of its ranges
+
+
+@contextmanager
+def owner_scan_slot(job):
+    """Mark this thread's cookie as running a range of the job's owners scan."""
+    scan_id = job.get('parentId') or job['id']
+    cookie_index = getattr(_thread_local, 'cookie_index', None)
+    with _owner_scans_lock:
+        _owner_scans_running.setdefault(scan_id, []).append(cookie_index)
+    try:
+        yield
+    finally:
+        with _owner_scans_lock:
+            cookies = _owner_scans_running[scan_id]
+            cookies.remove(cookie_index)
+            if not cookies:
+                del _owner_scans_running[scan_id]
+
+
+def busy_owner_scans():
+    """Owners scans this thread's cookie already runs a range of (claim_next_job exclude_scans)."""
+    cookie_index = getattr(_thread_local, 'cookie_index', None)
+    with _owner_scans_lock:
+        return [scan_id for scan_id, cookies in _owner_scans_running.items() if cookie_index in cookies]
+
+
+def plan_owner_shards(conn, job):
+    """
+    Split a fresh owners scan into UAID ranges at cached cursors and queue an
+    'owners_shard' job for every range but the first. Returns the scan's own
+    checkpoint — {} when it runs unsharded.
+    """
+    parts = OWNER_SCAN_SHARDS or len(ROBLOX_COOKIES)
+    if parts < 2:
+        return {}
+    bounds = cursor_index.partition(conn, job['assetId'], parts, MIN_SHARD_PAGES)
+    if not bounds:
+        return {}
+
+    starts = [start for _, _, start in bounds]
+    ends = starts[1:] + [None]
+    checkpoint = {'cursor': None, 'page': 0, 'end': starts[0], 'shards': len(bounds)}
+    with conn.cursor() as cur:
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO "ScanJob" (id, "assetId", type, status, "requestedBy", "parentId", checkpoint,
+                                   "startedAt", "updatedAt")
+            VALUES %s
+        """, [
+            (make_cuid(), job['assetId'], job.get('requestedBy'), job['id'],
+             psycopg2.extras.Json({'cursor': cursor, 'page': 0, 'start': start, 'end': end}))
+            for (cursor, _, start), end in zip(bounds, ends)
+        ], template="(%s, %s, 'owners_shard', 'pending', %s, %s, %s, NOW(), NOW())")
+        cur.execute('UPDATE "ScanJob" SET checkpoint = %s WHERE id = %s',
+                    (psycopg2.extras.Json(checkpoint), job['id']))
+    conn.commit()
+
+    logger.info(f"[inventory_scanner] {thread_tag()} 🔀 Job {job['id']} split into {len(bounds) + 1} UAID range(s) "
+                f"at cached pages {', '.join(str(page) for _, page, _ in bounds)}")
+    return checkpoint
+
+
+def merge_shard_progress(conn, job_id, progress):
+    """
+    Point progress.offsets at the counters of the scan's shard jobs, so the
+    scan's row shows the whole scan. Returns (shards still pending/running,
+    summed shard stats).
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT status, total, processed, failed, "pagesFound", checkpoint
+            FROM "ScanJob" WHERE "parentId" = %s
+        """, (job_id,))
+        rows = cur.fetchall()
+    conn.commit()
+
+    offsets = {'total': 0, 'processed': 0, 'failed': 0, 'pagesFound': 0}
+    shard_stats = {}
+    active = 0
+    for status, total, processed, failed, pages, checkpoint in rows:
+        active += status in ('pending', 'running')
+        for field, value in zip(offsets, (total, processed, failed, pages)):
+            offsets[field] += value
+        for key, value in ((checkpoint or {}).get('stats') or {}).items():
+            shard_stats[key] = shard_stats.get(key, 0) + value
+    progress.offsets = offsets
+    return active, shard_stats
+
+
+def fetch_owner_page(asset_id, cursor, end=None):
+    """
+    The owners page after `cursor` (ascending UAID) as (entries, next_cursor,
+    last_uaid). A range ending at UAID `end` drops entries past it and gets
+    next_cursor None once the page reaches it; last_uaid still describes the
+    whole page (None on the asset's last page, or if the cursor is opaque).
+    """
+    url = f'{INVENTORY_API}/v2/assets/{asset_id}/owners?limit=100&sortOrder=Asc' + (f'&cursor={cursor}' if cursor else '')
+    data = fetch_with_retry(url, max_retries=5, base_delay=3.0)
+    entries = data.get('data', [])
+    next_cursor = data.get('nextPageCursor')
+    last_uaid = cursor_start(next_cursor) if next_cursor else None
+
+    if end is not None:
+        in_range = [e for e in entries if int(e.get('id') or 0) <= end]
+        if len(in_range) < len(entries) or (last_uaid is not None and last_uaid >= end):
+            next_cursor = None
+        entries = in_range
+    return entries, next_cursor, last_uaid
+
+
+def _run_owner_pages(conn, job, skip_phase2):
+    """
+    Page loop shared by the 'owners', 'owners_full' and 'owners_shard' job
+    types.
+
+    After each fully processed page the next cursor, page number and counters
+    are checkpointed into the job row, so a job reset to 'pending' by a
+    restart resumes from there instead of page 1. A page that was cut off
+    midway is fetched again; owners scanned before the cut now have a
+    snapshot and only get the (idempotent) timestamp write. A checkpoint
+    with an `end` UAID limits the job to its range of a sharded scan.
+    """
+    asset_id = job['assetId']
+    job_id = job['id']
+    tag = thread_tag()
+    progress = JobProgress(conn, job_id)
+
+    stats = {'processed': 0, 'skipped': 0, 'failed': 0, 'null': 0, 'total': 0}
+    checkpoint = dict(job.get('checkpoint') or {})
+    if not checkpoint and job.get('type') != 'owners_shard':
+        checkpoint = plan_owner_shards(conn, job)
+    cursor = checkpoint.get('cursor')
+    page_num = checkpoint.get('page', 0)
+    end = checkpoint.get('end')
+    sharded = bool(checkpoint.get('shards'))
+    stats.update(checkpoint.get('stats', {}))
+
+    if 'start' in checkpoint:
+        logger.info(f"[inventory_scanner] {tag} 🔀 Shard of job {job['parentId']}: UAIDs after {checkpoint['start']}"
+                    + (f" up to {end}" if end is not None else ''))
+    if page_num:
+        logger.info(f"[inventory_scanner] {tag} ⏩ Resuming job {job_id} at page {page_num + 1} "
+                    f"({stats['processed'] + stats['skipped']} owner(s) already done)")
+
+    while not checkpoint.get('done'):
+        if sharded:
+            merge_shard_progress(conn, job_id, progress)
+        if progress.flush():
             logger.info(f"[inventory_scanner] {tag} 🛑 Stop requested — halting")
             break
 
-        url = base_url + (f'&cursor={cursor}' if cursor else '')
-
         try:
-            data = fetch_with_retry(url, max_retries=5, base_delay=3.0)
+            entries, next_cursor, last_uaid = fetch_owner_page(asset_id, cursor, end)
         except Exception as e:
             logger.error(f"[inventory_scanner] {tag} ❌ Failed to fetch page {page_num + 1}: {e}")
             break
 
         page_num += 1
-        entries = data.get('data', [])
-        valid = [e for e in entries if e.get('owner') and e['owner'].get('id')]
-        null_entries = [e for e in entries if not (e.get('owner') and e['owner'].get('id'))]
-
-        logger.info(f"[inventory_scanner] {tag} 📄 Page {page_num}: {len(valid)} valid, {len(null_entries)} null")
-
-        total += len(valid)
-        update_job(conn, job_id, total=total, pagesFound=page_num)
-
-        for entry in null_entries:
-            if entry.get('id'):
-                backfill_uaid_by_uaid(conn, entry['id'], entry.get('created'), entry.get('updated'))
-                null_count += 1
+        valid_count = sum(1 for e in entries if e.get('owner') and e['owner'].get('id'))
 
-        stop_inner = False
-        for entry in valid:
-            if is_stop_requested(conn, job_id):
-                stop_inner = True
-                break
-
-            user_id = entry['owner']['id']
-            logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [{processed + skipped + 1}/{total}]")
-            update_job(conn, job_id, currentUser=f'userId:{user_id}', processed=processed + skipped)
-
-            result = process_owner_entry(conn, entry, asset_id, job_id)
-            if result == 'processed':
-                processed += 1
-            elif result == 'skipped':
-                skipped += 1
-            elif result == 'failed':
-                failed += 1
+        logger.info(f"[inventory_scanner] {tag} 📄 Page {page_num}: {valid_count} valid, {len(entries) - valid_count} null")
 
-            update_job(conn, job_id, processed=processed + skipped, failed=failed)
-            time.sleep(USER_PROCESS_DELAY)
+        stats['total'] += valid_count
+        progress.set(total=stats['total'], pagesFound=page_num)
 
-        if stop_inner:
+        if not process_owner_page(conn, asset_id, entries, progress, stats, skip_phase2):
             break
 
-        next_cursor = data.get('nextPageCursor')
-
-        if next_cursor:
+        # Written on the last page too: a shard's parent sums the stats in it
+        checkpoint.update(cursor=next_cursor, page=page_num, stats=dict(stats), done=not next_cursor)
+        progress.set(checkpoint=psycopg2.extras.Json(checkpoint))
+        progress.flush()
+        if last_uaid is not None:
             try:
-                last_uaid = int(next_cursor.split('_')[0])
                 save_cursor(conn, asset_id, cursor, last_uaid, page_num - 1)
             except Exception as e:
                 logger.warning(f"[inventory_scanner] {tag} Could not save cursor cache for page {page_num}: {e}")
@@ -955,200 +1278,337 @@ def run_owners_scan(job):
         if not cursor:
             break
 
-        time.sleep(OWNER_PAGE_DELAY)
+        yield_to_priority_jobs(conn, job, progress)
 
-    final_status = 'stopped' if is_stop_requested(conn, job_id) else 'done'
-    update_job(conn, job_id, status=final_status, currentUser=None,
-               processed=processed + skipped, failed=failed)
-    conn.close()
+    # This job's own counters; progress.offsets adds the shards' on flush
+    progress.set(total=stats['total'], pagesFound=page_num,
+                 processed=stats['processed'] + stats['skipped'], failed=stats['failed'])
+    if sharded:
+        scan_stats = wait_for_owner_shards(conn, job, progress, stats, page_num)
+    else:
+        scan_stats = stats
 
-    logger.info(f"\n[inventory_scanner] {tag} {'🛑 SCAN STOPPED' if final_status == 'stopped' else '🎉 SCAN COMPLETE'} — Asset: {asset_id}")
-    logger.info(f"[inventory_scanner] {tag}   ✅ Scanned: {processed} | ⏭️ Skipped: {skipped} | ❌ Failed: {failed} | 🚫 Null: {null_count}")
+    # Delta scans trust only walks that reached the asset's last page
+    if checkpoint.get('done') and job.get('type') != 'owners_shard' and not progress.stop_requested:
+        if sharded:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT COALESCE(bool_and(COALESCE((checkpoint->>'done')::boolean, false)), false)
+                    FROM "ScanJob" WHERE "parentId" = %s
+                """, (job_id,))
+                walked_to_end = cur.fetchone()[0]
+            conn.commit()
+        else:
+            walked_to_end = True
+        if walked_to_end:
+            checkpoint['walkedToEnd'] = True
+            progress.set(checkpoint=psycopg2.extras.Json(checkpoint))
+
+    progress.flush()
+    final_status = 'stopped' if progress.stop_requested else 'done'
+    update_job(conn, job_id, status=final_status, currentUser=None)
+    return final_status, scan_stats
+
+
+def wait_for_owner_shards(conn, job, progress, stats, page_num):
+    """
+    After a sharded scan's own range: keep its row's merged progress current
+    until every shard job has finished (or stop them all on a stop request).
+    Borrowed interactive jobs fill the wait. Returns the whole scan's stats.
+    """
+    job_id = job['id']
+    while True:
+        active, shard_stats = merge_shard_progress(conn, job_id, progress)
+        progress.set(total=stats['total'], pagesFound=page_num,
+                     processed=stats['processed'] + stats['skipped'], failed=stats['failed'],
+                     currentUser=f'{active} range(s) scanning' if active else None)
+        if progress.flush() or not active:
+            break
+        if not yield_to_priority_jobs(conn, job, progress):
+            time.sleep(SHARD_POLL_INTERVAL)
 
+    if progress.stop_requested:
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE "ScanJob" SET status = 'stopped', "updatedAt" = NOW()
+                WHERE "parentId" = %s AND status IN ('pending', 'running')
+            """, (job_id,))
+        conn.commit()
+        logger.info(f"[inventory_scanner] {thread_tag()} 🛑 Stopped the remaining range(s) of job {job_id}")
+    return {key: value + shard_stats.get(key, 0) for key, value in stats.items()}
+
+
+def yield_to_priority_jobs(conn, job, progress):
+    """
+    Preemption point for long jobs (owners scans between pages, backfills
+    between assets). If interactive jobs are waiting and no scanner thread
+    is idle to take them, run them here on this cookie, then let the long
+    job resume where it was. Returns the number of jobs run. A borrowed
+    job never borrows in turn, so a slot holds at most two connections.
+    """
+    if job_wakeups.idle or getattr(_thread_local, 'borrowed', False):
+        return 0
+
+    ran = 0
+    while ran < MAX_BORROWED_JOBS:
+        borrowed = claim_next_job(conn, max_priority=PREEMPT_PRIORITY)
+        if not borrowed:
+            break
+        if ran == 0:
+            progress.set(currentUser=f"paused for {borrowed.get('type')} scan")
+            progress.flush()
+        logger.info(f"[inventory_scanner] {thread_tag()} ⏸️ Job {job['id']} yielding to job {borrowed['id']} "
+                    f"(type: {borrowed.get('type')})")
+        _thread_local.borrowed = True
+        try:
+            run_job(borrowed)
+        finally:
+            _thread_local.borrowed = False
+        ran += 1
+    return ran
 
-# ─── Full owner scan job ───────────────────────────────────────────────────
 
-def run_owners_full_scan(job):
-    conn = get_conn()
-    asset_id = job['assetId']
-    job_id = job['id']
+def run_owners_scan(job):
     tag = thread_tag()
+    logger.info(f"\n[inventory_scanner] {tag} 🚀 ========== OWNER SCAN START ==========")
+    logger.info(f"[inventory_scanner] {tag} 📦 Asset: {job['assetId']} | Job: {job['id']}")
 
-    logger.info(f"\n[inventory_scanner] {tag} 🚀 ========== FULL OWNER SCAN START ==========")
-    logger.info(f"[inventory_scanner] {tag} 📦 Asset: {asset_id} | Job: {job_id}")
+    with pooled('scanner') as conn, owner_scan_slot(job):
+        final_status, stats = _run_owner_pages(conn, job, skip_phase2=False)
 
-    base_url = f'https://inventory.roblox.com/v2/assets/{asset_id}/owners?limit=100&sortOrder=Asc'
-    cursor = None
-    page_num = 0
-    processed = 0
-    skipped = 0
-    failed = 0
-    null_count = 0
-    total = 0
+    logger.info(f"\n[inventory_scanner] {tag} {'🛑 SCAN STOPPED' if final_status == 'stopped' else '🎉 SCAN COMPLETE'} — Asset: {job['assetId']}")
+    logger.info(f"[inventory_scanner] {tag}   ✅ Scanned: {stats['processed']} | ⏭️ Skipped: {stats['skipped']} | "
+                f"❌ Failed: {stats['failed']} | 🚫 Null: {stats['null']}")
 
-    time.sleep(3)
 
-    while True:
-        if is_stop_requested(conn, job_id):
-            logger.info(f"[inventory_scanner] {tag} 🛑 Stop requested — halting")
-            break
+# ─── Full owner scan job ───────────────────────────────────────────────────
 
-        url = base_url + (f'&cursor={cursor}' if cursor else '')
+def run_owners_full_scan(job):
+    tag = thread_tag()
+    logger.info(f"\n[inventory_scanner] {tag} 🚀 ========== FULL OWNER SCAN START ==========")
+    logger.info(f"[inventory_scanner] {tag} 📦 Asset: {job['assetId']} | Job: {job['id']}")
 
-        try:
-            data = fetch_with_retry(url, max_retries=5, base_delay=3.0)
-        except Exception as e:
-            logger.error(f"[inventory_scanner] {tag} ❌ Failed to fetch page {page_num + 1}: {e}")
-            break
+    # Phase 2 backfills are skipped: the full scan visits every owner anyway
+    with pooled('scanner') as conn, owner_scan_slot(job):
+        final_status, stats = _run_owner_pages(conn, job, skip_phase2=True)
 
-        page_num += 1
-        entries = data.get('data', [])
-        valid = [e for e in entries if e.get('owner') and e['owner'].get('id')]
-        null_entries = [e for e in entries if not (e.get('owner') and e['owner'].get('id'))]
+    logger.info(f"\n[inventory_scanner] {tag} {'🛑 SCAN STOPPED' if final_status == 'stopped' else '🎉 FULL SCAN COMPLETE'}")
+    logger.info(f"[inventory_scanner] {tag}   ✅ New users: {stats['processed']} | ⏭️ Skipped: {stats['skipped']} | "
+                f"❌ Failed: {stats['failed']} | 🚫 Null: {stats['null']}")
 
-        logger.info(f"[inventory_scanner] {tag} 📄 Page {page_num}: {len(valid)} valid, {len(null_entries)} null")
 
-        total += len(valid)
-        update_job(conn, job_id, total=total, pagesFound=page_num)
+# ─── Owner scan shard job ──────────────────────────────────────────────────
 
-        for entry in null_entries:
-            if entry.get('id'):
-                backfill_uaid_by_uaid(conn, entry['id'], entry.get('created'), entry.get('updated'))
-                null_count += 1
+def run_owner_shard(job):
+    tag = thread_tag()
+    logger.info(f"[inventory_scanner] {tag} 📦 Asset: {job['assetId']} | Shard job: {job['id']} of {job['parentId']}")
 
-        stop_inner = False
-        for entry in valid:
-            if is_stop_requested(conn, job_id):
-                stop_inner = True
-                break
+    with pooled('scanner') as conn, owner_scan_slot(job):
+        with conn.cursor() as cur:
+            cur.execute('SELECT type FROM "ScanJob" WHERE id = %s', (job['parentId'],))
+            parent = cur.fetchone()
+        conn.commit()
+        # Ranges of a full scan skip Phase 2 like the full scan itself
+        skip_phase2 = bool(parent and parent[0] == 'owners_full')
+        final_status, stats = _run_owner_pages(conn, job, skip_phase2=skip_phase2)
+
+    logger.info(f"[inventory_scanner] {tag} {'🛑' if final_status == 'stopped' else '✅'} Shard {job['id']} {final_status} — "
+                f"new: {stats['processed']} | skipped: {stats['skipped']} | failed: {stats['failed']}")
+
+
+# ─── Delta owner scan job ──────────────────────────────────────────────────
+# 'owners_delta' re-scans an item against what the last walk stored: an
+# entry whose owner and "updated" time match its "CurrentHolding" row is
+# unchanged and skipped (no writes, no rescan signal). While pages keep
+# coming back unchanged the walk samples: the stride doubles up to
+# DELTA_MAX_STRIDE pages, jumping through UaidCursorCache, and the pages
+# jumped over count as unchanged if the next sample is. A sample that did
+# change sends the walk back over the pages it skipped. Sampling is only
+# trusted within DELTA_FULL_WALK_DAYS of the item's last complete walk;
+# past that every page is fetched (only changed entries are processed).
+
+DELTA_MAX_STRIDE = 16
+DELTA_FULL_WALK_DAYS = 7
+
+
+def _same_time(stored, observed):
+    """Compare a stored timestamp(3) with an owners-API time, to the millisecond."""
+    if stored is None or observed is None:
+        return False
+    observed = observed.astimezone(timezone.utc).replace(tzinfo=None)
+    return abs((stored - observed).total_seconds()) < 0.001
+
+
+def changed_owner_entries(conn, asset_id, entries):
+    """
+    The entries of an owners page that differ from "CurrentHolding": a new
+    owner, another holder still on record, a missing/different timestamp,
+    or a now-private copy someone still holds on record. Private copies no
+    snapshot holds have nothing to update and count as unchanged.
+    """
+    uaids = [int(e['id']) for e in entries if e.get('id')]
+    if not uaids:
+        return []
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT "userAssetId", "userId", "uaidUpdatedAt" FROM "CurrentHolding"
+            WHERE "assetId" = %s AND "userAssetId" = ANY(%s)
+        """, (asset_id, uaids))
+        rows = cur.fetchall()
+    conn.commit()
 
-            user_id = int(entry['owner']['id'])
-            entry_uaid = entry.get('id')
-            entry_created = entry.get('created')
-            entry_updated = entry.get('updated')
+    stored = {}
+    for uaid, user_id, updated_at in rows:
+        stored.setdefault(int(uaid), []).append((int(user_id), updated_at))
+
+    changed = []
+    for entry in entries:
+        holders = stored.get(int(entry.get('id') or 0), [])
+        owner_id = (entry.get('owner') or {}).get('id')
+        if owner_id is None:
+            unchanged = not holders
+        else:
+            unchanged = (len(holders) == 1 and holders[0][0] == int(owner_id)
+                         and _same_time(holders[0][1], parse_roblox_time(entry.get('updated'))))
+        if not unchanged:
+            changed.append(entry)
+    return changed
+
+
+def last_full_walk_days(conn, asset_id):
+    """
+    Days since an owners scan of the item last fetched every page, or None.
+    Scans mark that in their checkpoint ("walkedToEnd") only when they
+    reached the last page without skipping any.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT EXTRACT(EPOCH FROM NOW() - MAX("updatedAt")) / 86400
+            FROM "ScanJob"
+            WHERE "assetId" = %s AND "parentId" IS NULL AND status = 'done'
+              AND type IN ('owners', 'owners_full', 'owners_delta')
+              AND COALESCE((checkpoint->>'walkedToEnd')::boolean, false)
+        """, (asset_id,))
+        row = cur.fetchone()
+    conn.commit()
+    return float(row[0]) if row and row[0] is not None else None
 
-            logger.info(f"[inventory_scanner] {tag} [userId {user_id}] [{processed + skipped + 1}/{total}]")
-            update_job(conn, job_id, currentUser=f'userId:{user_id}', processed=processed + skipped)
 
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id FROM "InventorySnapshot"
-                    WHERE "userId" = %s
-                    ORDER BY "createdAt" DESC
-                    LIMIT 1
-                """, (user_id,))
-                existing_snapshot = cur.fetchone()
-
-            if existing_snapshot:
-                if entry_uaid and (entry_created or entry_updated):
-                    with conn.cursor() as cur:
-                        cur.execute("""
-                            UPDATE "InventoryItem" ii
-                            SET
-                                "uaidCreatedAt" = COALESCE(ii."uaidCreatedAt", %s),
-                                "uaidUpdatedAt" = %s
-                            FROM "InventorySnapshot" snap
-                            WHERE ii."snapshotId" = snap.id
-                            AND snap."userId" = %s
-                            AND ii."userAssetId" = %s
-                        """, (
-                            datetime.fromisoformat(entry_created.replace('Z', '+00:00')) if entry_created else None,
-                            datetime.fromisoformat(entry_updated.replace('Z', '+00:00')) if entry_updated else None,
-                            user_id,
-                            entry_uaid
-                        ))
-                    conn.commit()
-                    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ Updated timestamps for existing user")
-                else:
-                    logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ⏭️ No UAID/timestamps in entry — skipping")
-                skipped += 1
-            else:
-                logger.info(f"[inventory_scanner] {tag} [userId {user_id}] 📦 New user — fetching info and scanning inventory...")
+def _process_delta_page(conn, asset_id, entries, progress, stats):
+    """Process a delta page's changed entries. Returns (changed count, False if a stop was requested)."""
+    changed = changed_owner_entries(conn, asset_id, entries)
+    stats['unchanged'] += len(entries) - len(changed)
+    if not changed:
+        return 0, True
+    stats['total'] += sum(1 for e in changed if e.get('owner') and e['owner'].get('id'))
+    progress.set(total=stats['total'])
+    return len(changed), process_owner_page(conn, asset_id, changed, progress, stats)
 
-                user_info = fetch_user_info(user_id)
-                headshot = fetch_headshot(user_id)
-                avatar = fetch_avatar(user_id)
 
-                username = f'user_{user_id}'
-                display_name = username
-                if user_info:
-                    username = user_info.get('name') or username
-                    display_name = user_info.get('displayName') or username
+def _run_owner_delta(conn, job):
+    asset_id = job['assetId']
+    job_id = job['id']
+    tag = thread_tag()
+    progress = JobProgress(conn, job_id)
+
+    stats = {'processed': 0, 'skipped': 0, 'failed': 0, 'null': 0, 'total': 0,
+             'unchanged': 0, 'fetched': 0, 'assumed': 0}
+    checkpoint = job.get('checkpoint') or {}
+    cursor = checkpoint.get('cursor')
+    page = checkpoint.get('page', 0)   # position of `cursor`'s page in the asset
+    stats.update(checkpoint.get('stats', {}))
+
+    walked_days = last_full_walk_days(conn, asset_id)
+    sampling = walked_days is not None and walked_days <= DELTA_FULL_WALK_DAYS
+    logger.info(f"[inventory_scanner] {tag} 🔍 Delta scan from page {page + 1} — "
+                + (f"sampling unchanged stretches (last full walk {walked_days:.1f} day(s) ago)" if sampling
+                   else "no recent full walk, fetching every page"))
+
+    stride = 1
+    gap = None   # (cursor, page) of the first page jumped over before `cursor`
+    stopped = False
+    while not stopped:
+        if progress.flush():
+            logger.info(f"[inventory_scanner] {tag} 🛑 Stop requested — halting")
+            break
 
-                update_job(conn, job_id, currentUser=username)
+        try:
+            entries, next_cursor, last_uaid = fetch_owner_page(asset_id, cursor)
+        except Exception as e:
+            logger.error(f"[inventory_scanner] {tag} ❌ Failed to fetch page {page + 1}: {e}")
+            break
+        stats['fetched'] += 1
+        changed, ok = _process_delta_page(conn, asset_id, entries, progress, stats)
+        stopped = not ok
+
+        if gap:
+            gap_cursor, gap_page = gap
+            if not changed:
+                stats['assumed'] += page - gap_page
+            else:
+                # The sample moved: verify the pages jumped over, up to where it starts
+                logger.info(f"[inventory_scanner] {tag} ↩️ Page {page + 1} changed — checking pages {gap_page + 1}-{page}")
+                sample_start = cursor_start(cursor)
+                while gap_cursor and not stopped:
+                    try:
+                        gap_entries, gap_next, gap_last = fetch_owner_page(asset_id, gap_cursor, sample_start)
+                    except Exception as e:
+                        logger.warning(f"[inventory_scanner] {tag} Could not re-check page {gap_page + 1}: {e}")
+                        # Left unchecked — counts as assumed, so this walk isn't a full one
+                        stats['assumed'] += page - gap_page
+                        break
+                    stats['fetched'] += 1
+                    stopped = not _process_delta_page(conn, asset_id, gap_entries, progress, stats)[1]
+                    if gap_last is not None:
+                        save_cursor(conn, asset_id, gap_cursor, gap_last, gap_page)
+                    gap_cursor, gap_page = gap_next, gap_page + 1
+            gap = None
+
+        logger.info(f"[inventory_scanner] {tag} 📄 Page {page + 1}: {changed} changed, {len(entries) - changed} unchanged"
+                    + (f" (stride {stride})" if stride > 1 else ''))
+        if last_uaid is not None:
+            save_cursor(conn, asset_id, cursor, last_uaid, page)
+        walked_to_end = not next_cursor and not stopped and stats['assumed'] == 0
+        progress.set(pagesFound=stats['fetched'], processed=stats['processed'] + stats['skipped'], failed=stats['failed'],
+                     checkpoint=psycopg2.extras.Json({'cursor': next_cursor, 'page': page + 1, 'stats': dict(stats),
+                                                      'walkedToEnd': walked_to_end}))
+        if stopped or not next_cursor:
+            break
 
-                with conn.cursor() as cur:
-                    cur.execute("""
-                    INSERT INTO "User" ("robloxUserId", username, "displayName", "avatarUrl", "avatarFullBodyUrl",
-                                    "createdAt", "updatedAt")
-                    VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
-                    ON CONFLICT ("robloxUserId") DO UPDATE SET
-                        username = EXCLUDED.username,
-                        "displayName" = EXCLUDED."displayName",
-                        "avatarUrl" = EXCLUDED."avatarUrl",
-                        "avatarFullBodyUrl" = EXCLUDED."avatarFullBodyUrl",
-                        "updatedAt" = NOW()
-                """, (user_id, username, display_name, headshot, avatar))
-                conn.commit()
+        stride = min(stride * 2, DELTA_MAX_STRIDE) if sampling and not changed else 1
+        cursor, page = next_cursor, page + 1
+        if stride > 1:
+            jump_cursor, jump_page, _ = cursor_index.seek_page(conn, asset_id, page + stride - 1)
+            if jump_cursor and jump_page > page:
+                gap = (cursor, page)
+                cursor, page = jump_cursor, jump_page
 
-                try:
-                    snapshot_id = save_inventory_snapshot(conn, user_id, skip_phase2=True)
-
-                    if entry_uaid and snapshot_id:
-                        with conn.cursor() as cur:
-                            cur.execute("""
-                                UPDATE "InventoryItem"
-                                SET
-                                    "uaidCreatedAt" = COALESCE("uaidCreatedAt", %s),
-                                    "uaidUpdatedAt" = %s
-                                WHERE "snapshotId" = %s AND "userAssetId" = %s
-                            """, (
-                                datetime.fromisoformat(entry_created.replace('Z', '+00:00')) if entry_created else None,
-                                datetime.fromisoformat(entry_updated.replace('Z', '+00:00')) if entry_updated else None,
-                                snapshot_id,
-                                entry_uaid
-                            ))
-                        conn.commit()
-                        logger.info(f"[inventory_scanner] {tag} [userId {user_id}] ✅ Set timestamps for UAID {entry_uaid}")
-
-                    processed += 1
-                except Exception as e:
-                    logger.error(f"[inventory_scanner] {tag} [userId {user_id}] ❌ Failed to process new user: {e}")
-                    failed += 1
-
-            update_job(conn, job_id, processed=processed + skipped, failed=failed)
-            time.sleep(USER_PROCESS_DELAY)
-
-        if stop_inner:
-            break
+        yield_to_priority_jobs(conn, job, progress)
 
-        next_cursor = data.get('nextPageCursor')
-        if next_cursor:
-            try:
-                last_uaid = int(next_cursor.split('_')[0])
-                save_cursor(conn, asset_id, cursor, last_uaid, page_num - 1)
-            except Exception as e:
-                logger.warning(f"[inventory_scanner] {tag} Could not save cursor: {e}")
+    progress.flush()
+    final_status = 'stopped' if progress.stop_requested else 'done'
+    update_job(conn, job_id, status=final_status, currentUser=None)
+    return final_status, stats
 
-        cursor = next_cursor
-        if not cursor:
-            break
 
-        time.sleep(OWNER_PAGE_DELAY)
+def run_owners_delta_scan(job):
+    tag = thread_tag()
+    logger.info(f"\n[inventory_scanner] {tag} 🚀 ========== DELTA OWNER SCAN START ==========")
+    logger.info(f"[inventory_scanner] {tag} 📦 Asset: {job['assetId']} | Job: {job['id']}")
 
-    final_status = 'stopped' if is_stop_requested(conn, job_id) else 'done'
-    update_job(conn, job_id, status=final_status, currentUser=None,
-               processed=processed + skipped, failed=failed)
-    conn.close()
+    with pooled('scanner') as conn:
+        final_status, stats = _run_owner_delta(conn, job)
 
-    logger.info(f"\n[inventory_scanner] {tag} {'🛑 SCAN STOPPED' if final_status == 'stopped' else '🎉 FULL SCAN COMPLETE'}")
-    logger.info(f"[inventory_scanner] {tag}   ✅ New users: {processed} | ⏭️ Skipped: {skipped} | ❌ Failed: {failed} | 🚫 Null: {null_count}")
+    logger.info(f"\n[inventory_scanner] {tag} {'🛑 SCAN STOPPED' if final_status == 'stopped' else '🎉 DELTA SCAN COMPLETE'} — Asset: {job['assetId']}")
+    logger.info(f"[inventory_scanner] {tag}   📄 Pages fetched: {stats['fetched']} | 💤 Assumed unchanged: {stats['assumed']} | "
+                f"✅ Scanned: {stats['processed']} | ⏭️ Updated: {stats['skipped']} | 🟰 Unchanged entries: {stats['unchanged']} | "
+                f"❌ Failed: {stats['failed']}")
 
 
 # ─── Inventory scan job ────────────────────────────────────────────────────
 
 def run_inventory_scan(job):
-    conn = get_conn()
+    conn = getconn('scanner')
     user_id = job.get('userId')
     job_id = job['id']
     tag = thread_tag()
@@ -1156,7 +1616,7 @@ def run_inventory_scan(job):
     if not user_id:
         logger.error(f"[inventory_scanner] {tag} Job {job_id} has no userId — skipping")
         update_job(conn, job_id, status='done')
-        conn.close()
+        putconn(conn)
         return
 
     logger.info(f"\n[inventory_scanner] {tag} [userId {user_id}] 📦 INVENTORY SCAN JOB")
@@ -1167,13 +1627,10 @@ def run_inventory_scan(job):
             user_exists = cur.fetchone()
 
         if not user_exists:
-            user_info = fetch_user_info(str(user_id))
-            headshot = fetch_headshot(str(user_id))
-            username = f'user_{user_id}'
-            display_name = username
-            if user_info:
-                username = user_info.get('name') or username
-                display_name = user_info.get('displayName') or username
+            profile = resolve_profiles([user_id]).get(int(user_id), {})
+            username = profile.get('name') or f'user_{user_id}'
+            display_name = profile.get('displayName') or username
+            headshot = profile.get('headshot')
 
             with conn.cursor() as cur:
                 cur.execute("""
@@ -1194,56 +1651,81 @@ def run_inventory_scan(job):
         logger.error(traceback.format_exc())
         update_job(conn, job_id, status='done', currentUser=None)
     finally:
-        conn.close()
+        putconn(conn)
+
+
+# ─── Rescan job ────────────────────────────────────────────────────────────
+
+def run_rescan(job):
+    """An inventory scan queued by rescan_scheduler, unless the user was scanned since."""
+    with pooled('scanner') as conn:
+        with conn.cursor() as cur:
+            cur.execute('SELECT MAX("createdAt") FROM "InventorySnapshot" WHERE "userId" = %s', (job['userId'],))
+            latest = cur.fetchone()[0]
+        conn.commit()
+        if latest and latest >= job['startedAt']:
+            logger.info(f"[inventory_scanner] {thread_tag()} [userId {job['userId']}] ⏭️ Rescan skipped — scanned since it was queued")
+            update_job(conn, job['id'], status='done')
+            return
+    run_inventory_scan(job)
 
 
 # ─── Main scanner loop ─────────────────────────────────────────────────────
 
-def scanner_loop(cookie: str, cookie_index: int):
+def run_job(job):
+    job_type = job.get('type', 'owners')
+    if job_type == 'inventory':
+        run_inventory_scan(job)
+    elif job_type == 'owners':
+        run_owners_scan(job)
+    elif job_type == 'owners_full':
+        run_owners_full_scan(job)
+    elif job_type == 'owners_shard':
+        run_owner_shard(job)
+    elif job_type == 'owners_delta':
+        run_owners_delta_scan(job)
+    elif job_type == 'uaid_backfill':
+        run_uaid_backfill(job)
+    elif job_type == 'rescan':
+        run_rescan(job)
+    else:
+        logger.warning(f"[inventory_scanner] {thread_tag()} Unknown job type: {job_type}")
+        with pooled('scanner') as conn:
+            update_job(conn, job['id'], status='done')
+
+
+def scanner_loop(cookie: str, cookie_index: int, slot: int = 1):
     _thread_local.cookie = cookie
     _thread_local.cookie_index = cookie_index
-    tag = f"[Cookie {cookie_index}]"
+    _thread_local.slot = slot
+    tag = thread_tag()
     logger.info(f"[inventory_scanner] {tag} 🚀 Scanner thread started — cookie length: {len(cookie)}")
 
-    if cookie_index == 1:
+    if cookie_index == 1 and slot == 1:
         try:
-            conn = get_conn()
-            with conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE "ScanJob" SET status = 'pending', "updatedAt" = NOW()
-                    WHERE status = 'running'
-                """)
-            conn.commit()
-            conn.close()
-            logger.info(f"[inventory_scanner] {tag} ♻️ Reset stuck 'running' jobs to 'pending'")
+            with pooled('scanner') as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE "ScanJob" SET status = 'pending', "updatedAt" = NOW()
+                        WHERE status = 'running'
+                    """)
+                conn.commit()
+            logger.info(f"[inventory_scanner] {tag} ♻️ Reset stuck 'running' jobs to 'pending' (owners scans resume from their checkpoint)")
         except Exception as e:
             logger.warning(f"[inventory_scanner] {tag} Could not reset stuck jobs: {e}")
 
     while True:
         try:
-            conn = get_conn()
-            conn.autocommit = False
-            job = claim_next_job(conn)
-            conn.close()
+            with pooled('scanner') as conn:
+                job = claim_next_job(conn, exclude_scans=busy_owner_scans())
 
             if not job:
-                time.sleep(POLL_INTERVAL)
+                job_wakeups.wait()
                 continue
 
-            job_type = job.get('type', 'owners')
-            logger.info(f"[inventory_scanner] {tag} 📋 Claimed job {job['id']} (type: {job_type})")
-
-            if job_type == 'inventory':
-                run_inventory_scan(job)
-            elif job_type == 'owners':
-                run_owners_scan(job)
-            elif job_type == 'owners_full':
-                run_owners_full_scan(job)
-            else:
-                logger.warning(f"[inventory_scanner] {tag} Unknown job type: {job_type}")
-                conn2 = get_conn()
-                update_job(conn2, job['id'], status='done')
-                conn2.close()
+            logger.info(f"[inventory_scanner] {tag} 📋 Claimed job {job['id']} "
+                        f"(type: {job.get('type', 'owners')}, waited {float(job['waitSeconds']):.1f}s)")
+            run_job(job)
 
         except Exception as e:
             logger.error(f"[inventory_scanner] {tag} ❌ Scanner loop error: {e}")
@@ -1253,8 +1735,200 @@ def scanner_loop(cookie: str, cookie_index: int):
 
 def start_inventory_scanner():
     logger.info(f"[inventory_scanner] 🍪 Cookies loaded: {len(ROBLOX_COOKIES)}")
+    threading.Thread(target=_job_listen_loop, daemon=True).start()
+    start_cursor_index()
+    start_rescan_scheduler()
     for i, cookie in enumerate(ROBLOX_COOKIES):
         logger.info(f"[inventory_scanner] Cookie {i+1}: present={bool(cookie)}, length={len(cookie)}, prefix={cookie[:20] if cookie else 'MISSING'}")
-        t = threading.Thread(target=scanner_loop, args=(cookie, i+1), daemon=True)
-        t.start()
-        logger.info(f"[inventory_scanner] ✅ Scanner thread {i+1}/{len(ROBLOX_COOKIES)} started")
\ No newline at end of file
+        for slot in range(1, SLOTS_PER_COOKIE + 1):
+            t = threading.Thread(target=scanner_loop, args=(cookie, i+1, slot), daemon=True)
+            t.start()
+        logger.info(f"[inventory_scanner] ✅ Cookie {i+1}/{len(ROBLOX_COOKIES)}: {SLOTS_PER_COOKIE} scanner slot(s) started")
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+class _MockInventoryAPI(BaseHTTPRequestHandler):
+    """
+    Collectibles and owners pages with fixed latency; 429 + Retry-After above
+    `limit` req/s per cookie.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    pages = 5
+    latency = 0.5
+    limit = 3.0
+    owner_uaids = []
+    _lock = threading.Lock()
+    _buckets = {}   # Cookie header -> (tokens, refilled)
+
+    def _allow(self):
+        cls = type(self)
+        key = self.headers.get('Cookie', '')
+        with cls._lock:
+            now = time.monotonic()
+            tokens, refilled = cls._buckets.get(key, (cls.limit, now))
+            tokens = min(cls.limit, tokens + (now - refilled) * cls.limit)
+            allowed = tokens >= 1
+            cls._buckets[key] = (tokens - allowed, now)
+        return allowed
+
+    def _collectibles_page(self):
+        match = re.search(r'cursor=(\d+)', self.path)
+        page = int(match.group(1)) if match else 0
+        user_id = int(re.search(r'/users/(\d+)/', self.path).group(1))
+        items = [{'assetId': 1000 + k, 'userAssetId': user_id * 10_000 + page * 100 + k, 'name': 'Item'}
+                 for k in range(100)]
+        return {'data': items, 'nextPageCursor': str(page + 1) if page + 1 < type(self).pages else None}
+
+    def _owners_page(self):
+        uaids = type(self).owner_uaids
+        match = re.search(r'cursor=(\d+)_', self.path)
+        i = bisect.bisect_right(uaids, int(match.group(1))) if match else 0
+        page = uaids[i:i + 100]
+        entries = [{'id': uaid, 'owner': {'id': uaid // 3}} for uaid in page]
+        return {'data': entries, 'nextPageCursor': f'{page[-1]}_next' if i + 100 < len(uaids) else None}
+
+    def do_GET(self):
+        allowed = self._allow()
+        time.sleep(type(self).latency)
+
+        if allowed:
+            page = self._owners_page() if '/owners' in self.path else self._collectibles_page()
+            body = json.dumps(page).encode()
+            self.send_response(200)
+        else:
+            body = b'{"errors":[{"code":0,"message":"TooManyRequests"}]}'
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_mock_api(latency, limit):
+    global INVENTORY_API
+    _MockInventoryAPI.latency, _MockInventoryAPI.limit = latency, limit
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _MockInventoryAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    INVENTORY_API = f'http://127.0.0.1:{server.server_address[1]}'
+    logging.getLogger(__name__).setLevel(logging.ERROR)
+    return server
+
+
+def run_benchmark(slot_counts, seconds, pages, latency, limit):
+    """Users' collectibles fully paginated per hour by one cookie, by slot count."""
+    _MockInventoryAPI.pages = pages
+    server = _start_mock_api(latency, limit)
+
+    print(f"mock: {pages} pages/user, {latency * 1000:.0f} ms/page, limit {limit} req/s per cookie; {seconds}s per run")
+    print(f"{'slots':>5} {'users':>6} {'users/hour':>11} {'429s':>6}")
+    try:
+        for slots in slot_counts:
+            with _MockInventoryAPI._lock:
+                _MockInventoryAPI._buckets.clear()
+            cookie_key = f'bench-{slots}'
+            done = []
+            deadline = time.monotonic() + seconds
+
+            def slot_loop(slot):
+                _thread_local.cookie_index = cookie_key
+                _thread_local.slot = slot
+                user_id = slot
+                while time.monotonic() < deadline:
+                    scan_full_inventory(user_id)
+                    if time.monotonic() < deadline:
+                        done.append(user_id)
+                    user_id += slots
+
+            workers = [threading.Thread(target=slot_loop, args=(slot,)) for slot in range(1, slots + 1)]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            throttles = sum(b['throttles'] for b in rate_limits.stats()[f'cookie {cookie_key}'].values())
+            print(f"{slots:>5} {len(done):>6} {len(done) * 3600 / seconds:>11,.0f} {throttles:>6}")
+    finally:
+        server.shutdown()
+
+
+def run_shard_benchmark(cookie_counts, pages, cached_every, latency, limit):
+    """Wall-clock time to walk every owners page of one item, by cookie count."""
+    from cursor_index import CursorIndex, _AssetCursors
+
+    uaids = list(range(1_000, 1_000 + pages * 100 * 7, 7))
+    _MockInventoryAPI.owner_uaids = uaids
+    server = _start_mock_api(latency, limit)
+
+    # The cache as earlier walks and Phase 2 sweeps leave it: every `cached_every`-th page
+    index = CursorIndex()
+    cached = _AssetCursors()
+    for page in range(1, pages, cached_every):
+        cached.add(f'{uaids[page * 100 - 1]}_next', page, uaids[page * 100 + 99])
+    index._assets[1] = cached
+
+    print(f"mock: {pages} owners pages, {latency * 1000:.0f} ms/page, limit {limit} req/s per cookie; "
+          f"every {cached_every} page(s) cached")
+    print(f"{'cookies':>7} {'ranges':>6} {'pages':>6} {'seconds':>8} {'owners':>7}")
+    try:
+        for cookies in cookie_counts:
+            with _MockInventoryAPI._lock:
+                _MockInventoryAPI._buckets.clear()
+            bounds = index.partition(None, 1, cookies, MIN_SHARD_PAGES)
+            starts = [(None, 0)] + [(cursor, start) for cursor, _, start in bounds]
+            ranges = [(cursor, end) for (cursor, _), (_, end) in zip(starts, starts[1:] + [(None, None)])]
+            seen, fetched = [], []
+
+            def walk(k, cursor, end):
+                _thread_local.cookie = f'bench-{cookies}-{k}'
+                _thread_local.cookie_index = f'bench-{cookies}-{k}'
+                while True:
+                    entries, cursor, _ = fetch_owner_page(1, cursor, end)
+                    seen.extend(e['id'] for e in entries)
+                    fetched.append(1)
+                    if not cursor:
+                        break
+
+            started = time.monotonic()
+            workers = [threading.Thread(target=walk, args=(k, cursor, end)) for k, (cursor, end) in enumerate(ranges)]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            elapsed = time.monotonic() - started
+            assert sorted(seen) == uaids, 'ranges overlap or leave gaps'
+            print(f"{cookies:>7} {len(ranges):>6} {len(fetched):>6} {elapsed:>8.1f} {len(seen):>7}")
+    finally:
+        server.shutdown()
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Inventory scanner tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='users scanned per hour per cookie vs scanner slots (mock API)')
+    bench.add_argument('--slots', type=int, nargs='+', default=[1, 2, 3, 4])
+    bench.add_argument('--seconds', type=float, default=60.0)
+    bench.add_argument('--pages', type=int, default=5, help='collectibles pages per user')
+    bench.add_argument('--latency', type=float, default=0.5, help='mock seconds per page')
+    bench.add_argument('--limit', type=float, default=3.0, help='mock req/s per cookie')
+    shards = sub.add_parser('bench-shards', help='owners scan wall time vs cookies sharing it (mock API)')
+    shards.add_argument('--cookies', type=int, nargs='+', default=[1, 2, 4])
+    shards.add_argument('--pages', type=int, default=200, help='owners pages of the item')
+    shards.add_argument('--cached-every', type=int, default=10, help='one cached cursor per this many pages')
+    shards.add_argument('--latency', type=float, default=0.3, help='mock seconds per page')
+    shards.add_argument('--limit', type=float, default=3.0, help='mock req/s per cookie')
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench-shards':
+        run_shard_benchmark(args.cookies, args.pages, args.cached_every, args.latency, args.limit)
+    else:
+        run_benchmark(args.slots, args.seconds, args.pages, args.latency, args.limit)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
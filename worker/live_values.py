@@ -0,0 +1,320 @@
+# worker/live_values.py
+"""
+──────────────────────
+Live inventory revaluation.
+
+Snapshot "totalRAP" is fixed when the snapshot is written, so leaderboards
+lag the market until the next scan. This module keeps, for the latest
+snapshot of every user (read from "CurrentHolding"):
+    assetId -> {userId: quantity}
+    userId  -> live value = Σ quantity × current RAP
+
+When a price cycle reports RAP changes, main.py calls
+    apply_rap_changes(results)
+and each changed item applies  (new RAP − old RAP) × quantity  to each of
+its holders — cost is Σ holders over the changed items, nothing is
+re-summed. save_inventory_snapshot() calls
+    revalue_holdings(user_id, items)
+after a scan to swap that user's quantities.
+
+Changed values are pushed to the player leaderboard (player_ranks.py) and
+written to "LiveInventoryValue" in batches every PERSIST_INTERVAL seconds.
+
+Command line:
+    python live_values.py bench
+"""
+
+import argparse
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import psycopg2.extras
+
+from db_pool import pooled
+from player_ranks import player_ranks
+
+logger = logging.getLogger(__name__)
+
+PERSIST_INTERVAL = 30
+PERSIST_PAGE_SIZE = 5000
+
+
+class LiveValues:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # assetId -> {userId: quantity}
+        self._holders: dict[int, dict[int, int]] = {}
+        # userId -> {assetId: quantity}
+        self._holdings: dict[int, dict[int, int]] = {}
+        # assetId -> RAP the live values are currently priced at
+        self._rap: dict[int, float] = {}
+        # userId -> live value
+        self._values: dict[int, float] = {}
+        # userIds whose value changed since the last persist
+        self._dirty: set[int] = set()
+        # Updates that arrive while the initial load is running
+        self._pending_raps: dict[int, float] = {}
+        self._pending_holdings: dict[int, Counter] = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._values)
+
+    # ── Loading ────────────────────────────────────────────────────────────
+
+    def load_rows(self, holding_rows, rap_rows):
+        """
+        `holding_rows` are (assetId, userId, quantity), `rap_rows` are
+        (assetId, rap). Values for every holder are computed once here.
+        """
+        rap = {int(a): float(r) for a, r in rap_rows if r is not None}
+        holders: dict[int, dict[int, int]] = {}
+        holdings: dict[int, dict[int, int]] = {}
+        values: dict[int, float] = {}
+
+        for asset_id, user_id, quantity in holding_rows:
+            asset_id, user_id, quantity = int(asset_id), int(user_id), int(quantity)
+            holders.setdefault(asset_id, {})[user_id] = quantity
+            holdings.setdefault(user_id, {})[asset_id] = quantity
+            values[user_id] = values.get(user_id, 0.0) + quantity * rap.get(asset_id, 0.0)
+
+        with self._lock:
+            self._holders = holders
+            self._holdings = holdings
+            self._rap = rap
+            self._values = values
+            self._dirty = set(values)
+            self.loaded = True
+
+            pending_raps, self._pending_raps = self._pending_raps, {}
+            pending_holdings, self._pending_holdings = self._pending_holdings, {}
+            for user_id, counts in pending_holdings.items():
+                self._set_holdings_locked(user_id, counts)
+            self._apply_raps_locked(pending_raps)
+            snapshot = dict(self._values)
+
+        player_ranks.update_raps(snapshot)
+
+    def load_all(self, conn):
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT DISTINCT ON ("itemId") "itemId", rap
+                FROM "PriceHistory"
+                WHERE rap IS NOT NULL
+                ORDER BY "itemId", timestamp DESC
+            """)
+            rap_rows = cur.fetchall()
+
+        # Server-side cursor — the holdings aggregate can be millions of rows
+        with conn.cursor(name='live_values_load') as cur:
+            cur.itersize = 50_000
+            cur.execute("""
+                SELECT "assetId", "userId", COUNT(*)
+                FROM "CurrentHolding"
+                GROUP BY "assetId", "userId"
+            """)
+            self.load_rows(cur, rap_rows)
+        conn.commit()
+        logger.info(f"[live_values] Loaded live values for {len(self)} player(s) in {time.perf_counter() - started:.1f}s")
+
+    # ── Incremental updates ────────────────────────────────────────────────
+
+    def apply_rap_changes(self, raps: dict):
+        """`raps` maps assetId -> new RAP. Returns the number of holders revalued."""
+        with self._lock:
+            if not self.loaded:
+                self._pending_raps.update(raps)
+                return 0
+            touched = self._apply_raps_locked(raps)
+            changed = {u: self._values[u] for u in touched}
+
+        if changed:
+            player_ranks.update_raps(changed)
+        return len(touched)
+
+    def _apply_raps_locked(self, raps):
+        touched = set()
+        values = self._values
+        for asset_id, new_rap in raps.items():
+            old_rap = self._rap.get(asset_id, 0.0)
+            self._rap[asset_id] = new_rap
+            delta = new_rap - old_rap
+            if not delta:
+                continue
+            holders = self._holders.get(asset_id)
+            if not holders:
+                continue
+            for user_id, quantity in holders.items():
+                values[user_id] += delta * quantity
+            touched.update(holders)
+        self._dirty |= touched
+        return touched
+
+    def set_holdings(self, user_id, counts: Counter):
+        """Replace a user's quantities (assetId -> count) after a fresh scan."""
+        user_id = int(user_id)
+        with self._lock:
+            if not self.loaded:
+                self._pending_holdings[user_id] = counts
+                return
+            self._set_holdings_locked(user_id, counts)
+            value = self._values[user_id]
+
+        player_ranks.update_raps({user_id: value})
+
+    def _set_holdings_locked(self, user_id, counts):
+        old = self._holdings.get(user_id, {})
+        for asset_id in old.keys() - counts.keys():
+            holders = self._holders[asset_id]
+            del holders[user_id]
+            if not holders:
+                del self._holders[asset_id]
+        for asset_id, quantity in counts.items():
+            self._holders.setdefault(asset_id, {})[user_id] = quantity
+
+        self._holdings[user_id] = dict(counts)
+        # Re-summed exactly, which also clears any float drift for this user
+        self._values[user_id] = sum(q * self._rap.get(a, 0.0) for a, q in counts.items())
+        self._dirty.add(user_id)
+
+    def value(self, user_id):
+        return self._values.get(int(user_id))
+
+    # ── Persistence ────────────────────────────────────────────────────────
+
+    def take_dirty(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return [(u, self._values[u]) for u in dirty if u in self._values]
+
+    def mark_dirty(self, user_ids):
+        with self._lock:
+            self._dirty.update(user_ids)
+
+
+live_values = LiveValues()
+
+
+def apply_rap_changes(results: list[dict]):
+    """Revalue holders of every item whose RAP changed this cycle."""
+    raps = {
+        r['asset_id']: float(r['rap'])
+        for r in results
+        if r['rap'] is not None and (r['rap_changed'] or r['is_first_seen'])
+    }
+    if not raps:
+        return
+    started = time.perf_counter()
+    updates = live_values.apply_rap_changes(raps)
+    if updates:
+        logger.info(f"[live_values] 💹 Revalued {updates} holder(s) for {len(raps)} RAP change(s) "
+                    f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+def revalue_holdings(user_id, items):
+    """`items` are scanner item dicts of the user's latest snapshot."""
+    live_values.set_holdings(user_id, Counter(int(item['asset_id']) for item in items))
+
+
+def persist_live_values(conn):
+    rows = live_values.take_dirty()
+    if not rows:
+        return 0
+    now = datetime.now(timezone.utc)
+    try:
+        with conn.cursor() as cur:
+            for i in range(0, len(rows), PERSIST_PAGE_SIZE):
+                psycopg2.extras.execute_values(cur, """
+                    INSERT INTO "LiveInventoryValue" ("userId", "totalRAP", "updatedAt")
+                    VALUES %s
+                    ON CONFLICT ("userId") DO UPDATE SET
+                        "totalRAP" = EXCLUDED."totalRAP",
+                        "updatedAt" = EXCLUDED."updatedAt"
+                """, [(u, v, now) for u, v in rows[i:i + PERSIST_PAGE_SIZE]])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        live_values.mark_dirty(u for u, _ in rows)
+        raise
+    return len(rows)
+
+
+def _run_loop():
+    loaded = False
+    while True:
+        try:
+            if not loaded:
+                with pooled('live') as conn:
+                    live_values.load_all(conn)
+                loaded = True
+            while True:
+                time.sleep(PERSIST_INTERVAL)
+                # Checked out per batch — nothing is held between persists
+                with pooled('live') as conn:
+                    written = persist_live_values(conn)
+                if written:
+                    logger.info(f"[live_values] 💾 Persisted {written} live value(s)")
+        except Exception as e:
+            logger.error(f"[live_values] Error: {e} — retrying in 10s")
+            time.sleep(10)
+
+
+def start_live_values():
+    """Load holdings and start the batched persister in a background daemon thread."""
+    thread = threading.Thread(target=_run_loop, daemon=True)
+    thread.start()
+    logger.info("[live_values] 💹 Live inventory revaluation started")
+    return thread
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+def run_benchmark(users=1_000_000, assets=2500, items_per_user=30, cycles=5):
+    """
+    Synthetic holdings with skewed asset popularity; times apply_rap_changes
+    for growing numbers of changed items and reports cost per holder update.
+    """
+    rng = random.Random(1)
+    rows = Counter()
+    for user_id in range(users):
+        for _ in range(items_per_user):
+            rows[(min(assets - 1, int(assets * rng.random() ** 3)), user_id)] += 1
+
+    engine = LiveValues()
+    started = time.perf_counter()
+    engine.load_rows(((a, u, q) for (a, u), q in rows.items()), ((a, 1000.0) for a in range(assets)))
+    print(f"loaded {len(rows):,} (asset, holder) pairs for {users:,} users in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'changed':>8} {'holder updates':>15} {'ms/cycle':>10} {'ns/update':>10}")
+    for changed in (1, 10, 100, 1000):
+        updates = elapsed = 0
+        for _ in range(cycles):
+            raps = {a: 1000.0 + rng.uniform(-50, 50) for a in rng.sample(range(assets), changed)}
+            updates += sum(len(engine._holders.get(a, ())) for a in raps)
+            started = time.perf_counter()
+            with engine._lock:
+                engine._apply_raps_locked(raps)
+            elapsed += time.perf_counter() - started
+        print(f"{changed:>8} {updates // cycles:>15,} {elapsed / cycles * 1000:>10.1f} {elapsed / max(updates, 1) * 1e9:>10.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Live inventory revaluation')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='time revaluation on synthetic holdings')
+    bench.add_argument('--users', type=int, default=1_000_000)
+    bench.add_argument('--assets', type=int, default=2500)
+    bench.add_argument('--items-per-user', type=int, default=30)
+    args = parser.parse_args(argv)
+
+    run_benchmark(args.users, args.assets, args.items_per_user)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
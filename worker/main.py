@@ -9,7 +9,6 @@ import json
 import time
 import logging
 import psycopg2
-from psycopg2 import pool
 from datetime import datetime
 import traceback
 import re
@@ -17,10 +16,17 @@ from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 import uuid
 from discord import send_notifications
-from snipe_events import fire_snipe_events
+from db_pool import getconn, init_pool, putconn
+from http_client import get_session
+from snipe_events import fire_snipe_events, commit_snipe_state
 from snipe_server import start_snipe_server
+from price_ticks import publish_ticks
+from deals_board import refresh_manipulated, seed_changed_at, update_deals_board
 from manipulation_detector import detect_manipulation
 from inventory_scanner import start_inventory_scanner
+from player_ranks import start_player_ranks
+from live_values import apply_rap_changes, start_live_values
+from snapshot_store import ensure_snapshot_views
 
 logging.basicConfig(
     level=logging.INFO,
@@ -38,9 +44,6 @@ HEADERS = {
     'Content-Type': 'application/json',
 }
 
-# Connection pool
-connection_pool = None
-
 # Global cache for RAP values (persists across cycles)
 rap_cache = {}
 
@@ -59,14 +62,9 @@ def format_time_12hr(dt):
 
 
 def init_connection_pool():
-    """Initialize the connection pool"""
-    global connection_pool
+    """Initialize the shared worker connection pool (db_pool.py)"""
     try:
-        connection_pool = psycopg2.pool.SimpleConnectionPool(
-            1,
-            10,
-            DATABASE_URL
-        )
+        init_pool()
         logger.info("✅ Database connection pool initialized successfully")
     except Exception as e:
         logger.error(f"❌ Failed to initialize connection pool: {e}")
@@ -76,8 +74,7 @@ def init_connection_pool():
 def get_db_connection():
     """Get PostgreSQL connection from pool"""
     try:
-        conn = connection_pool.getconn()
-        return conn
+        return getconn('main')
     except Exception as e:
         logger.error(f"❌ Failed to get connection from pool: {e}")
         raise
@@ -86,7 +83,7 @@ def get_db_connection():
 def return_db_connection(conn):
     """Return connection to pool"""
     try:
-        connection_pool.putconn(conn)
+        putconn(conn)
     except Exception as e:
         logger.error(f"❌ Failed to return connection to pool: {e}")
 
@@ -130,6 +127,8 @@ def create_indexes():
         conn.commit()
         logger.info("✅ Database indexes created/verified")
 
+        ensure_snapshot_views(conn)
+
     except psycopg2.Error as e:
         logger.warning(f"⚠️ Index creation warning: {e}")
         if conn:
@@ -149,10 +148,9 @@ def fetch_rolimons_data():
     """Fetch all item data from Rolimons deals page (includes best price)"""
     try:
         logger.info("📡 Fetching item data from Rolimons deals page...")
-        response = requests.get(
+        response = get_session('main').get(
             'https://www.rolimons.com/deals',
             headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'},
-            timeout=30
         )
 
         logger.info(f"Response status code: {response.status_code}")
@@ -202,7 +200,7 @@ def process_items_batch(items_batch, rolimons_data, previous_raps, previous_pric
         'deals_found': 0
     }
 
-    for asset_id, name in items_batch:
+    for asset_id, name, image_url, manipulated in items_batch:
         stats['processed'] += 1
 
         item_data = rolimons_data.get(str(asset_id))
@@ -240,7 +238,8 @@ def process_items_batch(items_batch, rolimons_data, previous_raps, previous_pric
         # First-time seen item (not in cache yet) — always write initial record
         is_first_seen = previous_rap is None and previous_price is None
 
-        if best_price and current_rap and best_price < current_rap:
+        discount = None
+        if best_price and best_price > 0 and current_rap and best_price < current_rap:
             discount = ((current_rap - best_price) / current_rap) * 100
             if discount > 5:
                 stats['deals_found'] += 1
@@ -248,8 +247,11 @@ def process_items_batch(items_batch, rolimons_data, previous_raps, previous_pric
         results.append({
             'asset_id': asset_id,
             'name': name,
+            'image_url': image_url,
+            'manipulated': manipulated,
             'price': best_price,
             'rap': current_rap,
+            'discount': discount,
             'rap_changed': rap_changed,
             'old_rap': old_rap,
             'new_rap': new_rap,
@@ -681,6 +683,8 @@ def save_results_to_db(results, current_time):
         logger.info(f"💾 Database commit successful!")
 
         # ── 6. Update caches ───────────────────────────────────────────────
+        # The change-detection caches first: the rows are committed, so a
+        # failing hook below must not make the next cycle see them as new
         global rap_cache, price_cache
         for result in results:
             if result['rap'] is not None:
@@ -688,6 +692,18 @@ def save_results_to_db(results, current_time):
             if result['price'] is not None:
                 price_cache[result['asset_id']] = result['price']
 
+        for hook, args in (
+            (commit_snipe_state, ()),
+            (publish_ticks, (results,)),
+            (update_deals_board, (results, current_time)),
+            (apply_rap_changes, (results,)),
+        ):
+            try:
+                hook(*args)
+            except Exception as e:
+                logger.error(f"❌ {hook.__name__} failed after commit: {e}")
+                logger.error(traceback.format_exc())
+
     except psycopg2.Error as e:
         logger.error(f"❌ PostgreSQL error: {e}")
         logger.error(f"Error code: {e.pgcode}")
@@ -766,15 +782,17 @@ def load_price_cache():
 
         cursor.execute('''
             WITH ranked AS (
-                SELECT "itemId", price,
+                SELECT "itemId", price, timestamp,
                        ROW_NUMBER() OVER (PARTITION BY "itemId" ORDER BY timestamp DESC) as rn
                 FROM "PriceHistory"
                 WHERE price IS NOT NULL
             )
-            SELECT "itemId", price FROM ranked WHERE rn = 1
+            SELECT "itemId", price, timestamp FROM ranked WHERE rn = 1
         ''')
+        rows = cursor.fetchall()
 
-        price_cache = {row[0]: row[1] for row in cursor.fetchall()}
+        price_cache = {row[0]: row[1] for row in rows}
+        seed_changed_at({row[0]: row[2] for row in rows})
         logger.info(f"✅ Loaded {len(price_cache)} price values into cache")
 
         return price_cache
@@ -805,7 +823,7 @@ def update_item_prices():
         cursor = conn.cursor()
 
         logger.info("Fetching items from database...")
-        cursor.execute('SELECT "assetId", name FROM "Item"')
+        cursor.execute('SELECT "assetId", name, "imageUrl", manipulated FROM "Item"')
         items = cursor.fetchall()
 
         if not items:
@@ -837,6 +855,8 @@ def update_item_prices():
         try:
             detect_manipulation(cursor2)
             conn2.commit()
+            cursor2.execute('SELECT "assetId", manipulated FROM "Item"')
+            refresh_manipulated(dict(cursor2.fetchall()))
         except Exception as e:
             logger.error(f"❌ Error in manipulation detection: {e}")
             conn2.rollback()
@@ -874,11 +894,10 @@ def refresh_item_thumbnails():
             batch = all_ids[i:i+BATCH_SIZE]
             batch_str = ','.join(str(x) for x in batch)
             try:
-                res = requests.get(
+                res = get_session('main').get(
                     'https://thumbnails.roblox.com/v1/assets',
                     params={'assetIds': batch_str, 'size': '420x420', 'format': 'Webp', 'isCircular': 'false'},
                     headers=HEADERS,
-                    timeout=10
                 )
                 if res.status_code == 200:
                     data = res.json().get('data', [])
@@ -929,6 +948,8 @@ def main():
     create_indexes()
 
     start_snipe_server()
+    start_player_ranks()
+    start_live_values()
     start_inventory_scanner()
     cycle_count = 0
     thumbnail_refresh_counter = 0 
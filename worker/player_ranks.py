@@ -0,0 +1,259 @@
+# worker/player_ranks.py
+"""
+──────────────────────
+In-memory player leaderboard over each user's LATEST snapshot totals.
+
+The rank routes used to count "users with a higher value" with a
+DISTINCT ON ("userId") scan of InventorySnapshot per profile view. The
+worker now keeps one order-statistics index per metric (totalRAP,
+totalItems, uniqueItems), loaded once at startup and updated by
+save_inventory_snapshot() after every snapshot commit:
+    update_player_rank(user_id, total_rap, total_items, unique_items)
+and, for totalRAP, by live revaluation as RAP moves (see live_values.py):
+    player_ranks.update_raps({user_id: live_rap, ...})
+
+Each index is a sorted list split into buckets of ~BUCKET_SIZE values
+with a Fenwick tree over the bucket lengths, so inserts, removals and
+rank lookups are all O(log n) plus a bucket-sized memmove.
+
+The snipe server exposes this as  GET /rank?userId=123
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from db_pool import pooled
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SIZE = 1000
+
+METRICS = ('totalRAP', 'totalItems', 'uniqueItems')
+
+
+# ─── Order-statistics index ────────────────────────────────────────────────
+
+class RankIndex:
+    """Multiset of numbers answering "how many values are greater than x"."""
+
+    def __init__(self, values=()):
+        self._build(sorted(values))
+
+    def _build(self, ordered):
+        self._buckets = [ordered[i:i + BUCKET_SIZE] for i in range(0, len(ordered), BUCKET_SIZE)]
+        self._maxes = [b[-1] for b in self._buckets]
+        self._len = len(ordered)
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        tree = [0] + [len(b) for b in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, bucket, delta):
+        i = bucket + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket_count):
+        """Total values in the first `bucket_count` buckets."""
+        total = 0
+        i = bucket_count
+        tree = self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def __len__(self):
+        return self._len
+
+    def add(self, value):
+        if not self._buckets:
+            self._build([value])
+            return
+
+        b = bisect.bisect_left(self._maxes, value)
+        if b == len(self._buckets):
+            b -= 1
+        bucket = self._buckets[b]
+        bisect.insort(bucket, value)
+        self._maxes[b] = bucket[-1]
+        self._len += 1
+
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self._buckets[b:b + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self._maxes[b:b + 1] = [self._buckets[b][-1], self._buckets[b + 1][-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(b, 1)
+
+    def remove(self, value):
+        b = bisect.bisect_left(self._maxes, value)
+        if b == len(self._buckets):
+            raise ValueError(f'{value!r} not in index')
+        bucket = self._buckets[b]
+        i = bisect.bisect_left(bucket, value)
+        if i == len(bucket) or bucket[i] != value:
+            raise ValueError(f'{value!r} not in index')
+
+        del bucket[i]
+        self._len -= 1
+
+        if bucket:
+            self._maxes[b] = bucket[-1]
+            self._tree_add(b, -1)
+        else:
+            del self._buckets[b]
+            del self._maxes[b]
+            self._rebuild_tree()
+
+    def count_greater(self, value):
+        b = bisect.bisect_right(self._maxes, value)
+        at_most = self._prefix(b)
+        if b < len(self._buckets):
+            at_most += bisect.bisect_right(self._buckets[b], value)
+        return self._len - at_most
+
+
+# ─── Leaderboard ───────────────────────────────────────────────────────────
+
+class PlayerRanks:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # userId -> (totalRAP, totalItems, uniqueItems)
+        self._values: dict[int, tuple] = {}
+        self._indexes = tuple(RankIndex() for _ in METRICS)
+        # Updates that arrive while the initial load is running
+        self._pending: dict[int, tuple] = {}
+        self._pending_raps: dict[int, float] = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._values)
+
+    def load_rows(self, rows):
+        """`rows` are (userId, totalRAP, totalItems, uniqueItems) of each user's latest snapshot."""
+        values = {int(r[0]): _normalise(r[1:]) for r in rows if r[1] is not None}
+        indexes = tuple(RankIndex(v[i] for v in values.values()) for i in range(len(METRICS)))
+
+        with self._lock:
+            self._values = values
+            self._indexes = indexes
+            pending, self._pending = self._pending, {}
+            for user_id, totals in pending.items():
+                self._update_locked(user_id, totals)
+            self.loaded = True
+            pending_raps, self._pending_raps = self._pending_raps, {}
+            self._update_raps_locked(pending_raps)
+
+    def load_all(self, conn):
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT DISTINCT ON ("userId") "userId", "totalRAP", "totalItems", "uniqueItems"
+                FROM "InventorySnapshot"
+                ORDER BY "userId", "createdAt" DESC
+            """)
+            rows = cur.fetchall()
+        self.load_rows(rows)
+        logger.info(f"[player_ranks] Loaded {len(self)} player(s) in {time.perf_counter() - started:.1f}s")
+
+    def update(self, user_id, total_rap, total_items, unique_items):
+        totals = _normalise((total_rap, total_items, unique_items))
+        with self._lock:
+            if not self.loaded:
+                self._pending[int(user_id)] = totals
+                return
+            self._update_locked(int(user_id), totals)
+
+    def _update_locked(self, user_id, totals):
+        old = self._values.get(user_id)
+        if old == totals:
+            return
+        if old is not None:
+            for index, value in zip(self._indexes, old):
+                index.remove(value)
+        if totals[0] is None:
+            self._values.pop(user_id, None)
+            return
+        for index, value in zip(self._indexes, totals):
+            index.add(value)
+        self._values[user_id] = totals
+
+    def update_raps(self, raps: dict):
+        """Move users' totalRAP only (userId -> live value). Unknown users are ignored."""
+        with self._lock:
+            if not self.loaded:
+                self._pending_raps.update(raps)
+                return
+            self._update_raps_locked(raps)
+
+    def _update_raps_locked(self, raps):
+        values = self._values
+        # Past ~10% of the board, re-sorting once beats moving entries one by one
+        rebuild = len(raps) * 10 > len(values)
+        index = self._indexes[0]
+
+        for user_id, rap in raps.items():
+            old = values.get(user_id)
+            if old is None or old[0] == rap:
+                continue
+            values[user_id] = (float(rap),) + old[1:]
+            if not rebuild:
+                index.remove(old[0])
+                index.add(float(rap))
+
+        if rebuild:
+            self._indexes = (RankIndex(v[0] for v in values.values()),) + self._indexes[1:]
+
+    def ranks(self, user_id):
+        """Return {metric: rank} (1 = highest) for this user, or None if unranked."""
+        with self._lock:
+            totals = self._values.get(int(user_id))
+            if totals is None:
+                return None
+            return {
+                metric: index.count_greater(value) + 1
+                for metric, index, value in zip(METRICS, self._indexes, totals)
+            }
+
+
+def _normalise(totals):
+    total_rap, total_items, unique_items = totals
+    if total_rap is None:
+        return (None, None, None)
+    return (float(total_rap), int(total_items or 0), int(unique_items or 0))
+
+
+player_ranks = PlayerRanks()
+
+
+def update_player_rank(user_id, total_rap, total_items, unique_items):
+    player_ranks.update(user_id, total_rap, total_items, unique_items)
+
+
+def _load_loop():
+    while True:
+        try:
+            with pooled('live') as conn:
+                player_ranks.load_all(conn)
+            return
+        except Exception as e:
+            logger.error(f"[player_ranks] Initial load failed: {e} — retrying in 10s")
+            time.sleep(10)
+
+
+def start_player_ranks():
+    """Load the leaderboard in a background daemon thread."""
+    thread = threading.Thread(target=_load_loop, daemon=True)
+    thread.start()
+    logger.info("[player_ranks] 🏅 Loading player leaderboard")
+    return thread
@@ -0,0 +1,133 @@
+# worker/price_ticks.py
+"""
+──────────────────────
+Live price/RAP ticks for item and deals pages.
+
+After every committed price cycle, main.py calls
+    publish_ticks(results)
+with the list produced by process_items_data(). Every item whose best
+price or RAP changed is pushed to the connections subscribed to it.
+
+The snipe server exposes this as  GET /ticks?assets=1,2,3  (or
+?assets=all for every item). Subscriptions are held per asset, so a
+client watching 3 items is only ever handed those 3 items' ticks. On
+connect the client first receives the latest known values of its
+assets, so it never has to query PriceHistory to get started.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_ASSETS_PER_CONNECTION = 200
+TICK_QUEUE_SIZE = 1000
+
+ALL_ASSETS = 'all'
+
+
+class TickSubscriber:
+    __slots__ = ('queue', 'overflowed')
+
+    def __init__(self, maxsize=TICK_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+
+# assetId -> (price, rap, epoch ms of the last change)
+_latest: dict[int, tuple] = {}
+
+# assetId -> subscribers watching it; ALL_ASSETS -> subscribers watching everything
+_subscribers: dict[int | str, set[TickSubscriber]] = {}
+_lock = threading.Lock()
+
+
+def _payload(asset_id, price, rap, ts):
+    return json.dumps({'assetId': str(asset_id), 'price': price, 'rap': rap, 'ts': ts})
+
+
+def subscribe_ticks(asset_ids) -> TickSubscriber:
+    """
+    `asset_ids` is a list of ints, or ALL_ASSETS. The subscriber's queue
+    is pre-filled with the latest values of those assets.
+    """
+    keys = [ALL_ASSETS] if asset_ids == ALL_ASSETS else list(asset_ids)
+
+    with _lock:
+        if asset_ids == ALL_ASSETS:
+            snapshot = list(_latest.items())
+        else:
+            snapshot = [(a, _latest[a]) for a in keys if a in _latest]
+
+        # Room for the whole snapshot on top of the normal live backlog
+        sub = TickSubscriber(TICK_QUEUE_SIZE + len(snapshot))
+        for asset_id, (price, rap, ts) in snapshot:
+            sub.queue.put_nowait(_payload(asset_id, price, rap, ts))
+
+        for key in keys:
+            _subscribers.setdefault(key, set()).add(sub)
+    return sub
+
+
+def unsubscribe_ticks(asset_ids, sub: TickSubscriber):
+    keys = [ALL_ASSETS] if asset_ids == ALL_ASSETS else list(asset_ids)
+    with _lock:
+        for key in keys:
+            subs = _subscribers.get(key)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del _subscribers[key]
+
+
+def publish_ticks(results: list[dict]):
+    """Record the latest values and push a tick for every changed item."""
+    ts = int(time.time() * 1000)
+    sent = 0
+
+    with _lock:
+        everyone = _subscribers.get(ALL_ASSETS, ())
+
+        for r in results:
+            asset_id = int(r['asset_id'])
+            price, rap = r.get('price'), r.get('rap')
+            previous = _latest.get(asset_id)
+            if previous is not None and previous[0] == price and previous[1] == rap:
+                continue
+
+            _latest[asset_id] = (price, rap, ts)
+
+            watchers = _subscribers.get(asset_id)
+            if not watchers and not everyone:
+                continue
+
+            payload = _payload(asset_id, price, rap, ts)
+            for subs in (watchers or (), everyone):
+                for sub in subs:
+                    if sub.overflowed:
+                        continue
+                    try:
+                        sub.queue.put_nowait(payload)
+                        sent += 1
+                    except queue.Full:
+                        # Slow client — close it; on reconnect it gets a fresh snapshot
+                        sub.overflowed = True
+
+    if sent:
+        logger.debug(f"[price_ticks] Pushed {sent} tick(s)")
+
+
+def parse_assets_param(raw: str):
+    """Parse ?assets=... into a list of asset ids, ALL_ASSETS, or None if invalid."""
+    if raw == ALL_ASSETS:
+        return ALL_ASSETS
+    try:
+        asset_ids = list(dict.fromkeys(int(a) for a in raw.split(',') if a.strip()))
+    except ValueError:
+        return None
+    if not asset_ids or len(asset_ids) > MAX_ASSETS_PER_CONNECTION:
+        return None
+    return asset_ids
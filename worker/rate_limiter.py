@@ -0,0 +1,288 @@
+# worker/rate_limiter.py
+"""
+──────────────────────
+Adaptive request pacing for the Roblox APIs, replacing the scanner's fixed
+sleeps (PAGE_DELAY, OWNER_PAGE_DELAY, the UAID-search breathers, the 30s
+Phase 2 pause...).
+
+One AdaptiveBucket per (cookie, endpoint family), shared by every thread
+using that cookie — the cookie's scanner thread and its Phase 2 backfills
+draw from the same buckets. A family is the URL's host + path with numeric
+ids collapsed, e.g.  inventory.roblox.com/v2/assets/*/owners.
+
+Each bucket is a token bucket whose refill rate is learned with AIMD:
+  - until the first 429 (slow start) every success adds SLOW_START_STEP
+    req/s, so the rate grows exponentially towards the real limit
+  - after that successes add ADDITIVE_INCREASE req/s per second of traffic
+    (linear probing, up to MAX_RATE)
+  - a 429 halves the rate (at most once per throttle window, so a burst
+    of in-flight 429s counts as one signal) and blocks the bucket for
+    Retry-After seconds, or DEFAULT_RETRY_AFTER when the header is missing
+
+    bucket = rate_limits.bucket(cookie_index, url)
+    bucket.acquire()              # blocks until a request may go out
+    ...
+    bucket.succeeded()  /  bucket.throttled(res.headers.get('Retry-After'))
+
+rate_limit_stats() reports the learned rates (snipe server: GET /rate-limits).
+
+Benchmark against a local mock Roblox API with a configurable limit —
+fixed delays vs adaptive buckets:
+
+    python rate_limiter.py bench --limit 4 --threads 2 --seconds 30
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+INITIAL_RATE = 1.0          # req/s — the old PAGE_DELAY pacing
+MIN_RATE = 0.05
+MAX_RATE = 20.0
+SLOW_START_STEP = 0.25      # req/s per success before the first 429
+ADDITIVE_INCREASE = 0.2     # req/s per second after it
+MULTIPLICATIVE_DECREASE = 0.5
+BURST = 2.0
+DEFAULT_RETRY_AFTER = 5.0
+
+
+def endpoint_family(url):
+    parsed = urlparse(url)
+    return (parsed.netloc or '') + re.sub(r'/\d+(?=/|$)', '/*', parsed.path)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveBucket:
+    def __init__(self, rate=INITIAL_RATE, burst=BURST):
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = 1.0
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_cut = 0.0
+        self._slow_start = True
+        self.successes = 0
+        self.throttles = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self):
+        """Reserve one request slot, sleeping until it is due."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            # A negative balance is debt: this caller's slot is that far in the future
+            wait = max(-self._tokens / self.rate, self._blocked_until - now, 0.0)
+            self.waited += wait
+        if wait:
+            time.sleep(wait)
+
+    def succeeded(self):
+        with self._lock:
+            self.successes += 1
+            self._refill(time.monotonic())
+            step = SLOW_START_STEP if self._slow_start else ADDITIVE_INCREASE / self.rate
+            self.rate = min(MAX_RATE, self.rate + step)
+
+    def throttled(self, retry_after=None):
+        """Record a 429. Returns the pause applied to the bucket, in seconds."""
+        pause = parse_retry_after(retry_after)
+        if pause is None:
+            pause = DEFAULT_RETRY_AFTER
+        with self._lock:
+            now = time.monotonic()
+            self.throttles += 1
+            self._slow_start = False
+            self._refill(now)
+            if now - self._last_cut >= max(pause, 1.0 / self.rate):
+                self.rate = max(MIN_RATE, self.rate * MULTIPLICATIVE_DECREASE)
+                self._last_cut = now
+            self._tokens = min(self._tokens, 0.0)
+            self._blocked_until = max(self._blocked_until, now + pause)
+        return pause
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rate': round(self.rate, 3),
+                'successes': self.successes,
+                'throttles': self.throttles,
+                'waitedS': round(self.waited, 1),
+            }
+
+
+class RateLimits:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple, AdaptiveBucket] = {}
+
+    def bucket(self, cookie_key, url):
+        key = (str(cookie_key), endpoint_family(url))
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = AdaptiveBucket()
+            return bucket
+
+    def stats(self):
+        with self._lock:
+            buckets = list(self._buckets.items())
+        out = {}
+        for (cookie_key, family), bucket in buckets:
+            out.setdefault(f'cookie {cookie_key}', {})[family] = bucket.stats()
+        return out
+
+
+rate_limits = RateLimits()
+
+
+def rate_limit_stats():
+    return rate_limits.stats()
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+class _MockRoblox(BaseHTTPRequestHandler):
+    """Answers 200 within `limit` req/s (token bucket), 429 + Retry-After beyond it."""
+    limit = 4.0
+    retry_after = 1
+    _lock = threading.Lock()
+    _tokens = 0.0
+    _refilled = 0.0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls._lock:
+            now = time.monotonic()
+            cls._tokens = min(cls.limit, cls._tokens + (now - cls._refilled) * cls.limit)
+            cls._refilled = now
+            allowed = cls._tokens >= 1
+            if allowed:
+                cls._tokens -= 1
+
+        if allowed:
+            body = json.dumps({'data': [], 'nextPageCursor': None}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+        else:
+            body = b'{"errors":[{"code":0,"message":"TooManyRequests"}]}'
+            self.send_response(429)
+            self.send_header('Retry-After', str(cls.retry_after))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _fixed_client(url, deadline, counts, delay, base_delay=3.0):
+    """The old pacing: fixed sleep per request, exponential sleep on 429."""
+    session = requests.Session()
+    attempt = 0
+    while time.monotonic() < deadline:
+        res = session.get(url, timeout=10)
+        if res.status_code == 429:
+            counts['throttled'] += 1
+            time.sleep(base_delay * (2 ** attempt))
+            attempt = min(attempt + 1, 4)
+            continue
+        attempt = 0
+        counts['ok'] += 1
+        time.sleep(delay)
+
+
+def _adaptive_client(url, deadline, counts, limits):
+    session = requests.Session()
+    bucket = limits.bucket('bench', url)
+    while time.monotonic() < deadline:
+        bucket.acquire()
+        res = session.get(url, timeout=10)
+        if res.status_code == 429:
+            counts['throttled'] += 1
+            bucket.throttled(res.headers.get('Retry-After'))
+            continue
+        counts['ok'] += 1
+        bucket.succeeded()
+
+
+def run_benchmark(limit, threads, seconds, fixed_delay, retry_after):
+    _MockRoblox.limit = limit
+    _MockRoblox.retry_after = retry_after
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _MockRoblox)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/v2/assets/1/owners?limit=100'
+
+    print(f"mock limit {limit} req/s, {threads} thread(s) sharing one cookie, {seconds}s per run")
+    print(f"{'pacing':<10} {'ok':>6} {'429s':>6} {'ok/s':>7}")
+    try:
+        for label in ('fixed', 'adaptive'):
+            counts = {'ok': 0, 'throttled': 0}
+            limits = RateLimits()
+            with _MockRoblox._lock:
+                _MockRoblox._tokens, _MockRoblox._refilled = limit, time.monotonic()
+            deadline = time.monotonic() + seconds
+            if label == 'fixed':
+                target, extra = _fixed_client, (fixed_delay,)
+            else:
+                target, extra = _adaptive_client, (limits,)
+            workers = [threading.Thread(target=target, args=(url, deadline, counts) + extra) for _ in range(threads)]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            print(f"{label:<10} {counts['ok']:>6} {counts['throttled']:>6} {counts['ok'] / seconds:>7.2f}")
+            if label == 'adaptive':
+                learned = limits.stats()['cookie bench']
+                print(f"learned rate: {next(iter(learned.values()))['rate']} req/s")
+    finally:
+        server.shutdown()
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Adaptive per-cookie Roblox API rate limiting')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='fixed delays vs AIMD buckets against a local mock API')
+    bench.add_argument('--limit', type=float, default=4.0, help='mock server limit, req/s')
+    bench.add_argument('--threads', type=int, default=2, help='threads sharing the cookie')
+    bench.add_argument('--seconds', type=float, default=30.0)
+    bench.add_argument('--fixed-delay', type=float, default=1.0, help='old per-request sleep')
+    bench.add_argument('--retry-after', type=int, default=1, help='Retry-After the mock sends with 429s')
+    args = parser.parse_args(argv)
+
+    run_benchmark(args.limit, args.threads, args.seconds, args.fixed_delay, args.retry_after)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
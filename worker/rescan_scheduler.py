@@ -0,0 +1,214 @@
+# worker/rescan_scheduler.py
+"""
+──────────────────────
+Change-aware inventory rescans: spend the cookies' request budget on
+users whose holdings probably changed, instead of blind refreshes.
+
+Owners scans see every copy's owner and "updated" time (when the UAID
+last changed hands). For each owners page the scanner calls
+    record_owner_signals(conn, asset_id, entries)
+which compares them with each involved user's LATEST snapshot time:
+  gained   the listed owner has a snapshot older than the copy's last
+           transfer — it reached them after their snapshot
+  lost     "CurrentHolding" still gives the copy to someone else whose
+           snapshot is older than the transfer (or the copy is now held
+           privately) — it left them after their snapshot
+Both are upserted into "RescanCandidate" (per user: newest transfer seen,
+number of signals). Owners without a snapshot are skipped — the owners
+scan creates theirs anyway.
+
+The feeder thread (start_rescan_scheduler) runs every RESCAN_INTERVAL
+seconds:
+  - drops candidates whose latest snapshot is already newer than the
+    transfer that flagged them
+  - tops up the pending 'rescan' ScanJobs to RESCAN_QUEUE_DEPTH, picking
+    candidates by  staleness (hours since last snapshot) × ln(2 + value)
+    where value is the live inventory value (LiveInventoryValue, falling
+    back to the snapshot's totalRAP) — stale, valuable inventories first,
+    without a whale outranking every other user forever
+Users with a pending/running inventory scan are left for later, and
+snapshots younger than RESCAN_MIN_AGE hours are not re-scanned yet.
+'rescan' jobs rank after owners scans (scan_scheduler.TYPE_PRIORITY) and
+are skipped if the user was scanned after they were queued.
+
+rescan_stats() reports the counters (snipe server: GET /rescans).
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+
+import psycopg2.extras
+
+from db_pool import pooled
+
+logger = logging.getLogger(__name__)
+
+RESCAN_INTERVAL = 60
+RESCAN_QUEUE_DEPTH = int(os.getenv('RESCAN_QUEUE_DEPTH', '20'))
+RESCAN_MIN_AGE = 1   # hours
+
+
+class RescanStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.flagged = 0
+        self.enqueued = 0
+        self.pruned = 0
+        self.candidates = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self):
+        with self._lock:
+            return {'flagged': self.flagged, 'enqueued': self.enqueued, 'pruned': self.pruned,
+                    'candidates': self.candidates}
+
+
+rescan_counters = RescanStats()
+
+
+def record_owner_signals(conn, asset_id, entries):
+    """
+    Record the users an owners page shows as changed since their last
+    snapshot (see module docstring). Returns the number of users flagged.
+    """
+    rows = [
+        (int(e['id']), int(e['owner']['id']) if (e.get('owner') or {}).get('id') else None, e['updated'])
+        for e in entries
+        if e.get('id') and e.get('updated')
+    ]
+    if not rows:
+        return 0
+    try:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(cur, f"""
+                WITH v (user_asset_id, owner_id, updated_at) AS (VALUES %s),
+                signals AS (
+                    SELECT v.owner_id AS user_id, v.updated_at
+                    FROM v
+                    JOIN LATERAL (
+                        SELECT MAX("createdAt") AS at FROM "InventorySnapshot" WHERE "userId" = v.owner_id
+                    ) s ON TRUE
+                    WHERE v.updated_at > s.at
+                    UNION ALL
+                    SELECT h."userId", v.updated_at
+                    FROM v
+                    JOIN "CurrentHolding" h ON h."assetId" = {int(asset_id)} AND h."userAssetId" = v.user_asset_id
+                    JOIN LATERAL (
+                        SELECT MAX("createdAt") AS at FROM "InventorySnapshot" WHERE "userId" = h."userId"
+                    ) s ON TRUE
+                    WHERE h."userId" IS DISTINCT FROM v.owner_id AND v.updated_at > s.at
+                )
+                INSERT INTO "RescanCandidate" ("userId", "changedAt", signals, "updatedAt")
+                SELECT user_id, MAX(updated_at), COUNT(*), NOW() FROM signals GROUP BY user_id
+                ON CONFLICT ("userId") DO UPDATE SET
+                    "changedAt" = GREATEST("RescanCandidate"."changedAt", EXCLUDED."changedAt"),
+                    signals = "RescanCandidate".signals + EXCLUDED.signals,
+                    "updatedAt" = NOW()
+            """, rows, template="(%s::bigint, %s::bigint, %s::timestamptz AT TIME ZONE 'UTC')", page_size=len(rows))
+            flagged = cur.rowcount
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"[rescan_scheduler] Could not record change signals for asset {asset_id}: {e}")
+        return 0
+    rescan_counters.add(flagged=flagged)
+    return flagged
+
+
+def prune_candidates(conn):
+    """Drop candidates rescanned after the transfer that flagged them."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM "RescanCandidate" c
+            WHERE EXISTS (
+                SELECT 1 FROM "InventorySnapshot" s
+                WHERE s."userId" = c."userId" AND s."createdAt" >= c."changedAt"
+            )
+        """)
+        pruned = cur.rowcount
+        cur.execute('SELECT COUNT(*) FROM "RescanCandidate"')
+        remaining = cur.fetchone()[0]
+    conn.commit()
+    return pruned, remaining
+
+
+def enqueue_rescans(conn, depth=RESCAN_QUEUE_DEPTH):
+    """
+    Queue 'rescan' jobs for the highest-scoring candidates until `depth`
+    are pending. Queued candidates are removed; new signals re-add them.
+    Returns the number queued.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM \"ScanJob\" WHERE type = 'rescan' AND status = 'pending'")
+        room = depth - cur.fetchone()[0]
+        if room <= 0:
+            conn.commit()
+            return 0
+
+        cur.execute("""
+            SELECT c."userId"
+            FROM "RescanCandidate" c
+            JOIN LATERAL (
+                SELECT "createdAt", "totalRAP" FROM "InventorySnapshot"
+                WHERE "userId" = c."userId"
+                ORDER BY "createdAt" DESC LIMIT 1
+            ) s ON TRUE
+            LEFT JOIN "LiveInventoryValue" l ON l."userId" = c."userId"
+            WHERE s."createdAt" < NOW() - make_interval(hours => %(min_age)s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM "ScanJob" j
+                  WHERE j."userId" = c."userId" AND j.type IN ('inventory', 'rescan')
+                    AND j.status IN ('pending', 'running')
+              )
+            ORDER BY EXTRACT(EPOCH FROM NOW() - s."createdAt") / 3600
+                     * LN(2 + GREATEST(COALESCE(l."totalRAP", s."totalRAP", 0), 0)) DESC
+            LIMIT %(room)s
+            FOR UPDATE OF c SKIP LOCKED
+        """, {'min_age': RESCAN_MIN_AGE, 'room': room})
+        user_ids = [row[0] for row in cur.fetchall()]
+
+        if user_ids:
+            psycopg2.extras.execute_values(cur, """
+                INSERT INTO "ScanJob" (id, "userId", type, status, "startedAt", "updatedAt")
+                VALUES %s
+            """, [(f'c{uuid.uuid4().hex}', user_id) for user_id in user_ids],
+                template="(%s, %s, 'rescan', 'pending', NOW(), NOW())")
+            cur.execute('DELETE FROM "RescanCandidate" WHERE "userId" = ANY(%s)', (user_ids,))
+    conn.commit()
+    return len(user_ids)
+
+
+def _run_loop():
+    while True:
+        try:
+            with pooled('scanner') as conn:
+                pruned, remaining = prune_candidates(conn)
+                queued = enqueue_rescans(conn)
+            rescan_counters.add(pruned=pruned, enqueued=queued)
+            with rescan_counters._lock:
+                rescan_counters.candidates = remaining - queued
+            if queued:
+                logger.info(f"[rescan_scheduler] 🔁 Queued {queued} rescan(s); "
+                            f"{remaining - queued} candidate(s) waiting, {pruned} already rescanned")
+        except Exception as e:
+            logger.warning(f"[rescan_scheduler] Rescan cycle failed: {e}")
+        time.sleep(RESCAN_INTERVAL)
+
+
+def start_rescan_scheduler():
+    """Start the candidate → 'rescan' job feeder in a background daemon thread."""
+    thread = threading.Thread(target=_run_loop, daemon=True)
+    thread.start()
+    logger.info(f"[rescan_scheduler] 🔁 Change-aware rescans started (queue depth {RESCAN_QUEUE_DEPTH})")
+    return thread
+
+
+def rescan_stats():
+    return rescan_counters.snapshot()
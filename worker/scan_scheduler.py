@@ -0,0 +1,229 @@
+# worker/scan_scheduler.py
+"""
+──────────────────────
+ScanJob scheduling: which pending job a free scanner thread claims next.
+
+Claim order, replacing strict FIFO on "startedAt":
+  1. type priority  TYPE_PRIORITY — interactive inventory scans before
+                    owners scans before full owners scans before
+                    change-driven rescans (rescan_scheduler.py) before
+                    Phase 2 UAID backfills. Priority ages by
+                    one whole level per AGING_SECONDS waited, down to
+                    AGING_FLOOR: a long-queued owners_full job climbs ahead
+                    of fresh owners scans rather than starving, but no
+                    long job ever overtakes a fresh inventory scan.
+  2. fair share     among equal aged levels, the requester with the fewest
+                    jobs already running goes first. The requester is
+                    "requestedBy" (the admin who queued an owners scan) or,
+                    for inventory scans, the scanned "userId".
+  3. FIFO           "startedAt" (enqueue time).
+
+An 'owners_shard' job (one UAID range of a sharded owners scan, see
+inventory_scanner.plan_owner_shards) ranks as its parent scan's type. A
+cookie already running a range of a scan passes it in `exclude_scans`, so
+the scan's ranges spread over different cookies.
+
+Long jobs yield to interactive ones at page/asset boundaries (see
+inventory_scanner.yield_to_priority_jobs): when no scanner thread is idle,
+the long job claims the waiting job with
+claim_next_job(conn, max_priority=PREEMPT_PRIORITY), runs it on its own
+cookie, and then resumes where it was.
+
+Each claim stamps "claimedAt" and records the queue wait per job type;
+scan_wait_stats() reports it (snipe server: GET /scan-stats).
+
+`python scan_scheduler.py bench` replays a queue in a temporary "ScanJob"
+table and prints the claim order.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+
+import psycopg2
+import psycopg2.extras
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+TYPE_PRIORITY = {
+    'inventory': 0,
+    'owners': 10,
+    'owners_full': 20,
+    'owners_delta': 20,
+    'rescan': 25,
+    'uaid_backfill': 30,
+}
+DEFAULT_PRIORITY = 10
+# Only types more urgent than this may borrow a running job's cookie
+PREEMPT_PRIORITY = TYPE_PRIORITY['owners']
+AGING_SECONDS = 60
+# Aging never lifts a job past this level, so interactive scans stay first
+AGING_FLOOR = TYPE_PRIORITY['inventory'] + 1
+
+
+def _priority_sql(column):
+    cases = ' '.join(f"WHEN '{t}' THEN {p}" for t, p in TYPE_PRIORITY.items())
+    return f'(CASE {column} {cases} ELSE {DEFAULT_PRIORITY} END)'
+
+
+def _aged_priority_sql(priority):
+    # Whole levels, so jobs queued about as long tie and fall through to
+    # fair share; types already below the floor don't age at all.
+    return (f'GREATEST({priority} - FLOOR(EXTRACT(EPOCH FROM NOW() - j."startedAt") / %(aging)s), '
+            f'LEAST({priority}, {AGING_FLOOR}))')
+
+
+def claim_next_job(conn, max_priority=None, exclude_scans=()):
+    """
+    Claim the next pending job, or None. With `max_priority`, only types
+    whose base priority is below it are considered — used by running long
+    jobs to let interactive jobs borrow their cookie. Owners scans in
+    `exclude_scans` (job ids) are skipped along with their shards.
+    """
+    priority = _priority_sql('COALESCE(p.type, j.type)')
+    filters = ''
+    params = {'aging': AGING_SECONDS}
+    if max_priority is not None:
+        filters += f' AND {priority} < %(max_priority)s'
+        params['max_priority'] = max_priority
+    if exclude_scans:
+        filters += ' AND COALESCE(j."parentId", j.id) <> ALL(%(exclude_scans)s)'
+        params['exclude_scans'] = list(exclude_scans)
+
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(f"""
+            WITH running AS (
+                SELECT COALESCE("requestedBy", "userId") AS requester, COUNT(*) AS n
+                FROM "ScanJob"
+                WHERE status = 'running'
+                GROUP BY 1
+            ),
+            next_job AS (
+                SELECT j.id
+                FROM "ScanJob" j
+                LEFT JOIN running r ON r.requester = COALESCE(j."requestedBy", j."userId")
+                LEFT JOIN "ScanJob" p ON p.id = j."parentId"
+                WHERE j.status = 'pending'{filters}
+                ORDER BY
+                    {_aged_priority_sql(priority)},
+                    COALESCE(r.n, 0),
+                    j."startedAt"
+                LIMIT 1
+                FOR UPDATE OF j SKIP LOCKED
+            )
+            UPDATE "ScanJob"
+            SET status = 'running', "claimedAt" = NOW(), "updatedAt" = NOW()
+            WHERE id = (SELECT id FROM next_job)
+            RETURNING *, EXTRACT(EPOCH FROM NOW() - "startedAt") AS "waitSeconds"
+        """, params)
+        job = cur.fetchone()
+    conn.commit()
+
+    if job:
+        wait_stats.record(job.get('type') or 'owners', float(job['waitSeconds'] or 0))
+    return job
+
+
+# ─── Wait-time stats ───────────────────────────────────────────────────────
+
+class WaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # type -> [claimed, total wait, max wait]
+        self._by_type: dict[str, list] = {}
+
+    def record(self, job_type, wait):
+        with self._lock:
+            entry = self._by_type.setdefault(job_type, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += wait
+            entry[2] = max(entry[2], wait)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                t: {'claimed': n, 'waitAvgS': round(total / n, 2), 'waitMaxS': round(peak, 2)}
+                for t, (n, total, peak) in self._by_type.items()
+            }
+
+
+wait_stats = WaitStats()
+
+
+def scan_wait_stats():
+    return wait_stats.snapshot()
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+def run_benchmark(conn, jobs_per_requester, slots):
+    """
+    Claim order for two requesters' owners scans — A's all queued before
+    B's — with `slots` jobs running at once, then an hours-old backfill and
+    rescan against a fresh inventory scan. Runs on a temporary "ScanJob"
+    table, which shadows the real one for this session only.
+    """
+    with conn.cursor() as cur:
+        cur.execute('CREATE TEMP TABLE "ScanJob" (LIKE public."ScanJob" INCLUDING DEFAULTS)')
+        for i in range(jobs_per_requester * 2):
+            requester = 1 if i < jobs_per_requester else 2
+            cur.execute("""
+                INSERT INTO "ScanJob" (id, "assetId", type, status, "requestedBy", "startedAt", "updatedAt")
+                VALUES (%s, %s, 'owners', 'pending', %s, NOW() - make_interval(secs => %s), NOW())
+            """, (f'bench-{i}', i, requester, (jobs_per_requester * 2 - i) / 1000))
+    conn.commit()
+
+    order = []
+    running = []
+    while True:
+        if len(running) >= slots:
+            with conn.cursor() as cur:
+                cur.execute('UPDATE "ScanJob" SET status = \'done\' WHERE id = %s', (running.pop(0),))
+            conn.commit()
+        job = claim_next_job(conn)
+        if not job:
+            break
+        running.append(job['id'])
+        order.append('A' if job['requestedBy'] == 1 else 'B')
+    print(f"fair share ({slots} slots): {''.join(order)}")
+
+    with conn.cursor() as cur:
+        cur.execute('DELETE FROM "ScanJob"')
+        for job_type, age in (('uaid_backfill', 7200), ('rescan', 7200), ('inventory', 0)):
+            cur.execute("""
+                INSERT INTO "ScanJob" (id, "userId", type, status, "startedAt", "updatedAt")
+                VALUES (%s, 1, %s, 'pending', NOW() - make_interval(secs => %s), NOW())
+            """, (f'bench-{job_type}', job_type, age))
+    conn.commit()
+    claimed = []
+    while (job := claim_next_job(conn)):
+        claimed.append(f"{job['type']} (waited {float(job['waitSeconds']):.0f}s)")
+    print(f"aging cap: {' > '.join(claimed)}")
+
+    with conn.cursor() as cur:
+        cur.execute('DROP TABLE pg_temp."ScanJob"')
+    conn.commit()
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='ScanJob claim order')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='claim order for a synthetic queue (temporary table)')
+    bench.add_argument('--jobs', type=int, default=8, help='owners scans per requester')
+    bench.add_argument('--slots', type=int, default=2, help='jobs running at once')
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(os.getenv('DATABASE_URL', ''))
+    try:
+        run_benchmark(conn, args.jobs, args.slots)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,722 @@
+# worker/snapshot_store.py
+"""
+──────────────────────
+Delta-encoded inventory snapshots.
+
+With SNAPSHOT_BASE_DAYS = 0 (the default) every new UTC day writes a full
+copy of the inventory to "InventoryItem", as before. With
+SNAPSHOT_BASE_DAYS = N, a full BASE snapshot is written every N days and
+the days in between only store what changed since the previous snapshot,
+in "InventoryItemDelta":
+    op = 'add'     UAID appeared (or its row changed, e.g. isOnHold)
+    op = 'remove'  UAID left the inventory
+A delta snapshot points at its base via "InventorySnapshot"."baseSnapshotId".
+
+Readers never see the encoding — the "InventorySnapshotItem" view
+materializes every snapshot's full item list (InventoryItem's columns,
+one row per snapshot × UAID), and is what the history / graph / trade
+queries read. Reconstruction API:
+    SELECT * FROM inventory_snapshot_items('<snapshotId>');
+    SELECT * FROM inventory_items_at(<userId>, '<timestamp>');  -- any day
+
+ensure_snapshot_views() installs the view and functions at worker
+startup; the tables themselves come from prisma/schema.prisma. For the web
+app alone, `npm run db:push` also applies prisma/sql/inventory_snapshot_views.sql
+(regenerate it with `python snapshot_store.py sql` after changing the view).
+While SNAPSHOT_BASE_DAYS = 0 and no delta snapshot exists, the worker
+installs the view as a plain projection of "InventoryItem" instead.
+
+Full-snapshot rows are written set-based: stage_items() COPYs the scanned
+inventory into a per-transaction temp table, then upsert_staged_items() and
+delete_unstaged_items() apply it with one statement each — the same handful
+of round-trips for 100 items or 50,000.
+
+Command line:
+    python snapshot_store.py bench --users 2000 --days 90
+    python snapshot_store.py bench-writes --sizes 100 5000 50000
+    python snapshot_store.py bench-reads --users 2000 --days 30
+    python snapshot_store.py sql > ../prisma/sql/inventory_snapshot_views.sql
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import textwrap
+import time
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+import psycopg2
+import psycopg2.extras
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+
+# 0 = full snapshot every day; N = full base every N days, deltas in between
+SNAPSHOT_BASE_DAYS = int(os.getenv('SNAPSHOT_BASE_DAYS', '0'))
+
+ITEM_COLUMNS = ('"assetId", "userAssetId", "scannedAt", "uaidCreatedAt", '
+                '"uaidUpdatedAt", "isOnHold", "serialNumber", "lastSeenAt"')
+
+
+def get_conn():
+    return psycopg2.connect(DATABASE_URL)
+
+
+# ─── View + reconstruction functions ───────────────────────────────────────
+
+def snapshot_views_sql(deltas=True):
+    """
+    Statements creating the "InventorySnapshotItem" view and reconstruction
+    functions. With deltas=False the view is a plain projection of
+    "InventoryItem" — only valid while no delta snapshot exists.
+    """
+    if deltas:
+        view = f'''
+            CREATE OR REPLACE VIEW "InventorySnapshotItem" AS
+            -- Full snapshots: their own rows
+            SELECT ii."snapshotId", {_prefixed('ii')}
+            FROM "InventoryItem" ii
+            UNION ALL
+            -- Delta snapshots: base rows no delta up to this snapshot has touched
+            SELECT s.id, {_prefixed('b')}
+            FROM "InventorySnapshot" s
+            JOIN "InventoryItem" b ON b."snapshotId" = s."baseSnapshotId"
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM "InventoryItemDelta" d
+                JOIN "InventorySnapshot" ds ON ds.id = d."snapshotId"
+                WHERE d."userAssetId" = b."userAssetId"
+                  AND ds."baseSnapshotId" = s."baseSnapshotId"
+                  AND ds."createdAt" <= s."createdAt"
+            )
+            UNION ALL
+            -- Delta snapshots: the latest change per UAID up to this snapshot, when it is an add
+            SELECT s.id, {_prefixed('d')}
+            FROM "InventorySnapshot" s
+            JOIN "InventorySnapshot" ds
+              ON ds."baseSnapshotId" = s."baseSnapshotId" AND ds."createdAt" <= s."createdAt"
+            JOIN "InventoryItemDelta" d ON d."snapshotId" = ds.id
+            WHERE d.op = 'add'
+              AND NOT EXISTS (
+                SELECT 1
+                FROM "InventoryItemDelta" d2
+                JOIN "InventorySnapshot" ds2 ON ds2.id = d2."snapshotId"
+                WHERE d2."userAssetId" = d."userAssetId"
+                  AND ds2."baseSnapshotId" = s."baseSnapshotId"
+                  AND ds2."createdAt" > ds."createdAt"
+                  AND ds2."createdAt" <= s."createdAt"
+              )
+        '''
+    else:
+        view = f'''
+            CREATE OR REPLACE VIEW "InventorySnapshotItem" AS
+            SELECT ii."snapshotId", {_prefixed('ii')}
+            FROM "InventoryItem" ii
+        '''
+    return [
+        view,
+        '''
+            CREATE OR REPLACE FUNCTION inventory_snapshot_items(snap_id text)
+            RETURNS SETOF "InventorySnapshotItem" AS $$
+                SELECT * FROM "InventorySnapshotItem" WHERE "snapshotId" = snap_id
+            $$ LANGUAGE sql STABLE
+        ''',
+        '''
+            CREATE OR REPLACE FUNCTION inventory_items_at(user_id bigint, at timestamp)
+            RETURNS SETOF "InventorySnapshotItem" AS $$
+                SELECT * FROM "InventorySnapshotItem"
+                WHERE "snapshotId" = (
+                    SELECT id FROM "InventorySnapshot"
+                    WHERE "userId" = user_id AND "createdAt" <= at
+                    ORDER BY "createdAt" DESC
+                    LIMIT 1
+                )
+            $$ LANGUAGE sql STABLE
+        ''',
+    ]
+
+
+def ensure_snapshot_views(conn):
+    """
+    Install the view and functions. While SNAPSHOT_BASE_DAYS = 0 and no
+    delta snapshot exists, the view is installed as a plain projection of
+    "InventoryItem", so readers pay nothing for the delta branches.
+    """
+    with conn.cursor() as cur:
+        cur.execute('SELECT EXISTS (SELECT 1 FROM "InventorySnapshot" WHERE "baseSnapshotId" IS NOT NULL)')
+        deltas = SNAPSHOT_BASE_DAYS > 0 or cur.fetchone()[0]
+        for statement in snapshot_views_sql(deltas):
+            cur.execute(statement)
+    conn.commit()
+    logger.info(f'[snapshot_store] ✅ "InventorySnapshotItem" view ({"delta-aware" if deltas else "full snapshots only"}) '
+                f'and reconstruction functions installed')
+
+
+def _prefixed(alias):
+    return ', '.join(f'{alias}.{col.strip()}' for col in ITEM_COLUMNS.split(','))
+
+
+def load_snapshot_items(conn, snapshot_id):
+    """Every item of a snapshot, full or delta, as RealDict rows."""
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(f"""
+            SELECT {ITEM_COLUMNS}
+            FROM "InventorySnapshotItem"
+            WHERE "snapshotId" = %s
+        """, (snapshot_id,))
+        return cur.fetchall()
+
+
+# ─── Writing ───────────────────────────────────────────────────────────────
+
+def choose_base(conn, latest_snapshot):
+    """
+    For a new day's snapshot: return the base snapshot id to write a delta
+    against, or None to write a full snapshot.
+    """
+    if SNAPSHOT_BASE_DAYS <= 0 or not latest_snapshot:
+        return None
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT b.id, b."createdAt"
+            FROM "InventorySnapshot" s
+            JOIN "InventorySnapshot" b ON b.id = COALESCE(s."baseSnapshotId", s.id)
+            WHERE s.id = %s
+        """, (latest_snapshot['id'],))
+        row = cur.fetchone()
+    if not row:
+        return None
+    base_id, base_created = row
+    if base_created.tzinfo is None:
+        base_created = base_created.replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc).date() - base_created.date() >= timedelta(days=SNAPSHOT_BASE_DAYS):
+        return None
+    return base_id
+
+
+STAGE_TABLE = 'snapshot_stage'
+STAGE_COLUMNS = ('assetId', 'userAssetId', 'serialNumber', 'isOnHold',
+                 'scannedAt', 'uaidCreatedAt', 'uaidUpdatedAt')
+
+
+def stage_items(cur, items, scanned_at):
+    """
+    COPY scanner item dicts into the session's temp stage table (emptied on
+    commit). Items without a 'scanned_at' get `scanned_at`.
+    """
+    cur.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} (
+            "assetId" bigint NOT NULL, "userAssetId" bigint NOT NULL, "serialNumber" int,
+            "isOnHold" boolean, "scannedAt" timestamp(3), "uaidCreatedAt" timestamp(3),
+            "uaidUpdatedAt" timestamp(3)
+        ) ON COMMIT DELETE ROWS
+    """)
+
+    buffer = StringIO()
+    for item in items:
+        row = (
+            item['asset_id'],
+            item['user_asset_id'],
+            item.get('serial_number'),
+            item.get('is_on_hold', False),
+            item.get('scanned_at') or scanned_at,
+            item.get('uaid_created_at'),
+            item.get('uaid_updated_at'),
+        )
+        buffer.write('\t'.join(_copy_value(v) for v in row) + '\n')
+    buffer.seek(0)
+    cur.copy_from(buffer, STAGE_TABLE, columns=STAGE_COLUMNS, null='\\N')
+
+
+def _copy_value(val):
+    if val is None:
+        return '\\N'
+    if isinstance(val, bool):
+        return 'true' if val else 'false'
+    if isinstance(val, datetime):
+        # Columns hold UTC wall-clock time without a zone
+        if val.tzinfo is not None:
+            val = val.astimezone(timezone.utc).replace(tzinfo=None)
+        return val.isoformat(sep=' ')
+    return str(val)
+
+
+def upsert_staged_items(cur, snapshot_id, last_seen_at=None):
+    """
+    Write the staged rows into a full snapshot in one statement. UAIDs not
+    yet in it are inserted; with `last_seen_at`, existing rows also get
+    isOnHold refreshed and lastSeenAt set, otherwise they are left alone.
+    """
+    if last_seen_at is None:
+        conflict, params = 'DO NOTHING', (snapshot_id,)
+    else:
+        conflict = 'DO UPDATE SET "isOnHold" = EXCLUDED."isOnHold", "lastSeenAt" = %s'
+        params = (snapshot_id, last_seen_at)
+    cur.execute(f"""
+        INSERT INTO "InventoryItem"
+            ("snapshotId", "assetId", "userAssetId", "serialNumber", "isOnHold",
+             "scannedAt", "uaidCreatedAt", "uaidUpdatedAt")
+        SELECT %s, "assetId", "userAssetId", "serialNumber", "isOnHold",
+               "scannedAt", "uaidCreatedAt", "uaidUpdatedAt"
+        FROM {STAGE_TABLE}
+        ON CONFLICT ("snapshotId", "userAssetId") {conflict}
+    """, params)
+
+
+def delete_unstaged_items(cur, snapshot_id):
+    """Remove a full snapshot's rows whose UAID is not in the stage table."""
+    cur.execute(f"""
+        DELETE FROM "InventoryItem" ii
+        WHERE ii."snapshotId" = %s
+          AND NOT EXISTS (SELECT 1 FROM {STAGE_TABLE} st WHERE st."userAssetId" = ii."userAssetId")
+    """, (snapshot_id,))
+    return cur.rowcount
+
+
+def write_delta_rows(cur, snapshot_id, adds, removes):
+    """
+    Upsert delta rows. `adds` are scanner item dicts (asset_id, user_asset_id,
+    serial_number, is_on_hold, scanned_at, uaid_created_at, uaid_updated_at);
+    `removes` are (user_asset_id, asset_id). A later write for the same UAID
+    on the same day replaces the earlier one.
+    """
+    rows = [(
+        snapshot_id, 'add',
+        item['asset_id'],
+        item['user_asset_id'],
+        item.get('serial_number'),
+        item.get('is_on_hold', False),
+        item['scanned_at'],
+        item.get('uaid_created_at'),
+        item.get('uaid_updated_at'),
+    ) for item in adds]
+    rows += [
+        (snapshot_id, 'remove', asset_id, user_asset_id, None, None, None, None, None)
+        for user_asset_id, asset_id in removes
+    ]
+    if not rows:
+        return
+    psycopg2.extras.execute_values(cur, """
+        INSERT INTO "InventoryItemDelta"
+            ("snapshotId", op, "assetId", "userAssetId", "serialNumber", "isOnHold",
+             "scannedAt", "uaidCreatedAt", "uaidUpdatedAt")
+        VALUES %s
+        ON CONFLICT ("snapshotId", "userAssetId") DO UPDATE SET
+            op = EXCLUDED.op,
+            "assetId" = EXCLUDED."assetId",
+            "serialNumber" = EXCLUDED."serialNumber",
+            "isOnHold" = EXCLUDED."isOnHold",
+            "scannedAt" = EXCLUDED."scannedAt",
+            "uaidCreatedAt" = EXCLUDED."uaidCreatedAt",
+            "uaidUpdatedAt" = EXCLUDED."uaidUpdatedAt"
+    """, rows, page_size=len(rows))
+
+
+def set_uaid_timestamps(cur, user_asset_id, created_at, updated_at, snapshot_id=None, user_id=None):
+    """
+    Write a UAID's created/updated timestamps wherever its rows are stored.
+      snapshot_id — rows of that snapshot's base chain (the snapshot itself
+                    when it is a full one)
+      user_id     — rows in any of that user's snapshots
+      neither     — every row of the UAID
+    Returns the number of rows updated.
+    """
+    if snapshot_id is not None:
+        item_scope = """AND "snapshotId" = (
+            SELECT COALESCE("baseSnapshotId", id) FROM "InventorySnapshot" WHERE id = %s)"""
+        delta_scope = """AND "snapshotId" IN (
+            SELECT id FROM "InventorySnapshot" WHERE "baseSnapshotId" = (
+                SELECT COALESCE("baseSnapshotId", id) FROM "InventorySnapshot" WHERE id = %s))"""
+        scope_args = (snapshot_id,)
+    elif user_id is not None:
+        item_scope = delta_scope = """AND "snapshotId" IN (
+            SELECT id FROM "InventorySnapshot" WHERE "userId" = %s)"""
+        scope_args = (user_id,)
+    else:
+        item_scope = delta_scope = ''
+        scope_args = ()
+
+    updated = 0
+    for table, scope in (('InventoryItem', item_scope), ('InventoryItemDelta', delta_scope)):
+        cur.execute(f"""
+            UPDATE "{table}"
+            SET
+                "uaidCreatedAt" = COALESCE("uaidCreatedAt", %s),
+                "uaidUpdatedAt" = %s
+            WHERE "userAssetId" = %s {scope}
+        """, (created_at, updated_at, user_asset_id) + scope_args)
+        updated += cur.rowcount
+    return updated
+
+
+def set_uaid_timestamps_bulk(cur, rows):
+    """
+    set_uaid_timestamps() for a whole owners page: `rows` are
+    (user_asset_id, created_at, updated_at, user_id), where user_id scopes
+    the write to that user's snapshots and None means every row of the UAID.
+    One UPDATE ... FROM (VALUES ...) per table. Returns rows updated.
+    """
+    if not rows:
+        return 0
+    updated = 0
+    for table in ('InventoryItem', 'InventoryItemDelta'):
+        psycopg2.extras.execute_values(cur, f"""
+            UPDATE "{table}" t
+            SET
+                "uaidCreatedAt" = COALESCE(t."uaidCreatedAt", v.created_at),
+                "uaidUpdatedAt" = v.updated_at
+            FROM (VALUES %s) AS v (user_asset_id, created_at, updated_at, user_id)
+            WHERE t."userAssetId" = v.user_asset_id
+              AND (v.user_id IS NULL OR EXISTS (
+                  SELECT 1 FROM "InventorySnapshot" s
+                  WHERE s.id = t."snapshotId" AND s."userId" = v.user_id
+              ))
+        """, rows, template='(%s::bigint, %s::timestamp, %s::timestamp, %s::bigint)', page_size=len(rows))
+        updated += cur.rowcount
+    return updated
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+BENCH_SCHEMA = 'bench_snapshots'
+
+
+def _create_bench_schema(conn):
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+        cur.execute(f'CREATE SCHEMA {BENCH_SCHEMA}')
+        cur.execute(f'SET search_path TO {BENCH_SCHEMA}')
+        cur.execute("""
+            CREATE TABLE "InventorySnapshot" (
+                id text PRIMARY KEY, "userId" bigint NOT NULL, "createdAt" timestamp(3) NOT NULL,
+                "baseSnapshotId" text
+            )
+        """)
+        cur.execute('CREATE INDEX ON "InventorySnapshot" ("userId", "createdAt")')
+        cur.execute('CREATE INDEX ON "InventorySnapshot" ("baseSnapshotId", "createdAt")')
+        cur.execute("""
+            CREATE TABLE "InventoryItem" (
+                "snapshotId" text NOT NULL, "assetId" bigint NOT NULL, "userAssetId" bigint NOT NULL,
+                "scannedAt" timestamp(3) NOT NULL, "uaidCreatedAt" timestamp(3), "uaidUpdatedAt" timestamp(3),
+                "isOnHold" boolean, "serialNumber" int, "lastSeenAt" timestamp(3),
+                PRIMARY KEY ("snapshotId", "userAssetId")
+            )
+        """)
+        for cols in ('"snapshotId"', '"assetId"', '"assetId", "snapshotId"', '"userAssetId"',
+                     '"serialNumber"', '"uaidCreatedAt"', '"uaidUpdatedAt"'):
+            cur.execute(f'CREATE INDEX ON "InventoryItem" ({cols})')
+        cur.execute("""
+            CREATE TABLE "InventoryItemDelta" (
+                "snapshotId" text NOT NULL, op text NOT NULL, "assetId" bigint NOT NULL,
+                "userAssetId" bigint NOT NULL, "scannedAt" timestamp(3), "uaidCreatedAt" timestamp(3),
+                "uaidUpdatedAt" timestamp(3), "isOnHold" boolean, "serialNumber" int, "lastSeenAt" timestamp(3),
+                PRIMARY KEY ("snapshotId", "userAssetId")
+            )
+        """)
+        cur.execute('CREATE INDEX ON "InventoryItemDelta" ("userAssetId")')
+    conn.commit()
+    ensure_snapshot_views(conn)
+
+
+def _bench_mode(conn, base_days, users, days, items, churn, seed):
+    """Write `days` daily snapshots for `users` users; return (seconds, bytes, item rows)."""
+    global SNAPSHOT_BASE_DAYS
+    SNAPSHOT_BASE_DAYS = base_days
+    _create_bench_schema(conn)
+
+    rng = random.Random(seed)
+    next_uaid = 1
+    inventories = []
+    for _ in range(users):
+        inv = {}
+        for _ in range(rng.randint(items // 4, items * 2)):
+            inv[next_uaid] = rng.randint(1, 3000)
+            next_uaid += 1
+        inventories.append(inv)
+
+    start_day = datetime(2026, 1, 1)
+    bases: dict[int, tuple] = {}
+    elapsed = 0.0
+
+    for day in range(days):
+        now = start_day + timedelta(days=day)
+        for user_id, inv in enumerate(inventories):
+            # Churn: trade away some UAIDs, receive new ones
+            removed = [u for u in inv if rng.random() < churn]
+            for u in removed:
+                del inv[u]
+            added = {}
+            for _ in range(len(removed)):
+                added[next_uaid] = rng.randint(1, 3000)
+                next_uaid += 1
+            inv.update(added)
+
+            snapshot_id = f'{user_id}_{day}'
+            base = bases.get(user_id)
+            use_delta = base_days > 0 and base is not None and day - base[1] < base_days
+
+            started = time.perf_counter()
+            with conn.cursor() as cur:
+                cur.execute(
+                    'INSERT INTO "InventorySnapshot" (id, "userId", "createdAt", "baseSnapshotId") VALUES (%s, %s, %s, %s)',
+                    (snapshot_id, user_id, now, base[0] if use_delta else None)
+                )
+                if use_delta:
+                    write_delta_rows(
+                        cur, snapshot_id,
+                        [{'asset_id': a, 'user_asset_id': u, 'scanned_at': now} for u, a in added.items()],
+                        [(u, 0) for u in removed],
+                    )
+                else:
+                    psycopg2.extras.execute_values(cur, """
+                        INSERT INTO "InventoryItem" ("snapshotId", "assetId", "userAssetId", "scannedAt", "isOnHold")
+                        VALUES %s
+                    """, [(snapshot_id, a, u, now, False) for u, a in inv.items()])
+                    bases[user_id] = (snapshot_id, day)
+            conn.commit()
+            elapsed += time.perf_counter() - started
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT pg_total_relation_size('"InventoryItem"') + pg_total_relation_size('"InventoryItemDelta"'),
+                   (SELECT COUNT(*) FROM "InventoryItem") + (SELECT COUNT(*) FROM "InventoryItemDelta")
+        """)
+        size, rows = cur.fetchone()
+        # Sanity check: the view reproduces the last day's inventory exactly
+        cur.execute('SELECT COUNT(*) FROM inventory_snapshot_items(%s)', (f'0_{days - 1}',))
+        assert cur.fetchone()[0] == len(inventories[0]), 'reconstruction mismatch'
+    return elapsed, size, rows
+
+
+def run_benchmark(conn, users, days, items, churn, base_days, keep=False):
+    print(f"{users} users × {days} days, ~{items} items each, {churn:.1%} daily churn")
+    print(f"{'mode':<16} {'item rows':>12} {'table+index':>12} {'write time':>11}")
+    results = {}
+    for label, mode in (('full daily', 0), (f'delta / {base_days}d base', base_days)):
+        elapsed, size, rows = _bench_mode(conn, mode, users, days, items, churn, seed=1)
+        results[mode] = (elapsed, size, rows)
+        print(f"{label:<16} {rows:>12,} {size / 2**20:>10.1f}MB {elapsed:>10.1f}s")
+
+    full, delta = results[0], results[base_days]
+    print(f"savings: {1 - delta[2] / full[2]:.1%} rows, {1 - delta[1] / full[1]:.1%} storage, "
+          f"{1 - delta[0] / full[0]:.1%} write time")
+
+    if not keep:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA {BENCH_SCHEMA} CASCADE')
+        conn.commit()
+
+
+class _CountingCursor(psycopg2.extensions.cursor):
+    """Counts statements sent to the server (execute_values pages included)."""
+    round_trips = 0
+
+    def execute(self, query, vars=None):
+        _CountingCursor.round_trips += 1
+        return super().execute(query, vars)
+
+    def copy_from(self, *args, **kwargs):
+        _CountingCursor.round_trips += 1
+        return super().copy_from(*args, **kwargs)
+
+
+def _legacy_update(cur, snapshot_id, items, removed, new_uaids, now):
+    """The per-row path save_inventory_snapshot used before staging."""
+    if removed:
+        cur.execute("""
+            DELETE FROM "InventoryItem"
+            WHERE "snapshotId" = %s AND "userAssetId" = ANY(%s)
+        """, (snapshot_id, removed))
+    psycopg2.extras.execute_values(cur, """
+        INSERT INTO "InventoryItem"
+            ("snapshotId", "assetId", "userAssetId", "serialNumber", "isOnHold", "scannedAt")
+        VALUES %s
+        ON CONFLICT DO NOTHING
+    """, [(snapshot_id, i['asset_id'], i['user_asset_id'], None, i['is_on_hold'], now)
+          for i in items if i['user_asset_id'] in new_uaids])
+    for item in items:
+        if item['user_asset_id'] not in new_uaids:
+            cur.execute("""
+                UPDATE "InventoryItem"
+                SET "isOnHold" = %s, "lastSeenAt" = %s
+                WHERE "snapshotId" = %s AND "userAssetId" = %s
+            """, (item['is_on_hold'], now, snapshot_id, item['user_asset_id']))
+
+
+def _staged_update(cur, snapshot_id, items, removed, new_uaids, now):
+    stage_items(cur, items, now)
+    delete_unstaged_items(cur, snapshot_id)
+    upsert_staged_items(cur, snapshot_id, last_seen_at=now)
+
+
+def run_write_benchmark(conn, sizes, churn=0.01, repeats=3):
+    """
+    Same-day snapshot refresh (1% churn, isOnHold flips) at each inventory
+    size: legacy per-row statements vs COPY stage + set-based apply.
+    """
+    _create_bench_schema(conn)
+    rng = random.Random(1)
+    now = datetime(2026, 1, 1)
+
+    print(f"{'items':>7} {'path':<8} {'round-trips':>12} {'best ms':>9}")
+    for size in sizes:
+        for label, apply in (('legacy', _legacy_update), ('staged', _staged_update)):
+            best = None
+            for attempt in range(repeats):
+                snapshot_id = f'w{size}_{label}_{attempt}'
+                items = [{'asset_id': rng.randint(1, 3000), 'user_asset_id': size * 10 + k, 'is_on_hold': False}
+                         for k in range(size)]
+                with conn.cursor() as cur:
+                    cur.execute('INSERT INTO "InventorySnapshot" (id, "userId", "createdAt") VALUES (%s, 0, %s)',
+                                (snapshot_id, now))
+                    stage_items(cur, items, now)
+                    upsert_staged_items(cur, snapshot_id)
+                conn.commit()
+
+                # Next scan: trade a few UAIDs away, receive new ones, flip some holds
+                removed = [i['user_asset_id'] for i in items if rng.random() < churn]
+                removed_set = set(removed)
+                kept = [dict(i, is_on_hold=rng.random() < 0.05) for i in items if i['user_asset_id'] not in removed_set]
+                added = [{'asset_id': rng.randint(1, 3000), 'user_asset_id': -(size * 10 + k), 'is_on_hold': False}
+                         for k in range(1, len(removed) + 1)]
+                scanned = kept + added
+                new_uaids = {i['user_asset_id'] for i in added}
+
+                _CountingCursor.round_trips = 0
+                started = time.perf_counter()
+                with conn.cursor(cursor_factory=_CountingCursor) as cur:
+                    apply(cur, snapshot_id, scanned, removed, new_uaids, now)
+                conn.commit()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+                with conn.cursor() as cur:
+                    cur.execute('SELECT COUNT(*) FROM "InventoryItem" WHERE "snapshotId" = %s', (snapshot_id,))
+                    assert cur.fetchone()[0] == len(scanned), f'{label} wrote the wrong rows'
+            print(f"{size:>7} {label:<8} {_CountingCursor.round_trips + 1:>12,} {best * 1000:>9.1f}")
+
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA {BENCH_SCHEMA} CASCADE')
+    conn.commit()
+
+
+def _time_reads(conn, label, snapshot_ids, asset_ids, repeats):
+    """Best-of-`repeats` ms for the two read shapes the web app uses."""
+    timings = []
+    with conn.cursor() as cur:
+        for query, params in (
+            # One snapshot's items (snapshot / history pages)
+            ('SELECT COUNT(*) FROM "InventorySnapshotItem" WHERE "snapshotId" = %s', [(i,) for i in snapshot_ids]),
+            # Owners of an asset across every user's latest snapshot (item / trade pages)
+            ("""
+                SELECT COUNT(*)
+                FROM (
+                    SELECT DISTINCT ON ("userId") id FROM "InventorySnapshot"
+                    ORDER BY "userId", "createdAt" DESC
+                ) s
+                JOIN "InventorySnapshotItem" ii ON ii."snapshotId" = s.id
+                WHERE ii."assetId" = %s
+            """, [(a,) for a in asset_ids]),
+        ):
+            best = None
+            for _ in range(repeats):
+                started = time.perf_counter()
+                for args in params:
+                    cur.execute(query, args)
+                    cur.fetchone()
+                elapsed = (time.perf_counter() - started) / len(params)
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best * 1000)
+    conn.commit()
+    print(f"{label:<28} {timings[0]:>13.2f} {timings[1]:>15.2f}")
+
+
+def run_read_benchmark(conn, users, days, items, churn, base_days, samples=50, repeats=3):
+    """
+    Read-path cost of the view: full-daily data through the plain view and
+    through the delta-aware view, then delta data through the delta-aware view.
+    """
+    rng = random.Random(2)
+    asset_ids = [rng.randint(1, 3000) for _ in range(max(samples // 5, 1))]
+
+    def sample_snapshots():
+        return [f'{rng.randrange(users)}_{rng.randrange(days)}' for _ in range(samples)]
+
+    print(f"{users} users × {days} days, ~{items} items each; ms per query")
+    print(f"{'data / view':<28} {'one snapshot':>13} {'asset owners':>15}")
+
+    _bench_mode(conn, 0, users, days, items, churn, seed=1)
+    snapshot_ids = sample_snapshots()
+    with conn.cursor() as cur:
+        cur.execute('ANALYZE')
+        for statement in snapshot_views_sql(deltas=False):
+            cur.execute(statement)
+    conn.commit()
+    _time_reads(conn, 'full daily / plain view', snapshot_ids, asset_ids, repeats)
+    with conn.cursor() as cur:
+        for statement in snapshot_views_sql(deltas=True):
+            cur.execute(statement)
+    conn.commit()
+    _time_reads(conn, 'full daily / delta view', snapshot_ids, asset_ids, repeats)
+
+    _bench_mode(conn, base_days, users, days, items, churn, seed=1)
+    with conn.cursor() as cur:
+        cur.execute('ANALYZE')
+    conn.commit()
+    _time_reads(conn, f'delta {base_days}d / delta view', snapshot_ids, asset_ids, repeats)
+
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA {BENCH_SCHEMA} CASCADE')
+    conn.commit()
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Delta-encoded inventory snapshots')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('install', help='create/replace the view and reconstruction functions')
+    bench = sub.add_parser('bench', help=f'full vs delta storage and write time (schema {BENCH_SCHEMA})')
+    bench.add_argument('--users', type=int, default=2000)
+    bench.add_argument('--days', type=int, default=90)
+    bench.add_argument('--items', type=int, default=300, help='typical inventory size')
+    bench.add_argument('--churn', type=float, default=0.01, help='fraction of UAIDs traded per day')
+    bench.add_argument('--base-days', type=int, default=30)
+    bench.add_argument('--keep', action='store_true', help='leave the bench schema in place')
+    writes = sub.add_parser('bench-writes', help=f'per-row vs staged snapshot refresh (schema {BENCH_SCHEMA})')
+    writes.add_argument('--sizes', type=int, nargs='+', default=[100, 5000, 50000])
+    reads = sub.add_parser('bench-reads', help=f'view read cost, full vs delta data (schema {BENCH_SCHEMA})')
+    reads.add_argument('--users', type=int, default=2000)
+    reads.add_argument('--days', type=int, default=30)
+    reads.add_argument('--items', type=int, default=300, help='typical inventory size')
+    reads.add_argument('--churn', type=float, default=0.01, help='fraction of UAIDs traded per day')
+    reads.add_argument('--base-days', type=int, default=30)
+    sub.add_parser('sql', help='print the delta-aware view and functions as a SQL script')
+    args = parser.parse_args(argv)
+
+    if args.command == 'sql':
+        print('-- Generated by `python worker/snapshot_store.py sql` — edit snapshot_store.py, not this file.')
+        for statement in snapshot_views_sql():
+            print(textwrap.dedent(statement).strip() + ';\n')
+        return 0
+
+    conn = get_conn()
+    try:
+        if args.command == 'install':
+            ensure_snapshot_views(conn)
+        elif args.command == 'bench-writes':
+            run_write_benchmark(conn, args.sizes)
+        elif args.command == 'bench-reads':
+            run_read_benchmark(conn, args.users, args.days, args.items, args.churn, args.base_days)
+        else:
+            run_benchmark(conn, args.users, args.days, args.items, args.churn, args.base_days, args.keep)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,14 +5,21 @@
 Call  fire_snipe_events(cursor, results)  inside save_results_to_db(),
 right after the existing notifications block.
 
-It writes qualifying deals to the "SnipeDeal" table so the SSE stream
+It writes deal CHANGES to the "SnipeDeal" table so the SSE stream
 endpoint can pick them up and push them to browsers in real-time.
+A standing deal is only written again when its price drops or its deal %
+crosses a DEAL_STEP_PCT boundary; a "gone" row is written when its item
+comes back no longer qualifying, or has been missing from GONE_AFTER_MISSES
+batches in a row (a failed fetch alone doesn't end a deal).
 
 Add to your imports at the top of main.py:
     from snipe_events import fire_snipe_events
 
 Then inside save_results_to_db(), after the notification block, add:
     fire_snipe_events(cursor, results)
+
+and once the transaction has committed:
+    commit_snipe_state()
 """
 
 import uuid
@@ -28,12 +35,38 @@ GLOBAL_MIN_DEAL = 5.0
 # Purge SnipeDeal rows older than this many minutes to keep the table tiny.
 SNIPE_DEAL_TTL_MINUTES = 5
 
+# A standing deal is re-emitted when its deal % moves into a different
+# DEAL_STEP_PCT-wide band (e.g. 5 → 12% → 17% with a step of 5).
+DEAL_STEP_PCT = 5.0
+
+# A live deal whose item is absent from this many consecutive batches is
+# treated as gone.
+GONE_AFTER_MISSES = 3
+
+# assetId -> {'price', 'rap', 'deal', 'step', 'misses'} for every deal
+# currently live on the stream. 'step' is the band of the last EMITTED
+# deal %, 'misses' the batches in a row its item was missing from.
+_deal_state: dict[int, dict] = {}
+
+# State computed by the last fire_snipe_events() call, applied only once
+# the surrounding transaction commits (see commit_snipe_state()).
+_pending_state: dict[int, dict] | None = None
+
+
+def _deal_step(deal_pct: float) -> int:
+    return int(deal_pct // DEAL_STEP_PCT)
+
 
 def fire_snipe_events(cursor, results: list[dict]):
     """
-    For every item in `results` that is currently a good deal,
-    insert a row into "SnipeDeal".  The SSE endpoint reads this table
-    and pushes matching rows to connected browsers.
+    Compare every item in `results` against the live deal state and
+    insert a row into "SnipeDeal" only when something changed:
+      - event 'deal': a deal appeared, its price dropped, or its deal %
+                      crossed a DEAL_STEP_PCT boundary
+      - event 'gone': a live deal's item no longer qualifies, or has been
+                      missing from `results` GONE_AFTER_MISSES times running
+    The SSE endpoint reads this table and pushes matching rows to
+    connected browsers.
 
     `results` is the list produced by process_items_data():
       {
@@ -43,6 +76,9 @@ def fire_snipe_events(cursor, results: list[dict]):
         'rap': float | None,
       }
     """
+    global _pending_state
+    _pending_state = None
+
     try:
         # 1. Purge stale rows first so the table stays tiny
         cursor.execute(
@@ -53,9 +89,16 @@ def fire_snipe_events(cursor, results: list[dict]):
             (SNIPE_DEAL_TTL_MINUTES,)
         )
 
-        # 2. Build rows for qualifying deals
+        # 2. Diff qualifying deals against the live state
         rows = []
+        new_state = {}
+        names = {}
+        appeared = changed = 0
+
         for r in results:
+            asset_id = int(r['asset_id'])
+            names[asset_id] = (r['name'], r.get('image_url'))
+
             price = r.get('price')
             rap = r.get('rap')
 
@@ -65,21 +108,62 @@ def fire_snipe_events(cursor, results: list[dict]):
             if price >= rap:
                 continue
 
-            deal_pct = ((rap - price) / rap) * 100
+            deal_pct = round(((rap - price) / rap) * 100, 2)
 
             if deal_pct < GLOBAL_MIN_DEAL:
                 continue
 
+            step = _deal_step(deal_pct)
+            prev = _deal_state.get(asset_id)
+
+            if prev is None:
+                appeared += 1
+            elif price < prev['price'] or step != prev['step']:
+                changed += 1
+            else:
+                # Standing deal, nothing worth telling clients about
+                new_state[asset_id] = {'price': float(price), 'rap': float(rap), 'deal': deal_pct,
+                                       'step': prev['step'], 'misses': 0}
+                continue
+
+            new_state[asset_id] = {'price': float(price), 'rap': float(rap), 'deal': deal_pct, 'step': step, 'misses': 0}
             rows.append((
                 str(uuid.uuid4()),   # id
-                int(r['asset_id']),  # assetId
+                asset_id,            # assetId
                 r['name'],           # name
                 r.get('image_url'),  # imageUrl (may be None)
                 float(price),        # price
                 float(rap),          # rap
-                round(deal_pct, 2),  # deal %
+                deal_pct,            # deal %
+                'deal',              # event
             ))
 
+        gone = 0
+        for asset_id, prev in _deal_state.items():
+            if asset_id in new_state:
+                continue
+            if asset_id not in names:
+                # No data for the item this batch — keep the deal live
+                # unless it has been missing for a while
+                misses = prev.get('misses', 0) + 1
+                if misses < GONE_AFTER_MISSES:
+                    new_state[asset_id] = {**prev, 'misses': misses}
+                    continue
+            gone += 1
+            name, image_url = names.get(asset_id, (f'Unknown Item {asset_id}', None))
+            rows.append((
+                str(uuid.uuid4()),
+                asset_id,
+                name,
+                image_url,
+                prev['price'],       # last live values, so the same configs match
+                prev['rap'],
+                prev['deal'],
+                'gone',
+            ))
+
+        _pending_state = new_state
+
         if not rows:
             return
 
@@ -98,12 +182,21 @@ def fire_snipe_events(cursor, results: list[dict]):
         cursor.copy_from(
             buffer,
             'SnipeDeal',
-            columns=('id', 'assetId', 'name', 'imageUrl', 'price', 'rap', 'deal'),
+            columns=('id', 'assetId', 'name', 'imageUrl', 'price', 'rap', 'deal', 'event'),
             null='\\N',
         )
 
-        logger.info(f"🎯 SnipeDeal: inserted {len(rows)} deal(s)")
+        logger.info(f"🎯 SnipeDeal: {appeared} new, {changed} changed, {gone} gone ({len(new_state)} live)")
 
     except Exception as e:
+        _pending_state = None
         logger.error(f"❌ fire_snipe_events error: {e}")
-        # Don't re-raise — snipe events are non-critical
\ No newline at end of file
+        # Don't re-raise — snipe events are non-critical
+
+
+def commit_snipe_state():
+    """Adopt the deal state from the last fire_snipe_events() call. Call after commit."""
+    global _deal_state, _pending_state
+    if _pending_state is not None:
+        _deal_state = _pending_state
+        _pending_state = None
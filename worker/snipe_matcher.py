@@ -0,0 +1,398 @@
+# worker/snipe_matcher.py
+"""
+──────────────────────
+Shared in-memory index of every enabled "SnipeConfig" row.
+
+Instead of each SSE connection reloading its user's configs and looping
+over them for every deal, the snipe server keeps ONE matcher for the whole
+process. A deal is evaluated once and returns the set of userIds whose
+configs it satisfies.
+
+Index layout (one bucket per assetId, plus a wildcard bucket for
+configs with assetId = NULL):
+  - open configs    (no minPrice/maxPrice) sorted by minDeal, so a single
+                    bisect gives every matching user as a list slice
+  - bounded configs (minPrice and/or maxPrice set) sorted by minDeal,
+                    only the minDeal-qualified prefix is price-checked
+
+Config changes arrive via LISTEN/NOTIFY on the "snipe_config" channel —
+a trigger on "SnipeConfig" sends the row id on every insert/update/delete,
+and only the bucket(s) that row lives in are rebuilt.
+
+Usage:
+    from snipe_matcher import matcher, start_snipe_matcher
+    start_snipe_matcher()
+    user_ids = matcher.match(asset_id, price, deal_pct)
+
+Benchmark (synthetic configs, no DB needed; compares against the old
+per-config loop):
+
+    python snipe_matcher.py bench --configs 100000 --deals 1000
+"""
+
+import argparse
+import bisect
+import logging
+import os
+import random
+import select
+import sys
+import threading
+import time
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+
+NOTIFY_CHANNEL = 'snipe_config'
+
+# How long the listener waits on the socket before checking it's still alive
+LISTEN_TIMEOUT = 30
+
+INF = float('inf')
+
+
+def get_db_conn():
+    return psycopg2.connect(DATABASE_URL)
+
+
+# ─── Bucket ────────────────────────────────────────────────────────────────
+
+class _Bucket:
+    """
+    Immutable, pre-sorted view of the configs for one assetId (or the
+    wildcard bucket). Rebuilt wholesale on change and swapped in
+    atomically, so readers never need the lock.
+    """
+    __slots__ = ('open_deals', 'open_users', 'bounded_deals', 'bounded')
+
+    def __init__(self, configs):
+        open_rows = sorted(
+            (c for c in configs if c[3] is None and c[4] is None),
+            key=lambda c: c[2],
+        )
+        bounded_rows = sorted(
+            (c for c in configs if c[3] is not None or c[4] is not None),
+            key=lambda c: c[2],
+        )
+
+        self.open_deals = [c[2] for c in open_rows]
+        self.open_users = [c[0] for c in open_rows]
+        self.bounded_deals = [c[2] for c in bounded_rows]
+        self.bounded = [
+            (
+                c[3] if c[3] is not None else -INF,
+                c[4] if c[4] is not None else INF,
+                c[0],
+            )
+            for c in bounded_rows
+        ]
+
+    def collect(self, price, deal_pct, out: set):
+        idx = bisect.bisect_right(self.open_deals, deal_pct)
+        if idx:
+            out.update(self.open_users[:idx])
+
+        idx = bisect.bisect_right(self.bounded_deals, deal_pct)
+        bounded = self.bounded
+        for i in range(idx):
+            min_price, max_price, user_id = bounded[i]
+            if min_price <= price <= max_price:
+                out.add(user_id)
+
+
+_EMPTY_BUCKET = _Bucket(())
+
+
+# ─── Matcher ───────────────────────────────────────────────────────────────
+
+class SnipeMatcher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # config id -> (userId, assetId, minDeal, minPrice, maxPrice)
+        self._configs: dict[str, tuple] = {}
+        # assetId (None = wildcard) -> {config id, ...}
+        self._ids_by_asset: dict[int | None, set[str]] = {}
+        self._buckets: dict[int | None, _Bucket] = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._configs)
+
+    # ── Loading ────────────────────────────────────────────────────────────
+
+    def load_rows(self, rows):
+        """
+        Replace the whole index. `rows` are
+        (id, userId, assetId, minDeal, minPrice, maxPrice) tuples of
+        ENABLED configs.
+        """
+        configs = {}
+        ids_by_asset = {}
+        for row in rows:
+            config_id, cfg = row[0], _normalise(row[1:])
+            configs[config_id] = cfg
+            ids_by_asset.setdefault(cfg[1], set()).add(config_id)
+
+        buckets = {
+            asset_id: _Bucket([configs[i] for i in ids])
+            for asset_id, ids in ids_by_asset.items()
+        }
+
+        with self._lock:
+            self._configs = configs
+            self._ids_by_asset = ids_by_asset
+            self._buckets = buckets
+            self.loaded = True
+
+    def load_all(self, conn):
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT id, "userId", "assetId", "minDeal", "minPrice", "maxPrice"
+                FROM "SnipeConfig"
+                WHERE enabled = true
+            ''')
+            rows = cur.fetchall()
+        self.load_rows(rows)
+        logger.info(f"[snipe_matcher] Loaded {len(rows)} enabled snipe config(s)")
+
+    def refresh_configs(self, conn, config_ids):
+        """Re-read the configs named in a batch of NOTIFYs and patch the index."""
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT id, "userId", "assetId", "minDeal", "minPrice", "maxPrice"
+                FROM "SnipeConfig"
+                WHERE id = ANY(%s) AND enabled = true
+            ''', (list(config_ids),))
+            rows = {row[0]: row[1:] for row in cur.fetchall()}
+
+        # Missing or disabled rows are removals
+        self.apply({config_id: rows.get(config_id) for config_id in config_ids})
+
+    # ── Incremental updates ────────────────────────────────────────────────
+
+    def apply(self, changes: dict):
+        """
+        `changes` maps config id -> (userId, assetId, minDeal, minPrice, maxPrice),
+        or None to remove it. Each touched bucket is rebuilt once per batch.
+        """
+        with self._lock:
+            touched = set()
+            for config_id, row in changes.items():
+                old = self._configs.pop(config_id, None)
+                if old is not None:
+                    self._ids_by_asset.get(old[1], set()).discard(config_id)
+                    touched.add(old[1])
+                if row is not None:
+                    cfg = _normalise(row)
+                    self._configs[config_id] = cfg
+                    self._ids_by_asset.setdefault(cfg[1], set()).add(config_id)
+                    touched.add(cfg[1])
+            self._rebuild_locked(touched)
+
+    def upsert(self, config_id, row):
+        """`row` is (userId, assetId, minDeal, minPrice, maxPrice)."""
+        self.apply({config_id: row})
+
+    def remove(self, config_id):
+        self.apply({config_id: None})
+
+    def _rebuild_locked(self, asset_ids):
+        buckets = dict(self._buckets)
+        for asset_id in asset_ids:
+            ids = self._ids_by_asset.get(asset_id)
+            if ids:
+                buckets[asset_id] = _Bucket([self._configs[i] for i in ids])
+            else:
+                self._ids_by_asset.pop(asset_id, None)
+                buckets.pop(asset_id, None)
+        self._buckets = buckets
+
+    # ── Matching ───────────────────────────────────────────────────────────
+
+    def match(self, asset_id, price, deal_pct) -> set:
+        """Return the set of userIds with at least one config matching this deal."""
+        buckets = self._buckets
+        users = set()
+        buckets.get(int(asset_id), _EMPTY_BUCKET).collect(price, deal_pct, users)
+        buckets.get(None, _EMPTY_BUCKET).collect(price, deal_pct, users)
+        return users
+
+
+def _normalise(row):
+    user_id, asset_id, min_deal, min_price, max_price = row
+    return (
+        int(user_id),
+        int(asset_id) if asset_id is not None else None,
+        float(min_deal),
+        float(min_price) if min_price is not None else None,
+        float(max_price) if max_price is not None else None,
+    )
+
+
+matcher = SnipeMatcher()
+
+
+# ─── LISTEN/NOTIFY ─────────────────────────────────────────────────────────
+
+def ensure_notify_trigger(conn):
+    """Install the trigger that NOTIFYs on every SnipeConfig change."""
+    with conn.cursor() as cur:
+        cur.execute(f'''
+            CREATE OR REPLACE FUNCTION snipe_config_notify() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    PERFORM pg_notify('{NOTIFY_CHANNEL}', OLD.id);
+                ELSE
+                    PERFORM pg_notify('{NOTIFY_CHANNEL}', NEW.id);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        ''')
+        cur.execute('DROP TRIGGER IF EXISTS snipe_config_notify ON "SnipeConfig"')
+        cur.execute('''
+            CREATE TRIGGER snipe_config_notify
+            AFTER INSERT OR UPDATE OR DELETE ON "SnipeConfig"
+            FOR EACH ROW EXECUTE FUNCTION snipe_config_notify()
+        ''')
+
+
+def _listen_loop():
+    while True:
+        conn = None
+        try:
+            conn = get_db_conn()
+            conn.autocommit = True
+
+            ensure_notify_trigger(conn)
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN {NOTIFY_CHANNEL}')
+
+            # Full reload AFTER listening so no change can slip between the two
+            matcher.load_all(conn)
+
+            while True:
+                if select.select([conn], [], [], LISTEN_TIMEOUT) == ([], [], []):
+                    with conn.cursor() as cur:
+                        cur.execute('SELECT 1')
+                    continue
+
+                conn.poll()
+                config_ids = set()
+                while conn.notifies:
+                    config_ids.add(conn.notifies.pop(0).payload)
+
+                if config_ids:
+                    matcher.refresh_configs(conn, config_ids)
+                    logger.debug(f"[snipe_matcher] Applied {len(config_ids)} config change(s) — {len(matcher)} active")
+
+        except Exception as e:
+            logger.error(f"[snipe_matcher] Listener error: {e} — reconnecting in 5s")
+            time.sleep(5)
+        finally:
+            if conn:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+def start_snipe_matcher():
+    """Start the SnipeConfig listener in a background daemon thread."""
+    thread = threading.Thread(target=_listen_loop, daemon=True)
+    thread.start()
+    logger.info("[snipe_matcher] 🎯 Snipe config listener started")
+    return thread
+
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+def _naive_match(configs, asset_id, price, deal_pct):
+    """The old per-connection loop: every config checked against every deal."""
+    users = set()
+    for user_id, cfg_asset, min_deal, min_price, max_price in configs:
+        if cfg_asset is not None and cfg_asset != asset_id:
+            continue
+        if deal_pct < min_deal:
+            continue
+        if min_price is not None and price < min_price:
+            continue
+        if max_price is not None and price > max_price:
+            continue
+        users.add(user_id)
+    return users
+
+
+def run_benchmark(configs, deals, assets=3000, users=20000, wildcard=0.15, bounded=0.5):
+    rng = random.Random(1)
+    rows = []
+    for i in range(configs):
+        asset_id = None if rng.random() < wildcard else rng.randrange(assets)
+        min_price = max_price = None
+        if rng.random() < bounded:
+            min_price = rng.choice((None, rng.randrange(0, 5000)))
+            max_price = rng.randrange(5000, 100000)
+        rows.append((f'c{i}', rng.randrange(users), asset_id, rng.uniform(10, 80), min_price, max_price))
+    sample = [(rng.randrange(assets), rng.uniform(100, 50000), rng.uniform(10, 90)) for _ in range(deals)]
+
+    index = SnipeMatcher()
+    started = time.perf_counter()
+    index.load_rows(rows)
+    load_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matched = sum(len(index.match(*deal)) for deal in sample)
+    match_time = time.perf_counter() - started
+
+    # Bounded configs that passed minDeal but failed the price range — the
+    # linear part of a match; matches themselves are the output and unavoidable
+    checked = hits = 0
+    for asset_id, price, deal_pct in sample:
+        for bucket in (index._buckets.get(asset_id, _EMPTY_BUCKET), index._buckets.get(None, _EMPTY_BUCKET)):
+            idx = bisect.bisect_right(bucket.bounded_deals, deal_pct)
+            checked += idx
+            hits += sum(1 for lo, hi, _ in bucket.bounded[:idx] if lo <= price <= hi)
+
+    changes = {f'c{i}': rows[i][1:] for i in rng.sample(range(configs), min(1000, configs))}
+    started = time.perf_counter()
+    index.apply(changes)
+    apply_time = time.perf_counter() - started
+
+    normalised = [_normalise(row[1:]) for row in rows]
+    started = time.perf_counter()
+    naive = sum(len(_naive_match(normalised, *deal)) for deal in sample)
+    naive_time = time.perf_counter() - started
+
+    print(f"{configs} configs over {assets} assets, {deals} deals")
+    print(f"  load           {load_time:.2f}s")
+    print(f"  indexed match  {match_time:.2f}s  ({matched} matches)")
+    print(f"  per-config     {naive_time:.2f}s  ({naive} matches)")
+    print(f"  bounded price checks {checked}, {hits} in range ({hits / max(checked, 1):.0%})")
+    print(f"  {len(changes)} config changes applied in {apply_time:.3f}s")
+    if matched != naive:
+        print("  MISMATCH between indexed and per-config results")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Shared SnipeConfig matcher')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='indexed matching vs the per-config loop on synthetic configs')
+    bench.add_argument('--configs', type=int, default=100_000)
+    bench.add_argument('--deals', type=int, default=1000)
+    bench.add_argument('--assets', type=int, default=3000)
+    bench.add_argument('--wildcard', type=float, default=0.15, help='share of configs with assetId = NULL')
+    bench.add_argument('--bounded', type=float, default=0.5, help='share of configs with a price range')
+    args = parser.parse_args(argv)
+
+    return run_benchmark(args.configs, args.deals, args.assets,
+                         wildcard=args.wildcard, bounded=args.bounded)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
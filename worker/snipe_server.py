@@ -11,25 +11,267 @@ Start it in a separate thread from main.py:
 
 The Next.js app proxies /api/snipe/stream to this server,
 so the browser never talks to it directly.
+
+It also serves  /ticks?assets=...  — live price/RAP changes per item
+(see price_ticks.py),  /deals  — the precomputed deals board
+(see deals_board.py),  /rank?userId=...  — leaderboard positions
+(see player_ranks.py),  /pool  — DB pool wait/utilization (db_pool.py),
+/scan-stats  — ScanJob queue wait per job type (scan_scheduler.py),
+/rate-limits  — learned per-cookie Roblox API rates (rate_limiter.py),
+/http  — outbound request latency per host (http_client.py), and
+/rescans  — change-aware rescan counters (rescan_scheduler.py).
+
+All /stream connections share ONE deal poller and ONE config matcher
+(snipe_matcher.py) — each deal is matched once and fanned out to the
+queues of the users it matches.
+
+Stream event ids come from the SnipeDeal row — its createdAt in ms, times
+EVENT_ID_SPREAD, plus its position among rows with the same createdAt —
+so they keep rising across worker restarts, and deals re-read into the
+replay buffer after a restart keep the ids they were first sent with.
+A Last-Event-ID older than the replay buffer gets a {"type": "reset"}
+event before the recent-window replay, so the client knows it has a gap.
+
+Reconnect-storm benchmark (local server, no DB needed):
+
+    python snipe_server.py bench --clients 400
 """
 
+import argparse
+import calendar
+import datetime
+import http.client
 import json
 import logging
 import os
+import queue
+import random
+import sys
 import threading
 import time
+from collections import deque
 import psycopg2
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import urlparse, parse_qs
 
+from db_pool import getconn, pool_stats, putconn
+from http_client import http_stats
+from deals_board import board_ready, get_deals_view
+from player_ranks import player_ranks
+from rate_limiter import rate_limit_stats
+from rescan_scheduler import rescan_stats
+from scan_scheduler import scan_wait_stats
+from price_ticks import MAX_ASSETS_PER_CONNECTION, parse_assets_param, subscribe_ticks, unsubscribe_ticks
+from snipe_matcher import matcher, start_snipe_matcher
+
 logger = logging.getLogger(__name__)
 
-DATABASE_URL = os.getenv('DATABASE_URL', '')
 PORT = int(os.getenv('SNIPE_SERVER_PORT', '3001'))
 
+DEAL_POLL_INTERVAL = 2      # shared SnipeDeal poll — one query for ALL connections
+HEARTBEAT_INTERVAL = 5
+RECENT_WINDOW = 120         # seconds of matched deals replayed to a connection with no Last-Event-ID
+RECENT_LIMIT = 50
+SUBSCRIBER_QUEUE_SIZE = 500
+REPLAY_BUFFER_SIZE = 5000   # events kept in memory for Last-Event-ID resume
+EVENT_ID_SPREAD = 100_000   # ids per createdAt millisecond (rows written in one batch share it)
+
+# Reconnect delay sent to browsers, jittered per connection so a proxy
+# restart doesn't bring every client back in the same instant
+RETRY_MIN_MS = 2000
+RETRY_MAX_MS = 8000
+
+
+# ─── Subscribers ───────────────────────────────────────────────────────────
+
+class _Subscriber:
+    __slots__ = ('queue', 'overflowed')
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+
+# userId -> set of per-connection subscribers
+_subscribers: dict[int, set[_Subscriber]] = {}
+_subscribers_lock = threading.Lock()
+
+# (event id, published epoch, matched userIds, payload), oldest first
+_replay = deque(maxlen=REPLAY_BUFFER_SIZE)
+
+# Events with ids above this are all in _replay. Raised as old events are
+# evicted; until the poller's first read nothing is known.
+_replay_floor = None
+
+RESET_PAYLOAD = json.dumps({'type': 'reset'})
+
+
+def deal_event_id(created_at, rank):
+    """Stream event id for the rank-th SnipeDeal row (0-based) written at created_at."""
+    created_ms = calendar.timegm(created_at.utctimetuple()) * 1000 + created_at.microsecond // 1000
+    return created_ms * EVENT_ID_SPREAD + rank
+
+
+def subscribe(user_id: int, last_event_id: int | None = None) -> _Subscriber:
+    """
+    Register a connection. Replays, straight from memory:
+      - every buffered event after `last_event_id` for this user, or
+      - the last RECENT_WINDOW seconds (capped at RECENT_LIMIT) for a fresh
+        connection — preceded by a reset event when `last_event_id` is
+        older than the buffer, since events in between are lost
+    Registration and replay happen under the publish lock, so nothing is
+    missed or sent twice between the two.
+    """
+    sub = _Subscriber()
+    with _subscribers_lock:
+        resumable = (last_event_id is not None and _replay_floor is not None
+                     and last_event_id >= _replay_floor)
+        if resumable:
+            backlog = [
+                (event_id, payload) for event_id, _, users, payload in _replay
+                if event_id > last_event_id and user_id in users
+            ]
+        else:
+            cutoff = time.time() - RECENT_WINDOW
+            backlog = [
+                (event_id, payload) for event_id, ts, users, payload in _replay
+                if ts >= cutoff and user_id in users
+            ][-RECENT_LIMIT:]
+            if last_event_id is not None:
+                # Carries the newest known id, so the next reconnect can resume
+                known = [i for i in (_replay_floor, _replay[-1][0] if _replay else None) if i is not None]
+                reset_id = max(known) if known else None
+                backlog.insert(0, (reset_id, RESET_PAYLOAD))
+
+        for item in backlog[-SUBSCRIBER_QUEUE_SIZE:]:
+            sub.queue.put_nowait(item)
+        _subscribers.setdefault(user_id, set()).add(sub)
+    return sub
+
+
+def unsubscribe(user_id: int, sub: _Subscriber):
+    with _subscribers_lock:
+        subs = _subscribers.get(user_id)
+        if subs:
+            subs.discard(sub)
+            if not subs:
+                del _subscribers[user_id]
+
+
+def publish_deal(event_id, asset_id, name, image_url, price, rap, deal_pct, event='deal'):
+    """
+    Evaluate a deal once against every config and fan out to connected users.
+    'gone' events carry the deal's last live values, so they reach the same
+    users the deal itself did.
+    """
+    global _replay_floor
+    users = matcher.match(asset_id, price, deal_pct)
+    if not users:
+        return 0
+
+    payload = json.dumps({
+        'type': event,
+        'assetId': str(asset_id),
+        'name': name,
+        'imageUrl': image_url,
+        'price': price,
+        'rap': rap,
+        'deal': round(deal_pct),
+    })
+
+    delivered = 0
+    with _subscribers_lock:
+        if len(_replay) == _replay.maxlen:
+            _replay_floor = _replay[0][0]
+        _replay.append((event_id, time.time(), users, payload))
+
+        for user_id in users:
+            for sub in _subscribers.get(user_id, ()):
+                if sub.overflowed:
+                    continue
+                try:
+                    sub.queue.put_nowait((event_id, payload))
+                    delivered += 1
+                except queue.Full:
+                    # Drop the connection — the browser reconnects with
+                    # Last-Event-ID and catches up from the replay buffer
+                    sub.overflowed = True
+                    logger.warning(f"[snipe_server] Queue full for user {user_id} — closing stream for resume")
+    return delivered
+
+
+# ─── Shared deal poller ────────────────────────────────────────────────────
+
+def _deal_poll_loop():
+    global _replay_floor
+    conn = None
+    last_created = None
+    last_id = ''
+    rank = 0
+
+    while True:
+        try:
+            if conn is None:
+                conn = getconn('snipe_server')
+                conn.autocommit = True
+
+            # Deals matched before the configs load would never reach anyone
+            if not matcher.loaded:
+                time.sleep(DEAL_POLL_INTERVAL)
+                continue
+
+            with conn.cursor() as cur:
+                if last_created is None:
+                    cur.execute('SELECT (NOW() - make_interval(secs => %s))::timestamp(3)', (RECENT_WINDOW,))
+                    cutoff = cur.fetchone()[0]
+                    cur.execute(
+                        '''SELECT id, "assetId", name, "imageUrl", price, rap, deal, event, "createdAt"
+                           FROM "SnipeDeal"
+                           WHERE "createdAt" >= %s
+                           ORDER BY "createdAt" ASC, id ASC''',
+                        (cutoff,)
+                    )
+                else:
+                    cur.execute(
+                        '''SELECT id, "assetId", name, "imageUrl", price, rap, deal, event, "createdAt"
+                           FROM "SnipeDeal"
+                           WHERE ("createdAt", id) > (%s, %s)
+                           ORDER BY "createdAt" ASC, id ASC''',
+                        (last_created, last_id)
+                    )
+                deals = cur.fetchall()
+
+            if last_created is None:
+                # Everything from the cutoff on is now in the buffer
+                with _subscribers_lock:
+                    _replay_floor = deal_event_id(cutoff, 0) - 1
+                last_created, rank = cutoff, -1
+
+            if deals:
+                delivered = 0
+                for deal_id, asset_id, name, image_url, price, rap, deal_pct, event, created_at in deals:
+                    rank = rank + 1 if created_at == last_created else 0
+                    last_id, last_created = deal_id, created_at
+                    event_id = deal_event_id(created_at, rank)
+                    delivered += publish_deal(event_id, asset_id, name, image_url, price, rap, deal_pct, event)
+                logger.debug(f"[snipe_server] Matched {len(deals)} deal(s) → {delivered} event(s)")
+
+        except psycopg2.OperationalError as e:
+            # DB hiccup — reconnect on next tick
+            logger.warning(f"[snipe_server] Deal poll DB error: {e}")
+            if conn is not None:
+                putconn(conn, close=True)
+            conn = None
+        except Exception as e:
+            logger.error(f"[snipe_server] Deal poll error: {e}")
+
+        time.sleep(DEAL_POLL_INTERVAL)
+
 
-def get_db_conn():
-    return psycopg2.connect(DATABASE_URL)
+class SSEServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Listen backlog — the default of 5 refuses most of a reconnect storm
+    request_queue_size = 1024
 
 
 class SSEHandler(BaseHTTPRequestHandler):
@@ -37,6 +279,24 @@ class SSEHandler(BaseHTTPRequestHandler):
         # Suppress default access logs — use our logger instead
         logger.debug(f"[snipe_server] {format % args}")
 
+    def send_sse_headers(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        self.send_header('X-Accel-Buffering', 'no')
+        # CORS — only needed if not proxied
+        self.send_header('Access-Control-Allow-Origin', os.getenv('NEXT_PUBLIC_APP_URL', '*'))
+        self.end_headers()
+
+    def send_sse(self, data: str):
+        try:
+            self.wfile.write(data.encode('utf-8'))
+            self.wfile.flush()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
     def do_GET(self):
         parsed = urlparse(self.path)
 
@@ -47,6 +307,29 @@ class SSEHandler(BaseHTTPRequestHandler):
             self.wfile.write(b'ok')
             return
 
+        stats_source = {'/pool': pool_stats, '/scan-stats': scan_wait_stats, '/rate-limits': rate_limit_stats,
+                        '/http': http_stats, '/rescans': rescan_stats}
+        if parsed.path in stats_source:
+            body = json.dumps(stats_source[parsed.path]()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if parsed.path == '/ticks':
+            self.serve_ticks(parse_qs(parsed.query))
+            return
+
+        if parsed.path == '/deals':
+            self.serve_deals(parse_qs(parsed.query))
+            return
+
+        if parsed.path == '/rank':
+            self.serve_rank(parse_qs(parsed.query))
+            return
+
         if parsed.path != '/stream':
             self.send_response(404)
             self.end_headers()
@@ -68,137 +351,295 @@ class SSEHandler(BaseHTTPRequestHandler):
             self.wfile.write(b'Invalid userId')
             return
 
-        # SSE headers
+        # Browsers send Last-Event-ID on reconnect; proxies that can't
+        # forward headers may pass it as ?lastEventId= instead
+        last_event_id = self.headers.get('Last-Event-ID') or (params.get('lastEventId') or [None])[0]
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+
+        self.send_sse_headers()
+        send = self.send_sse
+
+        logger.info(f"[snipe_server] User {user_id} connected (Last-Event-ID: {last_event_id})")
+
+        send(f'retry: {random.randint(RETRY_MIN_MS, RETRY_MAX_MS)}\n: connected\n\n')
+
+        sub = subscribe(user_id, last_event_id)
+
+        try:
+            while True:
+                try:
+                    event_id, payload = sub.queue.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    if sub.overflowed:
+                        break
+                    # Heartbeat
+                    if not send(': heartbeat\n\n'):
+                        break
+                    continue
+
+                # Reset events sent before the poller's first read have no id
+                message = f'data: {payload}\n\n' if event_id is None else f'id: {event_id}\ndata: {payload}\n\n'
+                if not send(message):
+                    break  # client disconnected
+
+        except Exception as e:
+            logger.error(f"[snipe_server] Stream error for user {user_id}: {e}")
+        finally:
+            unsubscribe(user_id, sub)
+            logger.info(f"[snipe_server] User {user_id} disconnected")
+
+    def serve_deals(self, params):
+        """GET /deals — the worker's precomputed deals board (see deals_board.py)."""
+        if not board_ready():
+            self.send_response(503)
+            self.end_headers()
+            self.wfile.write(b'Deals board not built yet')
+            return
+
+        def number(name):
+            raw = (params.get(name) or [None])[0]
+            return float(raw) if raw not in (None, '') else None
+
+        try:
+            min_price = number('minPrice')
+            max_price = number('maxPrice')
+            limit = number('limit')
+            limit = int(limit) if limit is not None else None
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(b'Invalid number')
+            return
+
+        manipulated = (params.get('manipulated') or ['exclude'])[0]
+        if manipulated not in ('exclude', 'include', 'only'):
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(b'manipulated must be exclude, include or only')
+            return
+
+        body, etag = get_deals_view(min_price, max_price, manipulated, limit)
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
         self.send_response(200)
-        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
         self.send_header('Cache-Control', 'no-cache')
-        self.send_header('Connection', 'keep-alive')
-        self.send_header('X-Accel-Buffering', 'no')
-        # CORS — only needed if not proxied
-        self.send_header('Access-Control-Allow-Origin', os.getenv('NEXT_PUBLIC_APP_URL', '*'))
         self.end_headers()
+        self.wfile.write(body)
 
-        logger.info(f"[snipe_server] User {user_id} connected")
+    def serve_rank(self, params):
+        """GET /rank?userId=123 — O(log n) leaderboard position (see player_ranks.py)."""
+        if not player_ranks.loaded:
+            self.send_response(503)
+            self.end_headers()
+            self.wfile.write(b'Leaderboard not loaded yet')
+            return
 
-        def send(data: str):
-            try:
-                self.wfile.write(data.encode('utf-8'))
-                self.wfile.flush()
-                return True
-            except (BrokenPipeError, ConnectionResetError):
-                return False
+        try:
+            user_id = int((params.get('userId') or [''])[0])
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(b'Invalid userId')
+            return
 
-        send(': connected\n\n')
+        ranks = player_ranks.ranks(user_id)
+        if ranks is None:
+            # Unknown or unranked — let the caller fall back to the database
+            self.send_response(404)
+            self.end_headers()
+            self.wfile.write(b'User not ranked')
+            return
 
-        last_seen_id = None
-        conn = None
+        body = json.dumps({
+            'rapRank':    ranks['totalRAP'],
+            'itemsRank':  ranks['totalItems'],
+            'uniqueRank': ranks['uniqueItems'],
+            'players':    len(player_ranks),
+        }, separators=(',', ':')).encode('utf-8')
 
-        try:
-            conn = get_db_conn()
-            conn.autocommit = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
 
-            while True:
-                # Heartbeat
-                if not send(': heartbeat\n\n'):
-                    break
+    def serve_ticks(self, params):
+        """GET /ticks?assets=1,2,3 — live price/RAP changes for those assets only."""
+        asset_ids = parse_assets_param((params.get('assets') or [''])[0])
+        if asset_ids is None:
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(f'assets must be "all" or 1-{MAX_ASSETS_PER_CONNECTION} comma-separated ids'.encode('utf-8'))
+            return
 
+        self.send_sse_headers()
+        self.send_sse(f'retry: {random.randint(RETRY_MIN_MS, RETRY_MAX_MS)}\n: connected\n\n')
+
+        sub = subscribe_ticks(asset_ids)
+        try:
+            while True:
                 try:
-                    with conn.cursor() as cur:
-                        # Load user's enabled snipe configs
-                        cur.execute(
-                            '''SELECT "assetId", "minDeal", "minPrice", "maxPrice"
-                               FROM "SnipeConfig"
-                               WHERE "userId" = %s AND enabled = true''',
-                            (user_id,)
-                        )
-                        configs = cur.fetchall()
-
-                        if configs:
-                            # Pull recent deals
-                            cutoff = time.time() - 120  # last 2 minutes
-                            if last_seen_id:
-                                cur.execute(
-                                    '''SELECT id, "assetId", name, "imageUrl", price, rap, deal
-                                       FROM "SnipeDeal"
-                                       WHERE "createdAt" >= to_timestamp(%s)
-                                         AND id > %s
-                                       ORDER BY "createdAt" ASC
-                                       LIMIT 50''',
-                                    (cutoff, last_seen_id)
-                                )
-                            else:
-                                cur.execute(
-                                    '''SELECT id, "assetId", name, "imageUrl", price, rap, deal
-                                       FROM "SnipeDeal"
-                                       WHERE "createdAt" >= to_timestamp(%s)
-                                       ORDER BY "createdAt" ASC
-                                       LIMIT 50''',
-                                    (cutoff,)
-                                )
-
-                            deals = cur.fetchall()
-
-                            if deals:
-                                last_seen_id = deals[-1][0]
-
-                                for deal_row in deals:
-                                    _, asset_id, name, image_url, price, rap, deal_pct = deal_row
-
-                                    for cfg in configs:
-                                        cfg_asset, cfg_min_deal, cfg_min_price, cfg_max_price = cfg
-
-                                        if cfg_asset is not None and cfg_asset != asset_id:
-                                            continue
-                                        if deal_pct < cfg_min_deal:
-                                            continue
-                                        if cfg_min_price is not None and price < cfg_min_price:
-                                            continue
-                                        if cfg_max_price is not None and price > cfg_max_price:
-                                            continue
-
-                                        payload = json.dumps({
-                                            'assetId': str(asset_id),
-                                            'name': name,
-                                            'imageUrl': image_url,
-                                            'price': price,
-                                            'rap': rap,
-                                            'deal': round(deal_pct),
-                                        })
-
-                                        if not send(f'data: {payload}\n\n'):
-                                            return  # client disconnected
-
-                                        break  # one event per deal
-
-                except psycopg2.OperationalError:
-                    # DB hiccup — reconnect and continue
-                    try:
-                        conn.close()
-                    except Exception:
-                        pass
-                    try:
-                        conn = get_db_conn()
-                        conn.autocommit = True
-                    except Exception:
-                        pass
-
-                time.sleep(5)  # poll every 5s — no timeout risk here
+                    payload = sub.queue.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    if sub.overflowed:
+                        break
+                    if not self.send_sse(': heartbeat\n\n'):
+                        break
+                    continue
+
+                if not self.send_sse(f'data: {payload}\n\n'):
+                    break
 
         except Exception as e:
-            logger.error(f"[snipe_server] Stream error for user {user_id}: {e}")
+            logger.error(f"[snipe_server] Tick stream error: {e}")
         finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
-            logger.info(f"[snipe_server] User {user_id} disconnected")
+            unsubscribe_ticks(asset_ids, sub)
 
 
 def start_snipe_server():
-    """Start the SSE server in a background daemon thread."""
-    server = HTTPServer(('0.0.0.0', PORT), SSEHandler)
+    """Start the SSE server, config matcher and shared deal poller in background daemon threads."""
+    start_snipe_matcher()
+    threading.Thread(target=_deal_poll_loop, daemon=True).start()
+
+    server = SSEServer(('0.0.0.0', PORT), SSEHandler)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
     logger.info(f"[snipe_server] 🎯 Snipe SSE server running on port {PORT}")
-    return server
\ No newline at end of file
+    return server
+
+# ─── Benchmark ─────────────────────────────────────────────────────────────
+
+def _read_events(port, user_id, count, last_event_id=None, timeout=30):
+    """Open a /stream, read `count` data events as (id, payload), then drop the connection."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    headers = {'Last-Event-ID': str(last_event_id)} if last_event_id is not None else {}
+    conn.request('GET', f'/stream?userId={user_id}', headers=headers)
+    response = conn.getresponse()
+    events, event_id = [], None
+    try:
+        while len(events) < count:
+            line = response.readline().decode('utf-8')
+            if not line:
+                break
+            if line.startswith('id: '):
+                event_id = int(line[4:])
+            elif line.startswith('data: '):
+                events.append((event_id, json.loads(line[6:])))
+    finally:
+        conn.close()
+    return events
+
+
+def _wait_for_subscribers(count, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with _subscribers_lock:
+            if sum(len(subs) for subs in _subscribers.values()) >= count:
+                return True
+        time.sleep(0.01)
+    return False
+
+
+def run_benchmark(clients, first, missed):
+    """
+    Reconnect storm: `clients` streams each read `first` events and drop,
+    `missed` more are published, then every client reconnects at once with
+    its Last-Event-ID. Checks each gets exactly the missed events, in order,
+    and that an id older than the buffer gets a reset.
+    """
+    global _replay_floor
+    matcher.load_rows([(f'c{user_id}', user_id, None, 0, None, None) for user_id in range(clients)])
+    server = SSEServer(('127.0.0.1', 0), SSEHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    created_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    published = []
+
+    def publish(count):
+        for _ in range(count):
+            event_id = deal_event_id(created_at, len(published))
+            publish_deal(event_id, 1, 'Bench Item', None, 100.0, 200.0, 50.0)
+            published.append(event_id)
+
+    with _subscribers_lock:
+        _replay_floor = deal_event_id(created_at, 0) - 1
+
+    results = [None] * clients
+
+    def first_connection(user_id):
+        results[user_id] = _read_events(port, user_id, first)
+
+    threads = [threading.Thread(target=first_connection, args=(user_id,)) for user_id in range(clients)]
+    for thread in threads:
+        thread.start()
+    if not _wait_for_subscribers(clients):
+        print("clients did not all connect")
+        return 1
+    publish(first)
+    for thread in threads:
+        thread.join()
+
+    publish(missed)
+    expected = published[first:]
+
+    start = threading.Barrier(clients + 1)
+    resumed = [None] * clients
+
+    def reconnect(user_id):
+        last_id = results[user_id][-1][0] if results[user_id] else None
+        start.wait()
+        resumed[user_id] = _read_events(port, user_id, missed, last_event_id=last_id)
+
+    threads = [threading.Thread(target=reconnect, args=(user_id,)) for user_id in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    storm_time = time.perf_counter() - started
+
+    exact = sum(1 for events in resumed if [event_id for event_id, _ in events] == expected)
+    duplicates = sum(len(events) - len({event_id for event_id, _ in events}) for events in resumed)
+
+    stale = _read_events(port, 0, 1, last_event_id=published[0] - 10)
+    reset = bool(stale) and stale[0][1].get('type') == 'reset'
+    server.shutdown()
+
+    print(f"{clients} clients, {first} events read before dropping, {missed} published while away")
+    print(f"  first read: {sum(len(r) == first for r in results)}/{clients} complete")
+    print(f"  reconnect storm resolved in {storm_time:.2f}s")
+    print(f"  {exact}/{clients} received exactly the missed events in order, {duplicates} duplicate(s)")
+    print(f"  Last-Event-ID older than the buffer -> {'reset' if reset else 'NO reset'}")
+    return 0 if exact == clients and not duplicates and reset else 1
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Snipe SSE server')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='reconnect storm against a local server with Last-Event-ID resume')
+    bench.add_argument('--clients', type=int, default=400)
+    bench.add_argument('--first', type=int, default=30, help='events each client reads before dropping')
+    bench.add_argument('--missed', type=int, default=50, help='events published while the clients are away')
+    args = parser.parse_args(argv)
+
+    return run_benchmark(args.clients, args.first, args.missed)
+
+
+if __name__ == '__main__':
+    sys.exit(main())